@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""Offline bulk backfill: re-scrape stored snapshots for many users with a process pool.
+
+Items are streamed from a file (``-`` for stdin), one user ID or R2 key per line. Lines
+ending in ``.html`` / ``.html.gz`` are treated as R2 keys, everything else as user IDs
+(override with ``--items``). Each worker owns a ``UserProcessor`` and runs the same code
+path as the Lambda:
+
+- ``--sink api``: ``UserProcessor.process_user(reprocess=True)`` per user — scrape, avatar
+  sync and PATCH, exactly like an invocation
+- ``--sink jsonl``: ``UserProcessor.scrape_snapshot`` only; results are written as
+  ``part-NNNNN.jsonl`` chunks of ``--chunk-size`` rows under ``--output``
+- ``--sink bulk``: ``scrape_snapshot`` in the workers, then the parent sends
+  ``--batch-size`` profile payloads per ``POST --bulk-route`` call
+
+With ``--prefetch N`` (jsonl sink) the parent downloads R2 key items itself,
+``N`` GETs at a time with at most ``--prefetch-mb`` of documents in flight, and hands
+workers the bytes so they only parse; a worker otherwise spends most of an item waiting
+on one GET. User items still download in their worker.
+
+Completed items are appended to ``--checkpoint`` once their results are durable (chunk
+renamed into place, bulk call acknowledged, or PATCH done), so an interrupted run resumes
+where it stopped. Failed items are logged to ``<checkpoint>.failed.jsonl`` and retried on
+the next run.
+
+Usage::
+
+    python backfill.py users.txt --sink api --workers 8 --checkpoint backfill.ckpt
+    python backfill.py keys.txt --sink jsonl --output backfill-out/ --workers 16
+    python backfill.py keys.txt --sink jsonl --output backfill-out/ --workers 4 --prefetch 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+# Backfills run outside Lambda: keep per-user EMF records off stdout unless asked for
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+from bs.records import to_payload
+from logging_config import setup_logger
+
+logger = setup_logger("backfill")
+
+SNAPSHOT_SUFFIXES = (".html", ".html.gz")
+SINKS = ("api", "jsonl", "bulk")
+DEFAULT_BULK_ROUTE = "users/bulk-update"
+# (sink, kind, item, prefetched document or None)
+Task = Tuple[str, str, str, Optional[bytes]]
+
+_processor = None
+
+
+def read_items(path: str, kind: str = "auto") -> Iterator[Tuple[str, str]]:
+    """Yield ``(kind, item)`` pairs from ``path`` (``-`` for stdin), skipping blanks and comments."""
+    handle: TextIO = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            item = line.strip()
+            if not item or item.startswith("#"):
+                continue
+            if kind == "auto":
+                yield ("key" if item.endswith(SNAPSHOT_SUFFIXES) else "user"), item
+            else:
+                yield kind, item
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+class Checkpoint:
+    """Append-only record of completed items plus a JSONL log of failures."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        self.path = path
+        self.done: Set[str] = set()
+        self._handle: Optional[TextIO] = None
+        self._failures: Optional[TextIO] = None
+        if path:
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as handle:
+                    self.done.update(line.rstrip("\n") for line in handle if line.strip())
+            self._handle = open(path, "a", encoding="utf-8")
+            self._failures = open(f"{path}.failed.jsonl", "a", encoding="utf-8")
+
+    def mark_done(self, items: List[str]) -> None:
+        self.done.update(items)
+        if self._handle is not None and items:
+            self._handle.write("".join(f"{item}\n" for item in items))
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def mark_failed(self, item: str, error: str) -> None:
+        if self._failures is not None:
+            self._failures.write(json.dumps({"item": item, "error": error}) + "\n")
+            self._failures.flush()
+
+    def close(self) -> None:
+        for handle in (self._handle, self._failures):
+            if handle is not None:
+                handle.close()
+
+
+class ChunkedJsonlWriter:
+    """Write rows into ``part-NNNNN.jsonl`` files, each renamed into place once complete."""
+
+    def __init__(self, directory: str, chunk_size: int) -> None:
+        self.directory = directory
+        self.chunk_size = max(1, chunk_size)
+        os.makedirs(directory, exist_ok=True)
+        existing = [name for name in os.listdir(directory) if name.startswith("part-") and name.endswith(".jsonl")]
+        # Resume numbering after the chunks an earlier run already completed
+        self._index = len(existing)
+        self._rows: List[str] = []
+        self._items: List[str] = []
+
+    def add(self, item: str, row: Dict[str, Any]) -> List[str]:
+        """Buffer ``row``; returns the items made durable when a chunk is flushed."""
+        self._rows.append(json.dumps(to_payload(row), ensure_ascii=False, default=str))
+        self._items.append(item)
+        return self.flush() if len(self._rows) >= self.chunk_size else []
+
+    def flush(self) -> List[str]:
+        if not self._rows:
+            return []
+        final = os.path.join(self.directory, f"part-{self._index:05d}.jsonl")
+        with open(f"{final}.tmp", "w", encoding="utf-8") as handle:
+            handle.write("\n".join(self._rows) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(f"{final}.tmp", final)
+        self._index += 1
+        items, self._rows, self._items = self._items, [], []
+        return items
+
+
+class BulkApiWriter:
+    """Batch profile payloads into ``POST <route>`` calls (``{"updates": [...]}``)."""
+
+    def __init__(self, api, route: str, batch_size: int) -> None:
+        self.api = api
+        self.route = route
+        self.batch_size = max(1, batch_size)
+        self._payloads: List[Dict[str, Any]] = []
+        self._items: List[str] = []
+
+    def add(self, item: str, payload: Dict[str, Any]) -> List[str]:
+        self._payloads.append(payload)
+        self._items.append(item)
+        return self.flush() if len(self._payloads) >= self.batch_size else []
+
+    def flush(self) -> List[str]:
+        if not self._payloads:
+            return []
+        # API Route: users.bulkUpdateProfile, Input: {"updates": [payload, ...]}, Output: {"success": bool}
+        result = self.api.request("POST", self.route, {"updates": self._payloads})
+        if isinstance(result, dict) and result.get("success") is False:
+            raise RuntimeError(f"Bulk update of {len(self._payloads)} users failed: {result}")
+        items, self._payloads, self._items = self._items, [], []
+        return items
+
+
+def _init_worker(log_level: int) -> None:
+    """Create this worker's ``UserProcessor`` (and its pooled clients)."""
+    global _processor
+    logging.getLogger().setLevel(log_level)
+    from config import config
+    from processor import UserProcessor
+
+    config.validate()
+    _processor = UserProcessor()
+
+
+def process_item(task: Task) -> Dict[str, Any]:
+    """Run one item through the processor; never raises so the pool keeps going."""
+    sink, kind, item, html_content = task
+    from processor import SnapshotError
+
+    started = time.perf_counter()
+    outcome: Dict[str, Any] = {"item": item, "kind": kind, "ok": False}
+    try:
+        if sink == "api":
+            result = _processor.process_user(item, reprocess=True)
+            outcome.update(ok=bool(result.get("success")), result=result)
+            if not outcome["ok"]:
+                outcome["error"] = result.get("message")
+        else:
+            if kind == "user":
+                user = _processor.fetch_user(item) or {}
+                html_path = user.get("htmlPath")
+                if not html_path:
+                    raise SnapshotError("No htmlPath found on user document")
+            else:
+                html_path = item
+            profile_data, fingerprints = _processor.scrape_snapshot(html_path, html_content=html_content)
+            outcome.update(
+                ok=True,
+                htmlPath=html_path,
+                # Avatars are only synced by the api sink; keep the scraped source URL separate
+                sourceAvatarURL=profile_data.pop("avatarURL", None),
+                profileData=profile_data,
+                sectionFingerprints=fingerprints,
+            )
+    except Exception as exc:
+        outcome["error"] = f"{type(exc).__name__}: {exc}"
+    outcome["elapsedMs"] = round((time.perf_counter() - started) * 1000.0, 1)
+    return outcome
+
+
+def prefetched(tasks: Iterator[Task], concurrency: int, max_inflight_bytes: int) -> Iterator[Task]:
+    """Attach the downloaded document to each R2 key task, ``concurrency`` downloads at a time.
+
+    Key tasks come back in completion order; user tasks pass through untouched as soon as
+    the prefetcher reads past them. A failed download is attached as ``b""`` so the worker
+    reports it instead of downloading again.
+    """
+    from config import config
+    from utils import prefetch_from_r2, setup_r2_client
+
+    config.validate()
+    r2_client = setup_r2_client(max_pool_connections=concurrency)
+    # A key listed twice is in flight twice; each completion takes one of its sinks
+    sinks: Dict[str, deque] = {}
+    passthrough: deque = deque()
+
+    def keys() -> Iterator[str]:
+        for task in tasks:
+            if task[1] == "key":
+                sinks.setdefault(task[2], deque()).append(task[0])
+                yield task[2]
+            else:
+                passthrough.append(task)
+
+    documents = prefetch_from_r2(
+        r2_client, keys(), concurrency=concurrency, max_inflight_bytes=max_inflight_bytes, decode=False
+    )
+    for key, data in documents:
+        while passthrough:
+            yield passthrough.popleft()
+        queued = sinks[key]
+        sink = queued.popleft()
+        if not queued:
+            del sinks[key]
+        yield sink, "key", key, data or b""
+    while passthrough:
+        yield passthrough.popleft()
+
+
+def run(args: argparse.Namespace) -> int:
+    """Stream items through the pool, write results and checkpoint completed items."""
+    checkpoint = Checkpoint(args.checkpoint)
+    writer = None
+    if args.sink == "jsonl":
+        writer = ChunkedJsonlWriter(args.output, args.chunk_size)
+    elif args.sink == "bulk":
+        from clients import get_clients
+        from config import config
+
+        config.validate()
+        writer = BulkApiWriter(get_clients().api, args.bulk_route, args.batch_size)
+
+    skipped = 0
+
+    def pending() -> Iterator[Task]:
+        nonlocal skipped
+        for count, (kind, item) in enumerate(read_items(args.input, args.items)):
+            if args.limit and count >= args.limit:
+                return
+            if item in checkpoint.done:
+                skipped += 1
+                continue
+            if kind == "key" and args.sink != "jsonl":
+                logger.warning("Skipping R2 key %s: only the jsonl sink can write results without a user", item)
+                continue
+            yield args.sink, kind, item, None
+
+    # The pool reads tasks as fast as it can; with documents attached, cap how many it holds
+    slots = threading.Semaphore(max(1, args.workers) * args.pool_chunksize * 2)
+    stopping = threading.Event()
+
+    def bounded(tasks: Iterator[Task]) -> Iterator[Task]:
+        for task in tasks:
+            while not slots.acquire(timeout=0.5):
+                if stopping.is_set():
+                    return
+            yield task
+
+    tasks: Iterator[Task] = pending()
+    if args.prefetch and args.sink == "jsonl":
+        tasks = bounded(prefetched(tasks, args.prefetch, args.prefetch_mb * 1024 * 1024))
+
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    processed = failed = 0
+    started = time.perf_counter()
+    pool = None
+    try:
+        if args.workers <= 1:
+            _init_worker(log_level)
+            results: Iterator[Dict[str, Any]] = map(process_item, tasks)
+        else:
+            pool = multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(log_level,))
+            results = pool.imap_unordered(process_item, tasks, chunksize=args.pool_chunksize)
+
+        for outcome in results:
+            slots.release()
+            processed += 1
+            item = outcome["item"]
+            if not outcome["ok"]:
+                failed += 1
+                checkpoint.mark_failed(item, outcome.get("error") or "unknown error")
+            elif args.sink == "api":
+                checkpoint.mark_done([item])
+            elif args.sink == "jsonl":
+                checkpoint.mark_done(writer.add(item, outcome))
+            else:
+                from processor import build_profile_payload
+
+                payload = build_profile_payload(
+                    item, outcome["profileData"], None, outcome["sectionFingerprints"], compact=config.PROFILE_COMPACT_ENTITIES
+                )
+                checkpoint.mark_done(writer.add(item, payload))
+
+            if processed % args.progress_every == 0:
+                elapsed = time.perf_counter() - started
+                logger.warning(
+                    "Processed %s items (%s failed, %s already done) at %.1f items/s",
+                    processed, failed, skipped, processed / elapsed if elapsed else 0.0,
+                )
+        if writer is not None:
+            checkpoint.mark_done(writer.flush())
+    finally:
+        stopping.set()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        checkpoint.close()
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        "processed": processed,
+        "failed": failed,
+        "skippedFromCheckpoint": skipped,
+        "elapsedSeconds": round(elapsed, 2),
+        "itemsPerSecond": round(processed / elapsed, 2) if elapsed else None,
+    }))
+    return 1 if failed else 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="File with one user ID or R2 key per line ('-' for stdin)")
+    parser.add_argument("--items", choices=("auto", "user", "key"), default="auto", help="How to interpret input lines")
+    parser.add_argument("--sink", choices=SINKS, default="api")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = in-process)")
+    parser.add_argument("--checkpoint", help="Completed-items file used to resume interrupted runs")
+    parser.add_argument("--output", default="backfill-output", help="Directory for jsonl chunks")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per jsonl chunk")
+    parser.add_argument("--bulk-route", default=DEFAULT_BULK_ROUTE, help="API route for bulk profile updates")
+    parser.add_argument("--batch-size", type=int, default=100, help="Payloads per bulk API call")
+    parser.add_argument("--pool-chunksize", type=int, default=4, help="Items handed to a worker at a time")
+    parser.add_argument("--prefetch", type=int, default=0, help="Parallel R2 downloads for key items (0 = off)")
+    parser.add_argument("--prefetch-mb", type=int, default=64, help="Most MiB of prefetched documents in flight")
+    parser.add_argument("--limit", type=int, help="Stop after this many input lines")
+    parser.add_argument("--progress-every", type=int, default=500)
+    parser.add_argument("--verbose", action="store_true", help="Keep per-user INFO logs")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
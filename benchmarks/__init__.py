@@ -0,0 +1 @@
+"""Local benchmarks for the cron user processor (excluded from the Lambda package)."""
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Hedged R2 reads benchmark: ``download_file_from_r2`` latency with and without hedging.
+
+Serves the corpus from an in-process R2 stand-in whose latency has a heavy tail (Pareto by
+default), then downloads ``--downloads`` documents with ``--threads`` workers once with
+``R2_HEDGE`` off and once on. Reports download latency percentiles and how many extra GETs
+hedging sent (bounded by ``--max-ratio``).
+
+Usage::
+
+    python -m benchmarks.bench_hedging
+    python -m benchmarks.bench_hedging --latency pareto:30,1.3 --downloads 2000 --max-ratio 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import CORPUS_DIR, bootstrap
+from benchmarks.replay import percentile
+
+DEFAULT_LATENCY = "pareto:20,1.5"
+
+
+def run_scenario(hedge: bool, args: argparse.Namespace, keys: List[str]) -> Dict[str, Any]:
+    """Download ``--downloads`` keys through one R2 client and return latency percentiles."""
+    import utils
+    from config import config
+
+    config.R2_HEDGE = hedge
+    config.R2_HEDGE_MAX_RATIO = args.max_ratio
+    config.R2_MAX_POOL_CONNECTIONS = 2 * args.threads
+    utils._hedging = None  # fresh latency history and budget per scenario
+    client = utils.setup_r2_client()
+    latencies: List[float] = []
+    failures: List[str] = []
+    lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        local = []
+        for round_ in range(index, args.downloads, args.threads):
+            key = keys[round_ % len(keys)]
+            started = time.perf_counter()
+            if utils.download_file_from_r2(client, key, decode=False) is None:
+                with lock:
+                    failures.append(key)
+            local.append((time.perf_counter() - started) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "downloads": len(latencies),
+        "failures": len(failures),
+        **{f"p{int(q * 100)}Ms": round(percentile(latencies, q), 1) for q in (0.5, 0.95, 0.99)},
+        "maxMs": round(max(latencies), 1),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--downloads", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="R2 stand-in latency spec (see benchmarks.standins)")
+    parser.add_argument("--max-ratio", type=float, default=0.1, help="R2_HEDGE_MAX_RATIO for the hedged run")
+    parser.add_argument("--port", type=int, default=8760)
+    args = parser.parse_args(argv)
+
+    os.environ["R2_ENDPOINT_URL"] = f"http://127.0.0.1:{args.port}"
+    bootstrap()
+    from benchmarks.standins import FaultProfile, R2StandIn, _StandInServer
+
+    objects = {path.name: path.read_bytes() for path in sorted(CORPUS_DIR.glob("*.html"))}
+    keys = sorted(objects)
+    print(f"{args.downloads} downloads, {args.threads} threads, R2 latency {args.latency}")
+    print(f"{'hedging':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'GETs':>6} {'extra':>7} {'failed':>7}")
+    for hedge in (False, True):
+        service = R2StandIn(FaultProfile(latency=args.latency), 0, objects)
+        server = _StandInServer(("127.0.0.1", args.port), service)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            result = run_scenario(hedge, args, keys)
+        finally:
+            server.shutdown()
+            server.server_close()
+        requests = service.stats()["requests"]
+        print(
+            f"{'on' if hedge else 'off':<8} {result['p50Ms']:>8.1f} {result['p95Ms']:>8.1f} {result['p99Ms']:>8.1f} "
+            f"{result['maxMs']:>8.1f} {requests:>6} {requests / result['downloads'] - 1:>6.1%} {result['failures']:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Serialization benchmark: stdlib ``json`` vs orjson on realistic profile payloads.
+
+Builds ``users.updateProfile`` payloads from the scraper output for the corpus and for
+synthetic profiles of increasing size, then times each path the API client takes:
+
+- ``encode``: payload → request body bytes (the old path was ``json.dumps(...)`` then UTF-8)
+- ``decode``: response body bytes → objects (the old path was ``response.json()``, i.e. text
+  decode then ``json.loads``)
+
+Both backends must produce equal objects after a round trip; any mismatch fails the run.
+
+Usage::
+
+    python -m benchmarks.bench_json
+    python -m benchmarks.bench_json --roles 10,100,400 --repeat 200 --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import EXPECTED_DIR, bootstrap, dump_json, load_json, peak_memory_kb, time_call
+from benchmarks.synthetic import generate_profile_html
+
+DEFAULT_ROLES = "10,60,200"
+
+
+def _payloads(roles: List[int]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Return ``(name, payload)`` pairs for the corpus and the synthetic sizes."""
+    from bs.records import to_payload
+    from bs.scrape import scrape_profile_data
+    from processor import build_profile_payload
+
+    payloads = []
+    for path in sorted(EXPECTED_DIR.glob("*.json")):
+        payloads.append((path.stem, build_profile_payload("user", load_json(path))))
+    for count in roles:
+        html = generate_profile_html(
+            count, roles_per_company=3, nesting_depth=1, skills=count * 2, recommendations=count // 5 + 1,
+            accomplishments_per_type=count // 10 + 1, unicode_density=0.2,
+        )
+        fingerprints: Dict[str, str] = {}
+        # Plain dicts so the legacy ``json.dumps`` path can encode them too
+        profile = to_payload(scrape_profile_data(html, fingerprints=fingerprints))
+        payloads.append((f"synthetic_{count}_roles", build_profile_payload("user", profile, None, fingerprints)))
+    return payloads
+
+
+def measure(payload: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, float]]:
+    """Time encode/decode for the stdlib baseline and every available serializer."""
+    from serialization import ORJSON, STDLIB
+
+    body = STDLIB.dumps(payload)
+    results: Dict[str, Dict[str, float]] = {}
+
+    def legacy_encode() -> bytes:
+        return json.dumps(payload).encode("utf-8")
+
+    def legacy_decode() -> Any:
+        return json.loads(body.decode("utf-8"))
+
+    results["legacy.encode"] = {**time_call(legacy_encode, repeat), "peak_kb": peak_memory_kb(legacy_encode)}
+    results["legacy.decode"] = {**time_call(legacy_decode, repeat), "peak_kb": peak_memory_kb(legacy_decode)}
+    for serializer in (STDLIB, ORJSON):
+        if serializer is None:
+            continue
+        encoded = serializer.dumps(payload)
+        if serializer.loads(encoded) != payload:
+            raise AssertionError(f"{serializer.name} round trip changed the payload")
+        results[f"{serializer.name}.encode"] = {
+            **time_call(lambda: serializer.dumps(payload), repeat),
+            "peak_kb": peak_memory_kb(lambda: serializer.dumps(payload)),
+            "bytes": len(encoded),
+        }
+        results[f"{serializer.name}.decode"] = {
+            **time_call(lambda: serializer.loads(body), repeat),
+            "peak_kb": peak_memory_kb(lambda: serializer.loads(body)),
+        }
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", default=DEFAULT_ROLES, help="Comma-separated synthetic role counts")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--json", help="Write the results to this JSON path")
+    args = parser.parse_args(argv)
+
+    bootstrap()
+    from serialization import ORJSON
+
+    if ORJSON is None:
+        print("orjson is not installed; only the stdlib backend is measured")
+
+    report: Dict[str, Any] = {}
+    print(f"{'payload':<24} {'KiB':>7}  {'path':<14} {'min ms':>9} {'median ms':>10} {'peak KiB':>9} {'speedup':>8}")
+    for name, payload in _payloads([int(value) for value in args.roles.split(",") if value]):
+        results = measure(payload, args.repeat)
+        size_kib = len(json.dumps(payload).encode("utf-8")) / 1024.0
+        report[name] = {"payloadKiB": round(size_kib, 1), "results": results}
+        for path, values in results.items():
+            legacy = results["legacy." + path.split(".", 1)[1]]["min_ms"]
+            speedup = legacy / values["min_ms"] if values["min_ms"] else float("nan")
+            print(
+                f"{name:<24} {size_kib:>7.1f}  {path:<14} {values['min_ms']:>9.4f} "
+                f"{values['median_ms']:>10.4f} {values['peak_kb']:>9.1f} {speedup:>7.1f}x"
+            )
+    if args.json:
+        from pathlib import Path
+
+        dump_json(Path(args.json), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
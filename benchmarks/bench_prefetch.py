@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""R2 prefetch benchmark: one-at-a-time ``download_file_from_r2`` vs ``prefetch_from_r2``.
+
+Serves ``--documents`` copies of the corpus, each padded to ``--doc-kb``, from an in-process R2
+stand-in with ``--latency`` per request. The consumer holds each document for ``--consume-ms``
+(standing in for the parse) before asking for the next. Reports documents per second and the
+peak memory traced while downloading, for a serial loop and for the prefetcher with and without
+an in-flight byte limit.
+
+Usage::
+
+    python -m benchmarks.bench_prefetch
+    python -m benchmarks.bench_prefetch --documents 1000 --concurrency 32 --inflight-mb 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.common import CORPUS_DIR, bootstrap
+
+DEFAULT_LATENCY = "lognormal:40,0.5"
+
+
+def serial(client, keys: List[str]) -> Iterator[Tuple[str, Optional[bytes]]]:
+    import utils
+
+    for key in keys:
+        yield key, utils.download_file_from_r2(client, key, decode=False)
+
+
+def run_scenario(name: str, args: argparse.Namespace, keys: List[str]) -> Dict[str, Any]:
+    """Consume every key through one R2 client and return throughput and peak traced memory."""
+    import utils
+
+    client = utils.setup_r2_client(max_pool_connections=args.concurrency)
+    if name == "serial":
+        documents = serial(client, keys)
+    else:
+        limit = args.inflight_mb * 1024 * 1024 if name == "prefetch" else 0
+        documents = utils.prefetch_from_r2(client, keys, concurrency=args.concurrency, max_inflight_bytes=limit)
+    failures = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _, data in documents:
+        if data is None:
+            failures += 1
+        time.sleep(args.consume_ms / 1000.0)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"docsPerSecond": len(keys) / elapsed, "peakMb": peak / 1024 / 1024, "failures": failures}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=400)
+    parser.add_argument("--doc-kb", type=int, default=256, help="Pad each served document to this size")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--inflight-mb", type=int, default=2, help="max_inflight_bytes for the bounded run")
+    parser.add_argument("--consume-ms", type=float, default=5.0, help="Time the consumer holds each document")
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="R2 stand-in latency spec (see benchmarks.standins)")
+    parser.add_argument("--port", type=int, default=8761)
+    args = parser.parse_args(argv)
+
+    os.environ["R2_ENDPOINT_URL"] = f"http://127.0.0.1:{args.port}"
+    bootstrap()
+    from benchmarks.standins import FaultProfile, R2StandIn, _StandInServer
+
+    corpus = [path.read_bytes() for path in sorted(CORPUS_DIR.glob("*.html"))]
+    objects = {}
+    for index in range(args.documents):
+        html = corpus[index % len(corpus)]
+        objects[f"prefetch/{index:05d}.html"] = html + b" " * max(0, args.doc_kb * 1024 - len(html))
+    keys = sorted(objects)
+
+    service = R2StandIn(FaultProfile(latency=args.latency), 0, objects)
+    server = _StandInServer(("127.0.0.1", args.port), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(
+        f"{args.documents} x {args.doc_kb} KiB documents, R2 latency {args.latency}, "
+        f"concurrency {args.concurrency}, consumer {args.consume_ms:g} ms/doc"
+    )
+    print(f"{'mode':<22} {'docs/s':>8} {'peak MiB':>9} {'failed':>7}")
+    try:
+        for name, label in (
+            ("serial", "serial"),
+            ("unbounded", "prefetch (no limit)"),
+            ("prefetch", f"prefetch ({args.inflight_mb} MiB)"),
+        ):
+            result = run_scenario(name, args, keys)
+            print(f"{label:<22} {result['docsPerSecond']:>8.1f} {result['peakMb']:>9.1f} {result['failures']:>7}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
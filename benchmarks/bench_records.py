@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Memory benchmark: slotted, interned profile records vs one dict per entry.
+
+Scrapes ``--profiles`` synthetic profiles per size (different seeds, the same small set of
+companies and schools, as in a real batch) and keeps them all alive, the way a warm
+container holds a batch of results. Reports the memory retained per profile by:
+
+- ``dicts``: the previous representation, one dict per entry with its own copies of the
+  repeated strings (rebuilt from the JSON the API receives)
+- ``records``: what ``scrape_profile_data`` returns now (identities shared through the
+  warm-container caches)
+
+Both must serialize to the same JSON; any mismatch fails the run. The payload columns compare
+the serialized ``profileData`` with and without ``compact_profile`` references.
+
+Usage::
+
+    python -m benchmarks.bench_records
+    python -m benchmarks.bench_records --roles 10,60,200 --profiles 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Any, Callable, List
+
+from benchmarks.common import bootstrap
+from benchmarks.synthetic import generate_profile_html
+
+DEFAULT_ROLES = "10,60,200"
+
+
+def retained_kb(build: Callable[[], List[Any]]) -> float:
+    """Return the KiB still allocated once ``build`` returns and garbage is collected."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del kept
+    return current / 1024.0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", default=DEFAULT_ROLES, help="Comma-separated synthetic role counts")
+    parser.add_argument("--profiles", type=int, default=20, help="Profiles kept alive per size")
+    args = parser.parse_args(argv)
+
+    bootstrap(dummy_env=False)
+    from bs.records import compact_profile, to_payload
+    from bs.scrape import identity_cache_stats, scrape_profile_data
+    from serialization import dumps
+
+    print(
+        f"{'roles':>6} {'dicts KiB/profile':>18} {'records KiB/profile':>20} {'saved':>7}"
+        f" {'payload KiB':>12} {'compact KiB':>12}"
+    )
+    for count in [int(value) for value in args.roles.split(",") if value]:
+        pages = [
+            generate_profile_html(
+                count, roles_per_company=3, skills=count * 2, recommendations=count // 5 + 1,
+                educations=count // 10 + 2, accomplishments_per_type=count // 10 + 1, seed=seed,
+            )
+            for seed in range(args.profiles)
+        ]
+        texts = [json.dumps(to_payload(scrape_profile_data(page))) for page in pages]
+
+        def build_records() -> List[Any]:
+            return [scrape_profile_data(page) for page in pages]
+
+        def build_dicts() -> List[Any]:
+            # Decoding gives every entry its own key table and value strings, as the old dicts had
+            return [json.loads(text) for text in texts]
+
+        for profile, text in zip(build_records(), texts):
+            if json.dumps(to_payload(profile)) != text:
+                raise AssertionError("records and dicts serialize differently")
+        records = retained_kb(build_records) / args.profiles
+        dicts = retained_kb(build_dicts) / args.profiles
+        profiles = build_records()
+        payload = sum(len(dumps(profile)) for profile in profiles) / args.profiles / 1024.0
+        compact = sum(len(dumps(compact_profile(profile))) for profile in profiles) / args.profiles / 1024.0
+        print(
+            f"{count:>6} {dicts:>18.1f} {records:>20.1f} {1 - records / dicts:>6.0%}"
+            f" {payload:>12.1f} {compact:>12.1f}"
+        )
+    print(f"identity caches: {identity_cache_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
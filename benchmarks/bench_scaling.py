@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Scaling benchmark: parse time and memory of ``bs.scrape`` against profile size.
+
+Generates synthetic profiles of increasing size, measures ``scrape_profile_data`` and
+``extract_experience`` (best of N) plus the tracemalloc peak, and fits the log-log
+slope of time against the number of roles. A slope above ``--max-exponent`` means
+super-linear behaviour and fails the run.
+
+Usage::
+
+    python -m benchmarks.bench_scaling
+    python -m benchmarks.bench_scaling --roles 10,50,100,200 --roles-per-company 5 --nesting-depth 2
+    python -m benchmarks.bench_scaling --scale-all --csv scaling.csv --plot scaling.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import re
+import sys
+from typing import Dict, List, Sequence
+
+from benchmarks.common import bootstrap, peak_memory_kb, time_call
+from benchmarks.synthetic import generate_profile_html
+
+DEFAULT_ROLES = "5,10,25,50,100,200"
+DEFAULT_MAX_EXPONENT = 1.25
+
+
+def loglog_slope(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Least-squares slope of ``log(y)`` against ``log(x)`` (≈1 linear, ≈2 quadratic)."""
+    points = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(points) < 2:
+        return float("nan")
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    return numerator / denominator if denominator else float("nan")
+
+
+def measure(roles: int, args: argparse.Namespace) -> Dict[str, float]:
+    """Benchmark a single generated profile."""
+    from bs.scrape import extract_experience, scrape_profile_data
+
+    factor = roles if args.scale_all else 0
+    html = generate_profile_html(
+        roles,
+        roles_per_company=args.roles_per_company,
+        nesting_depth=args.nesting_depth,
+        unicode_density=args.unicode_density,
+        skills=max(20, factor * 4),
+        recommendations=max(3, factor // 4),
+        accomplishments_per_type=max(2, factor // 10),
+        seed=roles,
+    )
+    sections = re.findall(r'<section class=".*?experience-container.*?">(.*?)</section>', html, re.DOTALL)
+    profile = scrape_profile_data(html)
+
+    scrape_timing = time_call(lambda: scrape_profile_data(html), args.repeat)
+    experience_timing = time_call(lambda: extract_experience(sections), args.repeat)
+    return {
+        "roles": roles,
+        "html_kb": round(len(html.encode("utf-8")) / 1024.0, 1),
+        "entries": len(profile.get("workExperience") or []),
+        "scrape_ms": scrape_timing["min_ms"],
+        "experience_ms": experience_timing["min_ms"],
+        "peak_kb": peak_memory_kb(lambda: scrape_profile_data(html)),
+    }
+
+
+def _ascii_bar(value: float, maximum: float, width: int = 40) -> str:
+    return "#" * max(1, int(round(width * value / maximum))) if maximum else ""
+
+
+def _plot(rows: List[Dict[str, float]], path: str) -> None:
+    """Write a PNG chart when matplotlib is available (optional dependency)."""
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed; skipping --plot")
+        return
+
+    roles = [row["roles"] for row in rows]
+    fig, (time_ax, mem_ax) = plt.subplots(1, 2, figsize=(11, 4))
+    time_ax.loglog(roles, [row["scrape_ms"] for row in rows], "o-", label="scrape_profile_data")
+    time_ax.loglog(roles, [row["experience_ms"] for row in rows], "s-", label="extract_experience")
+    time_ax.set_xlabel("roles")
+    time_ax.set_ylabel("ms (best of N)")
+    time_ax.legend()
+    mem_ax.loglog(roles, [row["peak_kb"] for row in rows], "o-", color="tab:red")
+    mem_ax.set_xlabel("roles")
+    mem_ax.set_ylabel("peak KiB")
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"Plot written to {path}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", default=DEFAULT_ROLES, help="Comma-separated role counts")
+    parser.add_argument("--roles-per-company", type=int, default=1)
+    parser.add_argument("--nesting-depth", type=int, default=0)
+    parser.add_argument("--unicode-density", type=float, default=0.05)
+    parser.add_argument("--scale-all", action="store_true", help="Grow skills/recommendations/accomplishments with roles")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-exponent", type=float, default=DEFAULT_MAX_EXPONENT)
+    parser.add_argument("--csv", help="Write raw results to this CSV path")
+    parser.add_argument("--plot", help="Write a log-log PNG chart to this path (needs matplotlib)")
+    args = parser.parse_args(argv)
+
+    bootstrap(dummy_env=False)
+    role_counts = sorted({int(part) for part in args.roles.split(",") if part.strip()})
+    rows = [measure(roles, args) for roles in role_counts]
+
+    max_ms = max(row["scrape_ms"] for row in rows)
+    print(f"{'roles':>6} {'html KiB':>9} {'entries':>8} {'scrape ms':>10} {'exp ms':>8} {'peak KiB':>9}")
+    for row in rows:
+        print(
+            f"{row['roles']:>6} {row['html_kb']:>9.1f} {row['entries']:>8} {row['scrape_ms']:>10.2f} "
+            f"{row['experience_ms']:>8.2f} {row['peak_kb']:>9.1f}  {_ascii_bar(row['scrape_ms'], max_ms)}"
+        )
+
+    xs = [row["roles"] for row in rows]
+    slopes = {
+        "scrape_profile_data": loglog_slope(xs, [row["scrape_ms"] for row in rows]),
+        "extract_experience": loglog_slope(xs, [row["experience_ms"] for row in rows]),
+        "peak_memory": loglog_slope(xs, [row["peak_kb"] for row in rows]),
+    }
+    for name, slope in slopes.items():
+        print(f"log-log slope {name}: {slope:.2f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.plot:
+        _plot(rows, args.plot)
+
+    worst = max(slopes["scrape_profile_data"], slopes["extract_experience"])
+    if worst > args.max_exponent:
+        print(f"FAIL: super-linear scaling (slope {worst:.2f} > {args.max_exponent:.2f})")
+        return 1
+    print(f"PASS (max slope {args.max_exponent:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
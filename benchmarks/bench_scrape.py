@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Per-extractor and end-to-end benchmarks for ``bs.scrape`` with a regression gate.
+
+For every document in ``benchmarks/corpus`` this measures the wall time of
+``extract_experience``, ``extract_education``, ``extract_accomplishments``,
+``extract_recommendations`` and ``scrape_profile_data`` plus the tracemalloc peak of
+``scrape_profile_data``. ``scrape_profile_data[bytes]`` repeats the end-to-end run on the
+UTF-8 encoded document (the path the processor takes after downloading from R2), and
+its ``decoded_peak_kb`` is the peak when the bytes are first decoded into a ``str``, as
+the download path used to do. Best-of-N times and peaks are compared against
+``baselines/scrape.json`` and the script exits non-zero when any regresses beyond the
+threshold, or when the scraped output drifts from ``corpus/expected/<name>.json``.
+
+Usage::
+
+    python -m benchmarks.bench_scrape                      # compare against baseline
+    python -m benchmarks.bench_scrape --threshold 0.5      # looser gate on noisy hosts
+    python -m benchmarks.bench_scrape --update-baseline    # record a new baseline
+    python -m benchmarks.bench_scrape --update-expected    # accept new scraper output
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import (
+    BASELINE_DIR,
+    EXPECTED_DIR,
+    bootstrap,
+    compare_to_baseline,
+    dump_json,
+    load_corpus,
+    load_json,
+    peak_memory_kb,
+    time_call,
+)
+
+BASELINE_PATH = BASELINE_DIR / "scrape.json"
+DEFAULT_THRESHOLD = 0.5
+
+
+def _extractor_calls(html: str) -> Dict[str, Callable[[], Any]]:
+    """Build zero-argument callables mirroring how ``scrape_profile_data`` invokes each extractor."""
+    from bs4 import BeautifulSoup
+
+    from bs import scrape
+
+    soup = BeautifulSoup(html, "html.parser")
+    data = html.encode("utf-8")
+    experience_sections = re.findall(
+        r'<section class=".*?experience-container.*?">(.*?)</section>',
+        html,
+        re.DOTALL,
+    )
+    if not experience_sections:
+        fallback = scrape.find_section_by_heading(soup, "Experience")
+        experience_sections = [str(fallback)] if fallback else []
+
+    education_section = soup.find("section", class_=lambda x: x and "education-container" in x)
+    if education_section is None:
+        education_section = scrape.find_section_by_heading(soup, "Education")
+
+    recommendations = scrape.find_section_by_heading(soup, "Recommendations")
+    recommendations_html = str(recommendations) if recommendations else ""
+    accomplishments = scrape.find_section_by_heading(soup, "Accomplishments")
+    accomplishments_html = str(accomplishments) if accomplishments else ""
+
+    return {
+        "extract_experience": lambda: scrape.extract_experience(experience_sections),
+        "extract_education": lambda: scrape.extract_education(education_section),
+        "extract_recommendations": lambda: scrape.extract_recommendations(recommendations_html),
+        "extract_accomplishments": lambda: scrape.extract_accomplishments(accomplishments_html),
+        "scrape_profile_data": lambda: scrape.scrape_profile_data(html),
+        "scrape_profile_data[bytes]": lambda: scrape.scrape_profile_data(data),
+    }
+
+
+def run(repeat: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark every corpus document and return ``{"<doc>::<function>": metrics}``."""
+    from bs.scrape import scrape_profile_data
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, html in load_corpus():
+        for func_name, call in _extractor_calls(html).items():
+            call()  # warm caches (regex compilation, soupsieve, etc.)
+            results[f"{name}::{func_name}"] = time_call(call, repeat)
+        results[f"{name}::scrape_profile_data"]["peak_kb"] = peak_memory_kb(lambda: scrape_profile_data(html))
+        results[f"{name}::scrape_profile_data"]["html_kb"] = round(len(html.encode("utf-8")) / 1024.0, 1)
+        data = html.encode("utf-8")
+        bytes_metrics = results[f"{name}::scrape_profile_data[bytes]"]
+        bytes_metrics["peak_kb"] = peak_memory_kb(lambda: scrape_profile_data(data))
+        bytes_metrics["decoded_peak_kb"] = peak_memory_kb(lambda: scrape_profile_data(data.decode("utf-8")))
+    return results
+
+
+def check_outputs(update: bool) -> List[str]:
+    """Compare scraper output with the recorded expectations (or rewrite them)."""
+    from bs.records import to_payload
+    from bs.scrape import scrape_profile_data
+
+    mismatches: List[str] = []
+    for name, html in load_corpus():
+        expected_path = EXPECTED_DIR / f"{name.rsplit('.', 1)[0]}.json"
+        output = to_payload(scrape_profile_data(html))
+        if update or not expected_path.exists():
+            dump_json(expected_path, output)
+            continue
+        if output != load_json(expected_path):
+            mismatches.append(f"{name}: output differs from {expected_path.relative_to(EXPECTED_DIR.parent.parent)}")
+    return mismatches
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per measurement")
+    parser.add_argument("--threshold", type=float, default=None, help="Allowed fractional regression (default from baseline file)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write current results as the new baseline")
+    parser.add_argument("--update-expected", action="store_true", help="Rewrite expected scraper outputs")
+    args = parser.parse_args(argv)
+
+    bootstrap(dummy_env=False)
+
+    failures = check_outputs(args.update_expected)
+    results = run(args.repeat)
+
+    width = max(len(key) for key in results)
+    print(f"{'benchmark':<{width}}  {'median ms':>10}  {'min ms':>8}  {'peak KiB':>9}")
+    for key, metrics in results.items():
+        peak = f"{metrics['peak_kb']:>9.1f}" if "peak_kb" in metrics else f"{'':>9}"
+        decoded = f"  (decode first: {metrics['decoded_peak_kb']:.1f})" if "decoded_peak_kb" in metrics else ""
+        print(f"{key:<{width}}  {metrics['median_ms']:>10.3f}  {metrics['min_ms']:>8.3f}  {peak}{decoded}")
+
+    baseline_doc = load_json(BASELINE_PATH) if BASELINE_PATH.exists() else {}
+    threshold = args.threshold if args.threshold is not None else baseline_doc.get("threshold", DEFAULT_THRESHOLD)
+
+    if args.update_baseline:
+        dump_json(BASELINE_PATH, {"threshold": threshold, "results": results})
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif baseline_doc:
+        failures.extend(compare_to_baseline(results, baseline_doc.get("results", {}), threshold))
+    else:
+        print("No baseline recorded yet; run with --update-baseline")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"PASS (threshold {threshold:.0%})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
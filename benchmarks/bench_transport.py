@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Transport benchmark: ``ApiClient`` over pooled HTTP/1.1 vs multiplexed HTTP/2.
+
+Starts two in-process API stand-ins with the same latency profile: one speaking HTTP/1.1
+(``ThreadingHTTPServer``) and one speaking cleartext HTTP/2 (``h2``). ``--threads`` workers
+then share one ``ApiClient`` per scenario and run the per-user API pattern (``GET users/<id>``
+followed by a profile ``PATCH``). Reports requests/sec, call latency percentiles and how many
+TCP connections the server accepted.
+
+Scenarios: ``requests`` with urllib3's default pool of 10, ``requests`` with the pool sized
+to the concurrency (the ``API_POOL_SIZE`` default) and ``http2`` (httpx).
+
+Usage::
+
+    python -m benchmarks.bench_transport
+    python -m benchmarks.bench_transport --threads 64 --requests 20 --latency lognormal:40,0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import EXPECTED_DIR, bootstrap, load_json
+from benchmarks.replay import percentile
+
+DEFAULT_LATENCY = "fixed:20"
+
+
+def _serve(server_cls, port: int, service) -> Any:
+    server = server_cls(("127.0.0.1", port), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(base_url: str, transport: str, pool_size: int, args: argparse.Namespace, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Drive ``--threads`` workers through one client and return throughput and latency."""
+    from clients import ApiClient
+    from resilience import AimdLimiter, CircuitBreaker
+
+    api = ApiClient(
+        base_url,
+        "bench",
+        timeout=30,
+        max_retries=0,
+        # Fixed limit: this measures the transport, not the adaptive limiter
+        limiter=AimdLimiter(initial=args.threads, minimum=args.threads, maximum=args.threads),
+        breaker=CircuitBreaker(failure_threshold=1 << 30),
+        transport=transport,
+        pool_size=pool_size,
+    )
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        local: List[float] = []
+        for round_ in range(args.requests):
+            user_id = f"user-{(index * args.requests + round_) % args.users}"
+            for call in (lambda: api.get(f"users/{user_id}"), lambda: api.request("PATCH", f"users/{user_id}", payload)):
+                started = time.perf_counter()
+                try:
+                    call()
+                except Exception as exc:  # recorded and reported; the run keeps going
+                    with lock:
+                        errors.append(f"{type(exc).__name__}: {exc}")
+                local.append((time.perf_counter() - started) * 1000.0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    api._transport.close()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "firstError": errors[0] if errors else None,
+        "requestsPerSecond": round(len(latencies) / elapsed, 1),
+        "p50Ms": round(percentile(latencies, 0.50), 2),
+        "p99Ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32, help="Concurrent workers sharing one client")
+    parser.add_argument("--requests", type=int, default=10, help="GET+PATCH rounds per worker")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="Stand-in latency spec (see benchmarks.standins)")
+    parser.add_argument("--port", type=int, default=8750, help="HTTP/1.1 port; HTTP/2 uses the next one")
+    args = parser.parse_args(argv)
+
+    bootstrap()
+    from benchmarks.standins import ApiStandIn, FaultProfile, _H2StandInServer, _StandInServer
+
+    users = {f"user-{index}": {"_id": f"user-{index}", "htmlPath": f"user-{index}.html"} for index in range(args.users)}
+    payload = {"userId": "user-0", "profileData": load_json(EXPECTED_DIR / "multi_role.json"), "descriptionGenerated": True}
+
+    scenarios: List[Tuple[str, str, int, Any, int]] = [
+        ("requests pool=10", "requests", 10, _StandInServer, args.port),
+        (f"requests pool={args.threads}", "requests", args.threads, _StandInServer, args.port),
+        ("http2", "http2", args.threads, _H2StandInServer, args.port + 1),
+    ]
+    print(f"{args.threads} threads x {args.requests} rounds, latency {args.latency}")
+    print(f"{'scenario':<20} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6} {'errors':>7}")
+    for label, transport, pool_size, server_cls, port in scenarios:
+        service = ApiStandIn(FaultProfile(latency=args.latency), 0, users)
+        server = _serve(server_cls, port, service)
+        try:
+            result = run_scenario(f"http://127.0.0.1:{port}", transport, pool_size, args, payload)
+        finally:
+            server.shutdown()
+            server.server_close()
+        print(
+            f"{label:<20} {result['requestsPerSecond']:>8.1f} {result['p50Ms']:>8.2f} {result['p99Ms']:>8.2f} "
+            f"{service.connections:>6} {result['errors']:>7}"
+        )
+        if result["firstError"]:
+            print(f"  first error: {result['firstError']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Shared helpers for the local benchmark scripts."""
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+EXPECTED_DIR = CORPUS_DIR / "expected"
+BASELINE_DIR = BENCH_DIR / "baselines"
+
+# Placeholder values so ``config.Config`` can be constructed without real credentials
+DUMMY_ENV = {
+    "BASE_API_URL": "http://127.0.0.1",
+    "INSIGHTS_API_KEY": "dummy",
+    "R2_ACCESS_KEY_ID": "dummy",
+    "R2_SECRET_ACCESS_KEY": "dummy",
+    "R2_BUCKET_NAME": "dummy",
+    "R2_ENDPOINT_URL": "http://127.0.0.1",
+    "CLOUDFLARE_ACCOUNT_ID": "dummy",
+    "CLOUDFLARE_API_TOKEN": "dummy",
+    "METRICS_ENABLED": "false",
+}
+
+
+def bootstrap(dummy_env: bool = True) -> None:
+    """Put the repository on ``sys.path``, fill missing config and silence non-error logs."""
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    if dummy_env:
+        for key, value in DUMMY_ENV.items():
+            os.environ.setdefault(key, value)
+    logging.disable(logging.WARNING)
+
+
+def load_corpus(pattern: str = "*.html") -> List[Tuple[str, str]]:
+    """Return ``(name, html)`` pairs for the checked-in corpus."""
+    return [(path.name, path.read_text(encoding="utf-8")) for path in sorted(CORPUS_DIR.glob(pattern))]
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run ``func`` ``repeat`` times with GC paused and return median/min/max in milliseconds."""
+    samples: List[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - started) * 1000.0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+    }
+
+
+def peak_memory_kb(func: Callable[[], Any]) -> float:
+    """Return the peak traced allocation (KiB) while running ``func`` once."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024.0, 1)
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def dump_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2, ensure_ascii=False, sort_keys=True)
+        handle.write("\n")
+
+
+def compare_to_baseline(
+    current: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    keys: Tuple[str, ...] = ("min_ms", "peak_kb"),
+    noise_floor: Dict[str, float] | None = None,
+) -> List[str]:
+    """Return human-readable regressions where ``current`` exceeds ``baseline * (1 + threshold)``.
+
+    Differences smaller than ``noise_floor[key]`` (absolute units) are ignored so that
+    sub-millisecond measurements do not flap on scheduler jitter.
+    """
+    floors = {"min_ms": 0.1, "median_ms": 0.1, "peak_kb": 32.0} if noise_floor is None else noise_floor
+    regressions: List[str] = []
+    for name, metrics in current.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for key in keys:
+            if key not in metrics or key not in reference or not reference[key]:
+                continue
+            limit = reference[key] * (1.0 + threshold)
+            if metrics[key] > limit and metrics[key] - reference[key] >= floors.get(key, 0.0):
+                change = (metrics[key] / reference[key] - 1.0) * 100.0
+                regressions.append(f"{name} {key}: {metrics[key]:.2f} vs baseline {reference[key]:.2f} (+{change:.0f}%)")
+    return regressions
+
+
+__all__ = [
+    "BASELINE_DIR",
+    "BENCH_DIR",
+    "CORPUS_DIR",
+    "DUMMY_ENV",
+    "EXPECTED_DIR",
+    "REPO_ROOT",
+    "bootstrap",
+    "compare_to_baseline",
+    "dump_json",
+    "load_corpus",
+    "load_json",
+    "peak_memory_kb",
+    "time_call",
+]
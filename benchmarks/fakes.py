@@ -0,0 +1,149 @@
+"""In-memory stand-ins for the API, R2 and Cloudflare clients used by ``UserProcessor``.
+
+They implement exactly the surface the processor touches, so the full
+fetch → download → scrape → avatar → persist pipeline runs offline:
+
+- ``FakeApiClient``: ``get("users/<id>")``, ``request("PATCH", "users/<id>")`` and
+  ``request("POST", "users/mark-error")``
+- ``FakeR2Client``: ``head_object`` / ``get_object`` / ``head_bucket`` over a dict of bytes
+- ``FakeCloudflareImageHandler``: ``upload_image`` / ``delete_image`` returning
+  deterministic variant URLs
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+from metrics import record
+from serialization import dumps, loads
+
+
+class FakeApiClient:
+    """Serve user documents from memory and capture profile updates and error marks."""
+
+    def __init__(self, users: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        self.users: Dict[str, Dict[str, Any]] = dict(users or {})
+        self.updates: Dict[str, Dict[str, Any]] = {}
+        self.errors: Dict[str, str] = {}
+
+    def warm(self, timeout: float = 5.0) -> None:
+        return None
+
+    def get(self, route: str, *, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        user_id = _user_route(route)
+        if user_id is None or user_id not in self.users:
+            raise RuntimeError(f"API GET failed with status 404: {route}")
+        body = json.dumps({"data": self.users[user_id]})
+        record("ApiResponseBytes", len(body), "Bytes")
+        return json.loads(body)
+
+    def request(self, method: str, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Serialise like the real client so payload size and encoding cost are still measured
+        body = dumps(payload or {})
+        record("ApiRequestBytes", len(body), "Bytes")
+        payload = loads(body)
+        method = method.upper()
+        if method == "POST" and route.strip("/").endswith("users/mark-error"):
+            self.errors[payload.get("userId")] = payload.get("errorMessage")
+            return {"success": True}
+        user_id = _user_route(route)
+        if method == "PATCH" and user_id is not None:
+            self.updates[user_id] = payload
+            self.users.setdefault(user_id, {}).update(
+                {key: value for key, value in payload.items() if key != "userId"}
+            )
+            return {"success": True}
+        raise RuntimeError(f"API request failed with status 404: {method} {route}")
+
+
+class FakeR2Client:
+    """Minimal S3 client over ``{key: bytes}``; missing keys raise botocore ``ClientError`` 404s."""
+
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None) -> None:
+        self.objects: Dict[str, bytes] = dict(objects or {})
+        self.puts: List[str] = []
+
+    def _missing(self, operation: str):
+        from botocore.exceptions import ClientError
+
+        return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, operation)
+
+    def head_bucket(self, Bucket: str) -> Dict[str, Any]:
+        return {}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        if Key not in self.objects:
+            raise self._missing("HeadObject")
+        return {"ContentLength": len(self.objects[Key])}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        if Key not in self.objects:
+            raise self._missing("GetObject")
+        data = self.objects[Key]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs: Any) -> Dict[str, Any]:
+        self.objects[Key] = Body
+        self.puts.append(Key)
+        return {}
+
+
+class FakeServiceClients:
+    """Duck-typed ``ServiceClients`` bundling the fake API and R2 clients."""
+
+    def __init__(self, api: FakeApiClient, r2_client: FakeR2Client) -> None:
+        self.api = api
+        self.r2_client = r2_client
+
+
+class FakeCloudflareImageHandler:
+    """Accept every upload and return a variant URL derived from the source URL."""
+
+    def __init__(self) -> None:
+        self.uploaded: List[str] = []
+        self.deleted: List[str] = []
+
+    def warm(self) -> None:
+        return None
+
+    def upload_image(self, image_url: str, require_signed_urls: bool = True) -> Optional[Dict[str, Any]]:
+        if not image_url:
+            return None
+        self.uploaded.append(image_url)
+        image_id = hashlib.sha1(image_url.encode("utf-8")).hexdigest()[:16]
+        return {
+            "success": True,
+            "result": {
+                "id": image_id,
+                "variants": [f"https://imagedelivery.invalid/fake/{image_id}/public"],
+                "requireSignedURLs": require_signed_urls,
+            },
+            "errors": [],
+            "messages": [],
+        }
+
+    def delete_image(self, image_url: str) -> bool:
+        if image_url:
+            self.deleted.append(image_url)
+        return True
+
+
+def _user_route(route: str) -> Optional[str]:
+    """Return ``<id>`` for ``users/<id>`` routes (with or without the ``api/`` prefix)."""
+    parts = [part for part in route.strip("/").split("/") if part]
+    if parts and parts[0] == "api":
+        parts = parts[1:]
+    if len(parts) == 2 and parts[0] == "users":
+        return parts[1]
+    return None
+
+
+__all__ = [
+    "FakeApiClient",
+    "FakeCloudflareImageHandler",
+    "FakeR2Client",
+    "FakeServiceClients",
+]
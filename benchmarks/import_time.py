@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Cold-start import budget for the Lambda entrypoint.
+
+Runs ``python -X importtime -c "import lambda_handler"`` in fresh interpreters with a
+simulated Lambda environment and fails when either the cumulative import time exceeds
+the budget or a module that must stay lazy (boto3, requests, bs4, dotenv) is imported.
+
+Usage::
+
+    python -m benchmarks.import_time --budget-ms 80 --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.common import DUMMY_ENV, REPO_ROOT
+
+DEFAULT_BUDGET_MS = 80.0
+DEFAULT_TARGET = "lambda_handler"
+
+# Modules that must only be imported on first use, never at module import
+LAZY_MODULES = ("boto3", "botocore", "requests", "urllib3", "bs4", "dotenv")
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Return ``{module: cumulative_us}`` from ``-X importtime`` output.
+
+    Interpreter start-up imports (everything completed by ``site``) are discarded so
+    only modules pulled in by the ``-c`` statement are reported.
+    """
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        raw_name = fields[2].rstrip()
+        if raw_name == " site":  # top-level (unindented) site import ends interpreter start-up
+            cumulative.clear()
+            continue
+        cumulative[raw_name.strip()] = int(fields[1])
+    return cumulative
+
+
+def measure_once(target: str) -> Tuple[float, Dict[str, int]]:
+    """Import ``target`` in a fresh interpreter and return (milliseconds, module timings)."""
+    env = {**os.environ, **DUMMY_ENV, "AWS_LAMBDA_FUNCTION_NAME": "import-time-benchmark"}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{proc.stderr}")
+
+    modules = parse_importtime(proc.stderr)
+    if target not in modules:
+        raise RuntimeError(f"No importtime entry found for {target}")
+    return modules[target] / 1000.0, modules
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="Module to import (default: lambda_handler)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Median cumulative import budget")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest modules from the last run")
+    args = parser.parse_args(argv)
+
+    # Warm the bytecode cache so the first sample does not include compilation
+    measure_once(args.target)
+
+    samples: List[float] = []
+    modules: Dict[str, int] = {}
+    for _ in range(max(1, args.runs)):
+        elapsed_ms, modules = measure_once(args.target)
+        samples.append(elapsed_ms)
+
+    median_ms = statistics.median(samples)
+    print(f"import {args.target}: median {median_ms:.1f} ms over {len(samples)} runs (budget {args.budget_ms:.1f} ms)")
+
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[: args.top]
+    for name, cumulative_us in slowest:
+        print(f"  {cumulative_us / 1000.0:8.1f} ms  {name}")
+
+    failed = False
+    eager = sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+    if eager:
+        print(f"FAIL: modules imported eagerly at cold start: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time {median_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("PASS")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Offline replay of HTML snapshots through the full ``UserProcessor`` pipeline.
+
+Every ``.html`` / ``.html.gz`` file in a directory (recursively) or tarball becomes one
+fake user whose ``htmlPath`` points at the snapshot. The user is processed by a real
+``UserProcessor`` wired to the in-memory fakes from ``benchmarks.fakes``, so fetch,
+download (including gzip), scrape, avatar sync and persistence all run without network
+access or credentials. Per-stage timings come from the processor's own EMF record.
+
+With ``--live`` the processor uses the real clients instead, configured from the
+environment; combined with ``benchmarks.standins`` this measures end-to-end throughput
+and tail latency over HTTP against fault-injecting local servers.
+
+One JSON line per user (result, persisted profile, stage timings) is written to
+``--output``. A summary with users/sec and per-stage p50/p90/p99 is printed at the end.
+
+Usage::
+
+    python -m benchmarks.replay snapshots/ --workers 4
+    python -m benchmarks.replay snapshots.tar.gz --workers 1 --limit 200 --output run.jsonl
+    python -m benchmarks.replay snapshots/ --live --workers 8   # after exporting the stand-in env
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from benchmarks.common import bootstrap
+
+SNAPSHOT_SUFFIXES = (".html.gz", ".html")
+DEFAULT_OUTPUT = "replay.jsonl"
+
+# (user_id, htmlPath key, file path or snapshot bytes)
+Task = Tuple[str, str, Union[str, bytes]]
+
+_state: Optional[Tuple[Any, Any, Any]] = None
+
+
+def _snapshot_key(name: str) -> Optional[Tuple[str, str]]:
+    """Return ``(user_id, key)`` for a snapshot member name, or ``None`` if it is not one."""
+    key = name.replace(os.sep, "/")
+    while key.startswith("./"):
+        key = key[2:]
+    for suffix in SNAPSHOT_SUFFIXES:
+        if key.endswith(suffix):
+            return key[: -len(suffix)].replace("/", "__"), key
+    return None
+
+
+def iter_snapshots(source: Path) -> Iterator[Task]:
+    """Yield replay tasks from a snapshot directory or a (compressed) tarball."""
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            parsed = _snapshot_key(path.relative_to(source).as_posix()) if path.is_file() else None
+            if parsed:
+                yield parsed[0], parsed[1], str(path)
+        return
+    with tarfile.open(source, "r:*") as archive:
+        for member in archive:
+            parsed = _snapshot_key(member.name) if member.isfile() else None
+            if parsed:
+                handle = archive.extractfile(member)
+                if handle is not None:
+                    yield parsed[0], parsed[1], handle.read()
+
+
+def _init_worker(live: bool = False) -> None:
+    """Build one processor per worker (or once, in-process): fake clients, or real ones when ``live``."""
+    global _state
+    # Stage timings are read back from the EMF record, so metrics must be on
+    os.environ["METRICS_ENABLED"] = "true"
+    bootstrap()
+    logging.disable(logging.ERROR)
+
+    from benchmarks.fakes import FakeApiClient, FakeCloudflareImageHandler, FakeR2Client, FakeServiceClients
+    from processor import UserProcessor
+
+    if live:
+        _state = (UserProcessor(), None, None)
+        return
+
+    api = FakeApiClient()
+    r2_client = FakeR2Client()
+    processor = UserProcessor(
+        clients=FakeServiceClients(api, r2_client),
+        cloudflare_handler=FakeCloudflareImageHandler(),
+    )
+    _state = (processor, api, r2_client)
+
+
+def _stage_timings(emitted: str) -> Dict[str, float]:
+    """Extract ``{stage: ms}`` from the EMF line(s) the processor wrote to stdout."""
+    stages: Dict[str, float] = {}
+    for line in emitted.splitlines():
+        if not line.startswith('{"_aws"'):
+            continue
+        record = json.loads(line)
+        for definition in record["_aws"]["CloudWatchMetrics"][0]["Metrics"]:
+            if definition["Unit"] == "Milliseconds" and definition["Name"].endswith("Ms"):
+                stages[definition["Name"][:-2]] = record[definition["Name"]]
+    return stages
+
+
+def replay_one(task: Task) -> Dict[str, Any]:
+    """Process one snapshot and return its JSONL row."""
+    if _state is None:
+        _init_worker()
+    processor, api, r2_client = _state
+    user_id, key, source = task
+    live = api is None
+    if live:
+        # The stand-ins already serve this snapshot; only its size is needed here
+        data_size = os.path.getsize(source) if isinstance(source, str) else len(source)
+    else:
+        data = Path(source).read_bytes() if isinstance(source, str) else source
+        data_size = len(data)
+        r2_client.objects[key] = data
+        api.users[user_id] = {"_id": user_id, "htmlPath": key, "scrapped": True, "descriptionGenerated": False}
+    emitted = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(emitted):
+            result = processor.process_user(user_id)
+    except Exception as exc:  # the row records the failure; the replay keeps going
+        result = {"success": False, "message": f"{type(exc).__name__}: {exc}"}
+    wall_ms = (time.perf_counter() - started) * 1000.0
+
+    row = {
+        "userId": user_id,
+        "htmlPath": key,
+        "htmlBytes": data_size,
+        "wallMs": round(wall_ms, 3),
+        "result": result,
+        "stages": _stage_timings(emitted.getvalue()),
+    }
+    if not live:
+        update = api.updates.pop(user_id, None) or {}
+        row["avatarURL"] = update.get("avatarURL")
+        row["profileData"] = update.get("profileData")
+        row["errorMessage"] = api.errors.pop(user_id, None)
+        # Keep per-worker state flat however many users are replayed
+        r2_client.objects.pop(key, None)
+        api.users.pop(user_id, None)
+    return row
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values`` (``fraction`` in 0–1)."""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarise(rows: List[Dict[str, Any]], elapsed_s: float, workers: int) -> Dict[str, Any]:
+    """Aggregate throughput, outcomes and stage percentiles."""
+    outcomes: Dict[str, int] = {}
+    for row in rows:
+        result = row["result"]
+        outcome = "skipped" if result.get("skipped") else "success" if result.get("success") else "error"
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    samples: Dict[str, List[float]] = {}
+    for row in rows:
+        for stage, value in row["stages"].items():
+            samples.setdefault(stage, []).append(value)
+    samples["Wall"] = [row["wallMs"] for row in rows]
+
+    return {
+        "users": len(rows),
+        "workers": workers,
+        "elapsedSeconds": round(elapsed_s, 3),
+        "usersPerSecond": round(len(rows) / elapsed_s, 2) if elapsed_s > 0 else None,
+        "outcomes": outcomes,
+        "stages": {
+            stage: {
+                "p50": round(percentile(values, 0.50), 3),
+                "p90": round(percentile(values, 0.90), 3),
+                "p99": round(percentile(values, 0.99), 3),
+                "max": round(max(values), 3),
+            }
+            for stage, values in sorted(samples.items())
+        },
+    }
+
+
+def run(source: Path, workers: int, output: str, limit: Optional[int] = None, live: bool = False) -> Dict[str, Any]:
+    """Replay every snapshot in ``source`` and write one JSON line per user to ``output``."""
+    tasks: Iterator[Task] = iter_snapshots(source)
+    if limit:
+        tasks = itertools.islice(tasks, limit)
+
+    rows: List[Dict[str, Any]] = []
+    pool = None
+    started = time.perf_counter()
+    try:
+        if workers <= 1:
+            _init_worker(live)
+            results: Iterator[Dict[str, Any]] = map(replay_one, tasks)
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(live,))
+            results = pool.imap_unordered(replay_one, tasks)
+        with open(output, "w", encoding="utf-8") as handle:
+            for row in results:
+                handle.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                rows.append({"result": row["result"], "stages": row["stages"], "wallMs": row["wallMs"]})
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return summarise(rows, time.perf_counter() - started, max(1, workers))
+
+
+def _print_summary(summary: Dict[str, Any]) -> None:
+    print(
+        f"{summary['users']} users in {summary['elapsedSeconds']:.2f}s with {summary['workers']} worker(s): "
+        f"{summary['usersPerSecond']} users/s  {summary['outcomes']}"
+    )
+    stages = summary["stages"]
+    if not stages:
+        return
+    width = max(len(stage) for stage in stages)
+    print(f"{'stage':<{width}}  {'p50 ms':>9}  {'p90 ms':>9}  {'p99 ms':>9}  {'max ms':>9}")
+    for stage, values in stages.items():
+        print(
+            f"{stage:<{width}}  {values['p50']:>9.2f}  {values['p90']:>9.2f}  "
+            f"{values['p99']:>9.2f}  {values['max']:>9.2f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Directory or tarball of .html / .html.gz snapshots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = in-process)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSONL path for per-user results")
+    parser.add_argument("--limit", type=int, help="Replay at most this many snapshots")
+    parser.add_argument("--summary-json", help="Also write the summary to this JSON path")
+    parser.add_argument("--live", action="store_true", help="Use the real clients configured from the environment")
+    args = parser.parse_args(argv)
+
+    if not args.source.exists():
+        parser.error(f"{args.source} does not exist")
+    summary = run(args.source, args.workers, args.output, args.limit, live=args.live)
+    _print_summary(summary)
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+    return 0 if summary["users"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,667 @@
+#!/usr/bin/env python3
+"""Local stand-ins for the backend API, R2 (S3) and Cloudflare Images with fault injection.
+
+Three HTTP servers speak exactly the subset of each protocol the Lambda uses:
+
+- API: ``GET /api/users/<id>``, ``PATCH /api/users/<id>``, ``POST /api/users/mark-error``,
+  ``POST /api/users/bulk-update`` (used by ``backfill.py --sink bulk``)
+- R2: ``HEAD /<bucket>``, ``HEAD`` / ``GET /<bucket>/<key>`` (path-style S3)
+- Cloudflare: ``POST /client/v4/accounts/<id>/images/v1``,
+  ``DELETE /client/v4/accounts/<id>/images/v1/<image>``, plus ``GET /media/...`` serving the
+  avatar bytes the handler downloads before uploading
+
+Users and objects are seeded from the same snapshot directory/tarball layout as
+``benchmarks.replay``. Writes are recorded but never change what is served, so repeated
+load runs see identical data. Run the processor against the stand-ins with
+``python -m benchmarks.replay <snapshots> --live`` after exporting the printed variables.
+
+Each service takes a fault profile (JSON ``--config`` keyed by ``api``/``r2``/``cloudflare``,
+or the global ``--latency``/``--error-rate``/``--rps`` flags)::
+
+    {"api": {"latency": "lognormal:40,0.6", "error_rate": 0.02, "errors": {"429": 3, "503": 1},
+             "rps": 50, "burst": 10},
+     "cloudflare": {"latency": "pareto:80,2.5", "error_rate": 0.01, "errors": {"5408": 1}}}
+
+Latency specs: ``fixed:<ms>``, ``uniform:<lo>,<hi>``, ``lognormal:<median>,<sigma>``,
+``pareto:<scale>,<shape>``. Fault decisions are drawn from an RNG keyed on
+``(seed, service, method, path, n-th request for that path)``, so a run is reproducible
+regardless of how concurrent requests interleave.
+
+``--api-http2`` serves the API over cleartext HTTP/2 instead (``API_TRANSPORT=http2``).
+
+Usage::
+
+    python -m benchmarks.standins snapshots/ --config faults.json --port 8700
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import queue
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from benchmarks.replay import iter_snapshots
+
+DEFAULT_PORT = 8700
+ACCOUNT_ID = "standin"
+# Smallest valid JPEG (1x1), served for every rewritten avatar / logo URL
+_PIXEL_JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912"
+    "130f141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b0800"
+    "01000101011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002"
+    "010303020403050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f024"
+    "33627282090a161718191a25262728292a3435363738393a434445464748494a535455565758595a63646566676869"
+    "6a737475767778797a838485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4"
+    "c5c6c7c8c9cad2d3d4d5d6d7d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3"
+    "ffd9"
+)
+_SRC_URL = re.compile(rb'src="https?://[^"]+"')
+
+
+class LatencyModel:
+    """Parse a latency spec and sample delays in seconds."""
+
+    def __init__(self, spec: str = "fixed:0") -> None:
+        self.spec = spec
+        kind, _, raw = spec.partition(":")
+        args = [float(part) for part in raw.split(",") if part.strip()] if raw else []
+        samplers: Dict[str, Callable[[random.Random], float]] = {
+            "fixed": lambda rng: args[0],
+            "uniform": lambda rng: rng.uniform(args[0], args[1]),
+            "lognormal": lambda rng: args[0] * math.exp(rng.gauss(0.0, args[1])),
+            "pareto": lambda rng: args[0] * rng.paretovariate(args[1]),
+        }
+        arity = {"fixed": 1, "uniform": 2, "lognormal": 2, "pareto": 2}
+        if kind not in samplers or len(args) != arity[kind]:
+            raise ValueError(f"Invalid latency spec {spec!r}; expected one of fixed:<ms>, uniform:<lo>,<hi>, "
+                             "lognormal:<median>,<sigma>, pareto:<scale>,<shape>")
+        self._sample = samplers[kind]
+
+    def sample(self, rng: random.Random) -> float:
+        return max(0.0, self._sample(rng)) / 1000.0
+
+
+class FaultProfile:
+    """Latency, error injection and throttling settings for one service."""
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        errors: Optional[Dict[str, float]] = None,
+        rps: Optional[float] = None,
+        burst: Optional[int] = None,
+    ) -> None:
+        self.latency = LatencyModel(latency)
+        self.error_rate = float(error_rate)
+        weights = errors or {"500": 1.0}
+        self.errors: List[Tuple[int, float]] = [(int(status), float(weight)) for status, weight in weights.items()]
+        self.rps = float(rps) if rps else None
+        self.burst = int(burst) if burst else max(1, int(self.rps or 1))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FaultProfile":
+        return cls(**{key: data[key] for key in ("latency", "error_rate", "errors", "rps", "burst") if key in data})
+
+    def pick_error(self, rng: random.Random) -> int:
+        total = sum(weight for _, weight in self.errors)
+        point = rng.uniform(0.0, total)
+        for status, weight in self.errors:
+            point -= weight
+            if point <= 0:
+                return status
+        return self.errors[-1][0]
+
+
+class _TokenBucket:
+    """Thread-safe token bucket; ``take`` returns False when the caller should be throttled."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self._rate = rate
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class StandIn:
+    """Shared state of one stand-in service: fault profile, seeded decisions and stats."""
+
+    name = "service"
+
+    def __init__(self, profile: FaultProfile, seed: int) -> None:
+        self.profile = profile
+        self.seed = seed
+        self._bucket = _TokenBucket(profile.rps, profile.burst) if profile.rps else None
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.injected_ms: List[float] = []
+        self.throttled = 0
+        self.injected_errors = 0
+        self.body_bytes = 0
+        self.connections = 0
+
+    def decide(self, method: str, path: str) -> Tuple[float, Optional[int]]:
+        """Return ``(delay_seconds, error_status or None)`` for one request."""
+        with self._lock:
+            count = self._counters.get((method, path), 0)
+            self._counters[(method, path)] = count + 1
+        rng = random.Random(f"{self.seed}:{self.name}:{method}:{path}:{count}")
+        delay = self.profile.latency.sample(rng)
+        if self._bucket is not None and not self._bucket.take():
+            with self._lock:
+                self.throttled += 1
+            return delay, 429
+        if self.profile.error_rate and rng.random() < self.profile.error_rate:
+            with self._lock:
+                self.injected_errors += 1
+            return delay, self.profile.pick_error(rng)
+        return delay, None
+
+    def observe(self, status: int, delay: float) -> None:
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.injected_ms.append(delay * 1000.0)
+
+    def count_body(self, length: int) -> None:
+        with self._lock:
+            self.body_bytes += length
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            delays = sorted(self.injected_ms)
+            statuses = dict(self.statuses)
+            throttled, injected, body_bytes = self.throttled, self.injected_errors, self.body_bytes
+            connections = self.connections
+
+        def pick(fraction: float) -> Optional[float]:
+            if not delays:
+                return None
+            return round(delays[min(len(delays), max(1, math.ceil(fraction * len(delays)))) - 1], 2)
+
+        return {
+            "requests": sum(statuses.values()),
+            "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            "throttled": throttled,
+            "injectedErrors": injected,
+            "requestBodyBytes": body_bytes,
+            "connections": connections,
+            "latencyMs": {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(delays[-1], 2) if delays else None},
+        }
+
+    # Subclasses implement the protocol ------------------------------------------------
+    def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        raise NotImplementedError
+
+    def error(self, status: int, method: str) -> Tuple[int, Dict[str, str], bytes]:
+        raise NotImplementedError
+
+    def is_exempt(self, path: str) -> bool:
+        """Paths served without latency or faults (warmup probes, stats, fixtures)."""
+        return path in ("", "/") or path == "/__stats"
+
+
+def _json(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    return status, {"Content-Type": "application/json", **(headers or {})}, json.dumps(payload).encode("utf-8")
+
+
+class ApiStandIn(StandIn):
+    """``users/<id>`` reads, profile PATCHes and ``users/mark-error``."""
+
+    name = "api"
+
+    def __init__(self, profile: FaultProfile, seed: int, users: Dict[str, Dict[str, Any]]) -> None:
+        super().__init__(profile, seed)
+        self.users = users
+        self.updates: Dict[str, int] = {}
+        self.errors_marked: Dict[str, str] = {}
+
+    def handle(self, method, path, body):
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts[:1] == ["api"]:
+            parts = parts[1:]
+        if method == "POST" and parts == ["users", "mark-error"]:
+            payload = json.loads(body or b"{}")
+            with self._lock:
+                self.errors_marked[payload.get("userId")] = payload.get("errorMessage")
+            return _json(200, {"success": True})
+        if method == "POST" and parts == ["users", "bulk-update"]:
+            updates = json.loads(body or b"{}").get("updates") or []
+            with self._lock:
+                for update in updates:
+                    self.updates[update.get("userId")] = self.updates.get(update.get("userId"), 0) + 1
+            return _json(200, {"success": True, "updated": len(updates)})
+        if len(parts) == 2 and parts[0] == "users":
+            user = self.users.get(parts[1])
+            if user is None:
+                return _json(404, {"success": False, "message": "User not found"})
+            if method == "GET":
+                return _json(200, {"success": True, "data": user})
+            if method == "PATCH":
+                json.loads(body or b"{}")
+                with self._lock:
+                    self.updates[parts[1]] = self.updates.get(parts[1], 0) + 1
+                return _json(200, {"success": True})
+        return _json(404, {"success": False, "message": f"No route for {method} {path}"})
+
+    def error(self, status, method):
+        headers = {"Retry-After": "1"} if status == 429 else {}
+        return _json(408 if status == 5408 else status, {"success": False, "message": f"Injected {status}"}, headers)
+
+
+class R2StandIn(StandIn):
+    """Path-style S3 ``HeadBucket``, ``HeadObject`` and ``GetObject`` over in-memory bytes."""
+
+    name = "r2"
+    _CODES = {404: "NoSuchKey", 429: "SlowDown", 500: "InternalError", 502: "BadGateway", 503: "SlowDown"}
+
+    def __init__(self, profile: FaultProfile, seed: int, objects: Dict[str, bytes]) -> None:
+        super().__init__(profile, seed)
+        self.objects = objects
+
+    def handle(self, method, path, body):
+        bucket, _, key = unquote(path.lstrip("/")).partition("/")
+        if not key:
+            return 200, {}, b""
+        data = self.objects.get(key)
+        if data is None:
+            return self.error(404, method)
+        headers = {
+            "Content-Type": "application/gzip" if key.endswith(".gz") else "text/html",
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+            "Content-Length": str(len(data)),
+        }
+        return 200, headers, data
+
+    def error(self, status, method):
+        status = 408 if status == 5408 else status
+        code = self._CODES.get(status, "InternalError")
+        xml = f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code><Message>Injected {status}</Message></Error>'
+        return status, {"Content-Type": "application/xml"}, xml.encode("utf-8")
+
+
+class CloudflareStandIn(StandIn):
+    """Images v1 upload/delete plus the ``/media/`` fixture host for avatar downloads."""
+
+    name = "cloudflare"
+
+    def __init__(self, profile: FaultProfile, seed: int, public_url: str) -> None:
+        super().__init__(profile, seed)
+        self.public_url = public_url
+        self.uploaded = 0
+        self.deleted = 0
+
+    def is_exempt(self, path):
+        return super().is_exempt(path) or path.startswith("/media/") or path.rstrip("/") == "/client/v4"
+
+    def handle(self, method, path, body):
+        if path.startswith("/media/"):
+            return 200, {"Content-Type": "image/jpeg"}, _PIXEL_JPEG
+        if path.rstrip("/") == "/client/v4":
+            return 200, {}, b""
+        parts = path.strip("/").split("/")
+        if parts[:3] == ["client", "v4", "accounts"] and parts[4:6] == ["images", "v1"]:
+            if method == "POST" and len(parts) == 6:
+                image_id = hashlib.sha1(body).hexdigest()[:16]
+                with self._lock:
+                    self.uploaded += 1
+                return _json(200, {
+                    "success": True,
+                    "result": {"id": image_id, "variants": [f"{self.public_url}/media/variants/{image_id}/public"]},
+                    "errors": [],
+                    "messages": [],
+                })
+            if method == "DELETE" and len(parts) == 7:
+                with self._lock:
+                    self.deleted += 1
+                return _json(200, {"success": True, "result": {}, "errors": [], "messages": []})
+        return _json(404, {"success": False, "errors": [{"code": 7003, "message": "No route"}]})
+
+    def error(self, status, method):
+        if status == 5408:
+            # Cloudflare's "slow connection" error, which the handler retries once after a pause
+            return _json(408, {"success": False, "errors": [{"code": 5408, "message": "Injected slow connection"}]})
+        headers = {"Retry-After": "1"} if status == 429 else {}
+        return _json(status, {"success": False, "errors": [{"code": status, "message": f"Injected {status}"}]}, headers)
+
+
+def _decode_body(body: bytes, encoding: str) -> bytes:
+    """Undo a request ``Content-Encoding`` (gzip, or zstd when ``zstandard`` is installed)."""
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    raise ValueError(encoding)
+
+
+def _respond(
+    service: StandIn, method: str, target: str, headers: Dict[str, str], body: bytes
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Apply faults and the service protocol to one request (shared by HTTP/1.1 and h2c)."""
+    path = urlsplit(target).path
+    service.count_body(len(body))
+    encoding = (headers.get("content-encoding") or "").lower()
+
+    if encoding and encoding != "identity":
+        try:
+            body = _decode_body(body, encoding)
+        except (OSError, ValueError, ImportError):
+            body = None
+    if body is None:
+        status, response_headers, payload = _json(415, {"success": False, "message": f"Unsupported Content-Encoding {encoding}"})
+    elif path == "/__stats":
+        status, response_headers, payload = _json(200, service.stats())
+    elif service.is_exempt(path):
+        status, response_headers, payload = service.handle(method, path, body)
+    else:
+        delay, fault = service.decide(method, path)
+        if delay:
+            time.sleep(delay)
+        status, response_headers, payload = service.error(fault, method) if fault else service.handle(method, path, body)
+        service.observe(status, delay)
+
+    if (
+        len(payload) >= 1024
+        and "gzip" in (headers.get("accept-encoding") or "")
+        and response_headers.get("Content-Type") == "application/json"
+        and "Content-Encoding" not in response_headers
+    ):
+        payload = gzip.compress(payload, compresslevel=5)
+        response_headers = {**response_headers, "Content-Encoding": "gzip"}
+    return status, response_headers, payload
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StandInServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.service.count_connection()
+
+    def _dispatch(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        request_headers = {name.lower(): value for name, value in self.headers.items()}
+        status, headers, payload = _respond(self.server.service, self.command, self.path, request_headers, body)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            if name != "Content-Length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_HEAD = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        return None
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes bursts of new connections wait out a SYN retransmit
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], service: StandIn) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that abandon a response (hedging losers, timeouts) are expected here
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class _H2Handler(socketserver.BaseRequestHandler):
+    """One cleartext HTTP/2 (prior knowledge) connection.
+
+    Frames are read on the connection thread; each completed stream is answered on the
+    server's executor so injected latency overlaps across multiplexed requests. Outbound
+    bytes go through a queue drained by a sender thread, so the reader never blocks on a
+    full socket while the peer waits for a window update.
+    """
+
+    server: "_H2StandInServer"
+
+    def handle(self) -> None:
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        self.server.service.count_connection()
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.state = threading.Condition()
+        self.outbox: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        sender = threading.Thread(target=self._send_loop, daemon=True)
+        sender.start()
+        streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        with self.state:
+            self.conn.initiate_connection()
+            self._flush()
+
+        try:
+            while True:
+                try:
+                    data = self.request.recv(65535)
+                except OSError:
+                    return
+                if not data:
+                    return
+                with self.state:
+                    for event in self.conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            streams[event.stream_id] = (dict(event.headers), bytearray())
+                        elif isinstance(event, h2.events.DataReceived):
+                            streams[event.stream_id][1].extend(event.data)
+                            self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            headers, body = streams.pop(event.stream_id)
+                            self.server.executor.submit(self._answer, event.stream_id, headers, bytes(body))
+                        elif isinstance(event, (h2.events.WindowUpdated, h2.events.RemoteSettingsChanged)):
+                            self.state.notify_all()
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    self._flush()
+        finally:
+            self.outbox.put(None)
+            sender.join()
+
+    def _flush(self) -> None:
+        """Queue pending frames (call with ``state`` held so frame order is preserved)."""
+        data = self.conn.data_to_send()
+        if data:
+            self.outbox.put(data)
+
+    def _send_loop(self) -> None:
+        while True:
+            data = self.outbox.get()
+            if data is None:
+                return
+            try:
+                self.request.sendall(data)
+            except OSError:
+                return
+
+    def _answer(self, stream_id: int, headers: Dict[str, str], body: bytes) -> None:
+        method = headers.get(":method", "GET")
+        status, response_headers, payload = _respond(self.server.service, method, headers.get(":path", "/"), headers, body)
+        if method == "HEAD":
+            payload = b""
+        fields = [(":status", str(status))] + [
+            (name.lower(), value) for name, value in response_headers.items() if name.lower() != "content-length"
+        ]
+        fields.append(("content-length", str(len(payload))))
+        with self.state:
+            self.conn.send_headers(stream_id, fields, end_stream=not payload)
+            while payload:
+                window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+                if window <= 0:
+                    self._flush()
+                    self.state.wait(0.05)
+                    continue
+                chunk, payload = payload[:window], payload[window:]
+                self.conn.send_data(stream_id, chunk, end_stream=not payload)
+            self._flush()
+
+
+class _H2StandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], service: StandIn) -> None:
+        super().__init__(address, _H2Handler)
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=256, thread_name_prefix=f"standin-h2-{service.name}")
+
+
+def _rewrite_media(html: bytes, media_url: str) -> bytes:
+    """Point every absolute ``src`` URL at the local media fixture so no real host is contacted."""
+    counter = iter(range(1 << 30))
+    return _SRC_URL.sub(lambda _: f'src="{media_url}/media/{next(counter)}.jpg"'.encode("ascii"), html)
+
+
+def load_fixtures(source: Path, media_url: Optional[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, bytes]]:
+    """Build user documents and R2 objects from a snapshot directory or tarball."""
+    users: Dict[str, Dict[str, Any]] = {}
+    objects: Dict[str, bytes] = {}
+    for user_id, key, data in iter_snapshots(source):
+        if isinstance(data, str):
+            data = Path(data).read_bytes()
+        if media_url:
+            if key.endswith(".gz"):
+                data = gzip.compress(_rewrite_media(gzip.decompress(data), media_url), mtime=0)
+            else:
+                data = _rewrite_media(data, media_url)
+        objects[key] = data
+        users[user_id] = {"_id": user_id, "htmlPath": key, "scrapped": True, "descriptionGenerated": False}
+    return users, objects
+
+
+def start(
+    source: Path,
+    *,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    profiles: Optional[Dict[str, FaultProfile]] = None,
+    seed: int = 0,
+    rewrite_media: bool = True,
+    api_http2: bool = False,
+) -> Tuple[List[socketserver.TCPServer], Dict[str, str]]:
+    """Start the three stand-ins on ``port``..``port + 2`` and return ``(servers, env)``."""
+    profiles = profiles or {}
+    cloudflare_root = f"http://{host}:{port + 2}"
+    users, objects = load_fixtures(source, cloudflare_root if rewrite_media else None)
+    services = [
+        ApiStandIn(profiles.get("api", FaultProfile()), seed, users),
+        R2StandIn(profiles.get("r2", FaultProfile()), seed, objects),
+        CloudflareStandIn(profiles.get("cloudflare", FaultProfile()), seed, cloudflare_root),
+    ]
+    servers: List[socketserver.TCPServer] = [
+        (_H2StandInServer if api_http2 and offset == 0 else _StandInServer)((host, port + offset), service)
+        for offset, service in enumerate(services)
+    ]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, name=f"standin-{server.service.name}", daemon=True).start()
+    env = {
+        "BASE_API_URL": f"http://{host}:{port}",
+        "R2_ENDPOINT_URL": f"http://{host}:{port + 1}",
+        "CLOUDFLARE_API_BASE_URL": f"{cloudflare_root}/client/v4",
+        "CLOUDFLARE_ACCOUNT_ID": ACCOUNT_ID,
+    }
+    return servers, env
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Directory or tarball of .html / .html.gz snapshots")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="API port; R2 and Cloudflare use the next two")
+    parser.add_argument("--config", type=Path, help="JSON fault profiles keyed by api / r2 / cloudflare")
+    parser.add_argument("--latency", help="Latency spec applied to every service without its own profile")
+    parser.add_argument("--error-rate", type=float, help="Error rate applied to every service without its own profile")
+    parser.add_argument("--rps", type=float, help="Per-service request rate before 429s (token bucket)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds (default: until Ctrl-C)")
+    parser.add_argument("--keep-media-urls", action="store_true", help="Do not rewrite image URLs to the local media host")
+    parser.add_argument("--api-http2", action="store_true", help="Serve the API over cleartext HTTP/2 (needs h2)")
+    args = parser.parse_args(argv)
+
+    defaults = {
+        key: value
+        for key, value in (("latency", args.latency), ("error_rate", args.error_rate), ("rps", args.rps))
+        if value is not None
+    }
+    configured = json.loads(args.config.read_text(encoding="utf-8")) if args.config else {}
+    profiles = {
+        name: FaultProfile.from_dict({**defaults, **configured.get(name, {})})
+        for name in ("api", "r2", "cloudflare")
+    }
+
+    servers, env = start(
+        args.source,
+        host=args.host,
+        port=args.port,
+        profiles=profiles,
+        seed=args.seed,
+        rewrite_media=not args.keep_media_urls,
+        api_http2=args.api_http2,
+    )
+    print(f"Serving {len(servers[0].service.users)} users. Point the processor at the stand-ins with:")
+    for key, value in env.items():
+        print(f"export {key}={value}")
+    sys.stdout.flush()
+
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        print(json.dumps({server.service.name: server.service.stats() for server in servers}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Synthetic profile HTML generator for scaling tests.
+
+Emits markup with the same structure the extractors in ``bs.scrape`` expect (basic
+profile header, experience groups, education, skills, recommendations,
+accomplishments, contacts), parameterised by size so that worst-case shapes — 50+
+positions, multi-role companies, hundreds of skills — can be produced on demand.
+
+Usage::
+
+    python -m benchmarks.synthetic --roles 60 --roles-per-company 4 --skills 300 > huge.html
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import random
+import sys
+from typing import Iterable, List, Optional
+
+ALL_SECTIONS = (
+    "about",
+    "experience",
+    "education",
+    "skills",
+    "contacts",
+    "recommendations",
+    "accomplishments",
+)
+
+_WORDS = (
+    "platform", "data", "pipeline", "customer", "migration", "latency", "service", "design",
+    "team", "reliability", "analytics", "delivery", "payments", "search", "infrastructure",
+    "product", "growth", "roadmap", "security", "mobile", "strategy", "research", "quality",
+)
+# Words carrying the accents, ligatures and non-Latin scripts clean_string has to normalise
+_UNICODE_WORDS = (
+    "Müller", "naïve", "café", "Zürich", "Ørsted", "façade", "résumé", "São Paulo", "Kraków",
+    "Œuvre", "ﬁnance", "Ελλάδα", "東京", "München", "Straße", "—", "…", "🚀",
+)
+_COMPANIES = ("Northwind", "Contoso", "Fabrikam", "Tailspin", "Litware", "Adatum", "Wingtip", "Proseware")
+_TITLES = ("Engineer", "Senior Engineer", "Staff Engineer", "Manager", "Director", "Analyst", "Consultant")
+_ACCOMPLISHMENT_TYPES = ("Languages", "Certifications", "Courses", "Projects", "Publications", "Honors", "Organizations")
+
+
+class _Text:
+    """Deterministic filler text with a configurable share of unicode-heavy words."""
+
+    def __init__(self, rng: random.Random, unicode_density: float) -> None:
+        self._rng = rng
+        self._density = max(0.0, min(1.0, unicode_density))
+
+    def words(self, count: int) -> str:
+        out: List[str] = []
+        for _ in range(count):
+            pool = _UNICODE_WORDS if self._rng.random() < self._density else _WORDS
+            out.append(self._rng.choice(pool))
+        return html.escape(" ".join(out))
+
+    def sentence(self, low: int = 8, high: int = 24) -> str:
+        return self.words(self._rng.randint(low, high)).capitalize() + "."
+
+
+def _bullets(text: _Text, depth: int, width: int = 3) -> str:
+    """Nested ``<ul>`` bullet lists ``depth`` levels deep (as seen in rich descriptions)."""
+    if depth <= 0:
+        return ""
+    items = "".join(f"<li>{text.words(6)}{_bullets(text, depth - 1, width)}</li>" for _ in range(width))
+    return f"<ul>{items}</ul>"
+
+
+def _role_body(text: _Text, rng: random.Random, nesting_depth: int) -> str:
+    start = rng.randint(2000, 2022)
+    return (
+        f'<div class="body-medium-bold">{rng.choice(_TITLES)}</div>'
+        f'<div class="body-small"><span>Jan {start}</span><span>Dec {start + rng.randint(0, 3)}</span><span>2 yrs</span></div>'
+        f'<div class="body-small">{text.words(2)}, Country</div>'
+        f'<div class="body-small"><div class="description">{text.sentence(20, 60)}{_bullets(text, nesting_depth)}</div></div>'
+    )
+
+
+def _experience(text: _Text, rng: random.Random, roles: int, roles_per_company: int, nesting_depth: int) -> str:
+    items: List[str] = []
+    remaining = roles
+    company_index = 0
+    while remaining > 0:
+        company = f"{_COMPANIES[company_index % len(_COMPANIES)]} {company_index}"
+        slug = company.lower().replace(" ", "-")
+        group = min(remaining, max(1, roles_per_company))
+        logo = f"https://media.example.com/image/company-logo/{slug}.png"
+        if group == 1:
+            items.append(
+                '<li class="profile-section-card"><ul><li>'
+                f'<a href="https://www.example.com/company/{slug}/?trk=p"><img src="{logo}" alt=""></a>'
+                '<div class="flex-column">'
+                f'<div class="body-medium-bold">{rng.choice(_TITLES)}</div>'
+                f'<div class="body-small"><span dir="ltr">{company}</span></div>'
+                '<div class="body-small"><span>Jan 2015</span><span>Mar 2018</span>'
+                '<span class="dot-separator" aria-hidden="true">·</span><span>3 yrs</span></div>'
+                f'<div class="body-small">{text.words(2)}</div>'
+                f'<div class="body-small"><div class="description">{text.sentence(20, 60)}{_bullets(text, nesting_depth)}</div></div>'
+                "</div></li></ul></li>"
+            )
+        else:
+            positions = "".join(
+                f'<li><div class="timeline-dot"></div><div class="flex-column">{_role_body(text, rng, nesting_depth)}</div></li>'
+                for _ in range(group)
+            )
+            items.append(
+                '<li class="profile-section-card">'
+                f'<a href="https://www.example.com/company/{slug}/?trk=p"><img src="{logo}" alt="">'
+                f'<div><span class="body-medium-bold"><span dir="ltr">{company}</span></span></div></a>'
+                f"<ul>{positions}</ul></li>"
+            )
+        remaining -= group
+        company_index += 1
+    return (
+        '<section class="core-section-container experience-container"><h2>Experience</h2>'
+        f'<ol>{"".join(items)}</ol></section>'
+    )
+
+
+def _education(text: _Text, count: int) -> str:
+    items = "".join(
+        '<li><a class="flex grow pv-editable-link" href="https://www.example.com/school/s{0}/">'
+        '<img src="https://media.example.com/image/school-logo/s{0}.png" alt="">'
+        '<div class="self-center">'
+        "<div>{1} University</div>"
+        '<div class="body-small"><span>Master of Science</span><span class="dot-separator">·</span><span>{2}</span></div>'
+        '<div class="body-small"><span>2010</span><span>2012</span></div>'
+        '<div class="description">{3}</div>'
+        "</div></a></li>".format(index, text.words(2), text.words(2), text.sentence())
+        for index in range(count)
+    )
+    return f'<section class="core-section-container education-container"><h2>Education</h2><ol>{items}</ol></section>'
+
+
+def _skills(text: _Text, count: int) -> str:
+    items = "".join(f'<li class="skill-item body-medium">{text.words(2)}</li>' for _ in range(count))
+    return f'<section class="core-section-container skills-container"><h2>Skills</h2><ol class="skills-list">{items}</ol></section>'
+
+
+def _recommendations(text: _Text, count: int) -> str:
+    items = "".join(
+        f'<li><a href="https://www.example.com/in/person-{index}?trk=r"><dl><dt>Person {index}</dt></dl></a>'
+        f'<div class="recommendation-text">{text.sentence(30, 120)}</div></li>'
+        for index in range(count)
+    )
+    return f'<section class="core-section-container"><h2>Recommendations</h2><ul class="recommendation-list">{items}</ul></section>'
+
+
+def _accomplishments(text: _Text, per_type: int) -> str:
+    blocks: List[str] = []
+    for type_name in _ACCOMPLISHMENT_TYPES:
+        items = "".join(
+            '<li class="sub-list-item">'
+            f'<div class="list-item-heading">{text.words(3)}</div>'
+            f'<div class="body-small"><span dir="ltr">{text.words(2)}</span><span class="dot-separator">·</span><span class="date">2020</span></div>'
+            f'<div class="body-small">{text.words(4)}</div>'
+            "</li>"
+            for _ in range(per_type)
+        )
+        blocks.append(f'<div class="accomplishment-type"><h3>{type_name}</h3><ul>{items}</ul></div>')
+    return (
+        '<section class="core-section-container"><h2>Accomplishments</h2>'
+        f'<div id="accomplishment-section">{"".join(blocks)}</div></section>'
+    )
+
+
+def generate_profile_html(
+    roles: int = 10,
+    *,
+    roles_per_company: int = 1,
+    nesting_depth: int = 0,
+    sections: Optional[Iterable[str]] = None,
+    unicode_density: float = 0.05,
+    skills: int = 20,
+    recommendations: int = 3,
+    educations: int = 2,
+    accomplishments_per_type: int = 2,
+    seed: int = 0,
+) -> str:
+    """Return a structurally faithful profile page.
+
+    ``roles`` positions are grouped ``roles_per_company`` at a time (1 → single-role
+    entries, >1 → multi-role company groups); ``nesting_depth`` adds nested bullet
+    ``<ul>`` lists inside each description; ``sections`` restricts which optional
+    sections are present (default: all of ``ALL_SECTIONS``); ``unicode_density`` is the
+    fraction of filler words drawn from accented / non-Latin vocabulary.
+    """
+    rng = random.Random(seed)
+    text = _Text(rng, unicode_density)
+    present = set(ALL_SECTIONS if sections is None else sections)
+    unknown = present - set(ALL_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections: {sorted(unknown)}")
+
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Synthetic Profile</title></head><body>',
+        '<section class="basic-profile-section">'
+        '<figure id="profile-picture-container"><img src="https://media.example.com/image/profile-displayphoto/0/synthetic.jpg"></figure>'
+        '<div class="cover"></div><div class="actions"></div><div class="flex-column">'
+        f"<div>Synthetic Person</div><div>{text.sentence(6, 14)}</div><div>{text.words(3)}</div>"
+        f'<div>{text.words(2)}, Country<span class="dot-separator" aria-hidden="true">·</span><span>500+ followers</span></div>'
+        "</div></section>",
+    ]
+    if "about" in present:
+        parts.append(f'<section class="about-section"><h2>About</h2><div>{" ".join(text.sentence() for _ in range(6))}</div></section>')
+    if "experience" in present:
+        parts.append(_experience(text, rng, roles, roles_per_company, nesting_depth))
+    if "education" in present:
+        parts.append(_education(text, educations))
+    if "contacts" in present:
+        parts.append(
+            '<section class="core-section-container contacts-container"><h2>Contact</h2>'
+            "<dl><dt>Email</dt> <dd>synthetic@example.com</dd>"
+            "<dt>Website</dt> <dd>https://synthetic.example.org</dd></dl></section>"
+        )
+    if "skills" in present:
+        parts.append(_skills(text, skills))
+    if "recommendations" in present:
+        parts.append(_recommendations(text, recommendations))
+    if "accomplishments" in present:
+        parts.append(_accomplishments(text, accomplishments_per_type))
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roles", type=int, default=10)
+    parser.add_argument("--roles-per-company", type=int, default=1)
+    parser.add_argument("--nesting-depth", type=int, default=0)
+    parser.add_argument("--sections", default=",".join(ALL_SECTIONS), help="Comma-separated optional sections to include")
+    parser.add_argument("--unicode-density", type=float, default=0.05)
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--recommendations", type=int, default=3)
+    parser.add_argument("--educations", type=int, default=2)
+    parser.add_argument("--accomplishments-per-type", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.stdout.write(
+        generate_profile_html(
+            args.roles,
+            roles_per_company=args.roles_per_company,
+            nesting_depth=args.nesting_depth,
+            sections=[part for part in args.sections.split(",") if part],
+            unicode_density=args.unicode_density,
+            skills=args.skills,
+            recommendations=args.recommendations,
+            educations=args.educations,
+            accomplishments_per_type=args.accomplishments_per_type,
+            seed=args.seed,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Section location for a parsed profile in a single walk of the tree.
+
+Each section is described by a ``FieldSpec``: an ordered list of selectors for its root
+element (primary first, then fallbacks) and a post-processor that extracts the value
+from the located root. ``compile_plan`` indexes every selector by tag name so that
+``ExtractionPlan.locate`` can find all section roots in one pass over the tree,
+dispatching each node only to the selectors interested in its tag.
+
+Only the roots are located declaratively. The post-processors are the existing
+extractors, which still search within their own section (``find``/``find_all`` and
+regex passes), so each section's subtree is walked again by its extractor.
+"""
+
+import re
+
+from bs4 import Tag
+
+
+def _class_matches(tag, predicate):
+    """Apply ``predicate`` to the tag's classes the way ``find(class_=...)`` does.
+
+    Beautiful Soup tests each class value individually and, failing that (for zero or
+    several classes), the space-joined attribute value.
+    """
+    value = tag.get("class")
+    values = value if isinstance(value, list) else [value]
+    if any(predicate(item) for item in values):
+        return True
+    if len(values) != 1:
+        return bool(predicate(" ".join(values)))
+    return False
+
+
+class Selector:
+    """Base selector; subclasses decide whether a node of ``tag_name`` matches."""
+
+    tag_name = None
+
+    def matches(self, tag, context):
+        raise NotImplementedError
+
+
+class ClassSelector(Selector):
+    """Match ``<tag_name>`` elements by class, mirroring ``find(tag_name, class_=...)``.
+
+    ``exact`` reproduces ``class_="token"``; otherwise the token only has to appear in a
+    class value (``class_=lambda x: x and token in x``), optionally case-insensitively.
+    """
+
+    def __init__(self, tag_name, token, exact=False, ignore_case=False):
+        self.tag_name = tag_name
+        self.token = token
+        if exact:
+            self._predicate = lambda value: value == token
+        elif ignore_case:
+            self._predicate = lambda value: bool(value) and token in value.lower()
+        else:
+            self._predicate = lambda value: bool(value) and token in value
+
+    def matches(self, tag, context):
+        return _class_matches(tag, self._predicate)
+
+    def __repr__(self):
+        return f"ClassSelector({self.tag_name!r}, {self.token!r})"
+
+
+class HeadingSelector(Selector):
+    """Match a ``<section>`` whose first ``h2``/``h3`` contains ``heading_text`` as a word.
+
+    Equivalent to ``find_section_by_heading``; the heading text is computed once per
+    section and shared by every heading selector in the plan.
+    """
+
+    tag_name = "section"
+
+    def __init__(self, heading_text):
+        self.heading_text = heading_text
+        self._pattern = re.compile(rf"\b{re.escape(heading_text)}\b", re.IGNORECASE)
+
+    def matches(self, tag, context):
+        if "heading" not in context:
+            heading = tag.find(["h2", "h3"])
+            context["heading"] = heading.get_text(strip=True) if heading else None
+        return context["heading"] is not None and bool(self._pattern.search(context["heading"]))
+
+    def __repr__(self):
+        return f"HeadingSelector({self.heading_text!r})"
+
+
+class FieldSpec:
+    """How to locate one section's root element and which extractor turns it into a value.
+
+    ``selectors`` are tried in order. With ``fallback_on_empty`` the next selector is
+    used whenever ``post`` yields a falsy value, otherwise only when no node matched.
+    """
+
+    def __init__(self, name, selectors, post=None, fallback_on_empty=True):
+        self.name = name
+        self.selectors = tuple(selectors)
+        self.post = post or (lambda node: node)
+        self.fallback_on_empty = fallback_on_empty
+
+
+class ExtractionPlan:
+    """Compiled plan: section selectors indexed by tag name for single-pass location."""
+
+    def __init__(self, fields):
+        self.fields = {field.name: field for field in fields}
+        self._dispatch_cache = {}
+
+    def _dispatch(self, names):
+        """Return ``{tag_name: [(field_name, selector_index, selector), ...]}`` for ``names``."""
+        key = tuple(names)
+        if key not in self._dispatch_cache:
+            dispatch = {}
+            for name in names:
+                for index, selector in enumerate(self.fields[name].selectors):
+                    dispatch.setdefault(selector.tag_name, []).append((name, index, selector))
+            self._dispatch_cache[key] = dispatch
+        return self._dispatch_cache[key]
+
+    def locate(self, soup, names=None):
+        """Walk ``soup`` once and return ``{field: [first match per selector or None]}``."""
+        names = tuple(self.fields) if names is None else tuple(names)
+        dispatch = self._dispatch(names)
+        found = {name: [None] * len(self.fields[name].selectors) for name in names}
+        remaining = sum(len(slots) for slots in found.values())
+
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            interested = dispatch.get(node.name)
+            if not interested:
+                continue
+            context = {}
+            for name, index, selector in interested:
+                slots = found[name]
+                if slots[index] is None and selector.matches(node, context):
+                    slots[index] = node
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
+
+    def extract(self, name, located, default=None):
+        """Run the field's post-processor over its located candidates in selector order."""
+        field = self.fields[name]
+        for node in located.get(name, ()):
+            if node is None:
+                continue
+            value = field.post(node)
+            if value or not field.fallback_on_empty:
+                return value
+        return default
+
+
+def compile_plan(fields):
+    """Validate ``fields`` and return an ``ExtractionPlan``."""
+    fields = list(fields)
+    names = [field.name for field in fields]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate field names in extraction plan: {duplicates}")
+    for field in fields:
+        if not field.selectors:
+            raise ValueError(f"Field {field.name!r} has no selectors")
+        for selector in field.selectors:
+            if not selector.tag_name:
+                raise ValueError(f"Selector {selector!r} of field {field.name!r} has no tag name")
+    return ExtractionPlan(fields)
+
+
+__all__ = [
+    "ClassSelector",
+    "ExtractionPlan",
+    "FieldSpec",
+    "HeadingSelector",
+    "Selector",
+    "compile_plan",
+]
@@ -0,0 +1,232 @@
+"""Slotted records for repeated profile entities (experience, education, recommendations, ...).
+
+Extractors build these instead of one dict per entry: a slotted instance stores its values
+in fixed slots rather than a per-entry hash table of repeated key strings, and the
+high-repetition values (company and school URLs, logos, names) go through an
+``IdentityCache`` so identical strings across entries, and across users in a warm
+container, share one object. Attribute names are the JSON keys and field order is the key
+order, so ``to_payload`` (or orjson, which serializes dataclasses natively) reproduces
+exactly the dict shape the API has always received.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+# Entries kept per identity cache; a batch rarely touches more distinct companies or schools
+IDENTITY_CACHE_SIZE = 4096
+
+
+class IdentityCache:
+    """Bounded LRU from raw extracted text to one shared, normalized string.
+
+    Module-level instances outlive a single profile, so a warm container normalizes each
+    company or school once and every later entry reuses the same object. Unlike
+    ``sys.intern`` the table is bounded: the least recently used values are dropped.
+    """
+
+    def __init__(self, normalize=None, maxsize=IDENTITY_CACHE_SIZE):
+        self.normalize = normalize
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw):
+        """Return the normalized value for ``raw`` (``None`` and ``""`` are not cached)."""
+        if not raw:
+            return self.normalize(raw) if self.normalize else raw
+        with self._lock:
+            value = self._entries.get(raw)
+            if value is not None:
+                self._entries.move_to_end(raw)
+                self.hits += 1
+                return value
+        value = self.normalize(raw) if self.normalize else raw
+        with self._lock:
+            self.misses += 1
+            self._entries[raw] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@dataclass(frozen=True, slots=True)
+class Experience:
+    companyUrl: str
+    companyLogo: str | None
+    title: str
+    companyName: str
+    duration: str
+    location: str
+    description: str
+
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    school: str
+    schoolUrl: str
+    schoolLogo: str | None
+    degree: str
+    field_of_study: str
+    dates: str
+    description: str
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    recommendationGivenBy: str
+    recommendationGivenByUrl: str
+    recommendation: str
+
+
+@dataclass(frozen=True, slots=True)
+class Course:
+    courseName: str
+    courseNumber: str
+    associatedWith: str
+
+
+@dataclass(frozen=True, slots=True)
+class Accomplishment:
+    """Honors and the catch-all accomplishment types."""
+
+    accomplishment: str
+    accomplishmentFrom: str
+    accomplishmentDate: str
+
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    projectName: str
+    date: str
+    projectDescription: str
+
+
+@dataclass(frozen=True, slots=True)
+class Certification:
+    certificateName: str
+    certificateFrom: str
+    date: str
+
+
+@dataclass(frozen=True, slots=True)
+class Publication:
+    topic: str
+    publication: str
+    date: str
+
+
+@dataclass(frozen=True, slots=True)
+class Organization:
+    name: str
+    date: str
+
+
+RECORD_TYPES = (
+    Experience,
+    Education,
+    Recommendation,
+    Course,
+    Accomplishment,
+    Project,
+    Certification,
+    Publication,
+    Organization,
+)
+
+
+# Repeated identity fields hoisted into a shared table by ``compact_profile``:
+# profile key -> (table key, reference key, record type, identity fields)
+COMPACT_SECTIONS = {
+    "workExperience": ("companies", "companyRef", Experience, ("companyUrl", "companyLogo", "companyName")),
+    "education": ("schools", "schoolRef", Education, ("schoolUrl", "schoolLogo", "school")),
+}
+
+
+def record_to_dict(record):
+    """Return the API dict for one record (keys in field order)."""
+    return {name: getattr(record, name) for name in record.__slots__}
+
+
+def to_payload(value):
+    """Recursively replace records in ``value`` with their API dicts.
+
+    Only needed where something other than ``serialization.dumps`` consumes scraped
+    profiles (for example comparisons against stored JSON).
+    """
+    if isinstance(value, RECORD_TYPES):
+        return record_to_dict(value)
+    if isinstance(value, dict):
+        return {key: to_payload(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_payload(item) for item in value]
+    return value
+
+
+def compact_profile(profile):
+    """Return ``profile`` with company and school identities replaced by table references.
+
+    Each experience entry's ``companyUrl``/``companyLogo``/``companyName`` becomes a
+    ``companyRef`` index into ``profile["companies"]`` (education likewise with ``schoolRef``
+    and ``schools``), so a company listed for several roles is stored once. Sections where
+    no identity repeats are left as they are. ``expand_profile`` reverses it.
+    """
+    compact = dict(profile)
+    for key, (table_key, ref_key, _, identity_fields) in COMPACT_SECTIONS.items():
+        entries = profile.get(key)
+        if not entries:
+            continue
+        table = []
+        index = {}
+        compacted = []
+        for entry in entries:
+            entry = to_payload(entry)
+            identity = tuple(entry.get(name) for name in identity_fields)
+            ref = index.get(identity)
+            if ref is None:
+                ref = index[identity] = len(table)
+                table.append(dict(zip(identity_fields, identity)))
+            item = {ref_key: ref}
+            item.update((name, value) for name, value in entry.items() if name not in identity_fields)
+            compacted.append(item)
+        if len(table) == len(entries):
+            continue  # nothing repeats, references would only add bytes
+        compact[key] = compacted
+        compact[table_key] = table
+    return compact
+
+
+def expand_profile(profile):
+    """Undo ``compact_profile``; profiles without reference tables are returned unchanged."""
+    if not any(table_key in profile for table_key, _, _, _ in COMPACT_SECTIONS.values()):
+        return profile
+    expanded = dict(profile)
+    for key, (table_key, ref_key, record_type, _) in COMPACT_SECTIONS.items():
+        table = expanded.pop(table_key, None)
+        entries = profile.get(key)
+        if table is None or not entries:
+            continue
+        expanded[key] = [_expand_entry(entry, table, ref_key, record_type) for entry in entries]
+    return expanded
+
+
+def _expand_entry(entry, table, ref_key, record_type):
+    if ref_key not in entry:
+        return entry
+    fields = dict(table[entry[ref_key]])
+    fields.update((name, value) for name, value in entry.items() if name != ref_key)
+    try:
+        return record_type(**fields)
+    except TypeError:
+        # Stored by a version with different fields: keep the data as a plain dict
+        return fields
@@ -1,10 +1,10 @@
 import re
 import json
-from bs4 import BeautifulSoup
+import time
+import hashlib
+import codecs
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import unicodedata
-import subprocess
-import os
-from dotenv import load_dotenv
 
 
 #TODO: Uncomment this to run local file
@@ -26,12 +26,24 @@ from dotenv import load_dotenv
 
 # Get the logger
 from logging_config import setup_logger
+from bs.plan import ClassSelector, FieldSpec, HeadingSelector, compile_plan
+from bs.records import (
+    Accomplishment,
+    Certification,
+    Course,
+    Education,
+    Experience,
+    Organization,
+    Project,
+    Publication,
+    Recommendation,
+    IdentityCache,
+    to_payload,
+)
 
 logger = setup_logger("bs.scrape")
 logger.debug("Logger initialized")
 
-load_dotenv()
-
  
 def clean_string(s):
     """Clean and normalize string."""
@@ -60,6 +72,17 @@ def clean_string(s):
     return s.strip()
 
 
+# Warm-container memos for company and school identities, shared by every profile scraped
+# in this process: raw text -> normalized string, one object per distinct value
+_IDENTITY_NAMES = IdentityCache(clean_string)
+_IDENTITY_URLS = IdentityCache()
+
+
+def identity_cache_stats():
+    """Return size and hit/miss counts of the company/school identity caches."""
+    return {"names": _IDENTITY_NAMES.stats(), "urls": _IDENTITY_URLS.stats()}
+
+
 def clean_html(raw_html):
     """Remove HTML tags from string."""
     cleanr = re.compile("<.*?>")
@@ -82,11 +105,12 @@ def extract_contact_info(contacts_text):
 
 
 def extract_skills(skills_section):
-    """Extract skills from section."""
+    """Extract skills from a section body (or a regex match whose group 1 is the body)."""
     skills = []
     if skills_section:
+        body = skills_section if isinstance(skills_section, str) else skills_section.group(1)
         skills_list = re.findall(
-            r'<ol class="skills-list.*?">(.*?)</ol>', skills_section.group(1), re.DOTALL
+            r'<ol class="skills-list.*?">(.*?)</ol>', body, re.DOTALL
         )
         if skills_list:
             skills_items = re.findall(
@@ -97,10 +121,17 @@ def extract_skills(skills_section):
     return skills
 
 
+def _as_soup(html):
+    """Return ``html`` unchanged if it is already a parsed tree, otherwise parse it."""
+    return html if isinstance(html, Tag) else BeautifulSoup(html, "html.parser")
+
 def fetch_current_location(html):
     """Fetch the current location from the profile section."""
-    soup = BeautifulSoup(html, "html.parser")
-    basic_profile_section = soup.find("section", class_="basic-profile-section")
+    soup = _as_soup(html)
+    return location_from_basic_profile(soup.find("section", class_="basic-profile-section"))
+
+def location_from_basic_profile(basic_profile_section):
+    """Extract the current location from an already located basic profile section."""
     div_tags = basic_profile_section.find_all("div", recursive=False) if basic_profile_section else []
     
     if len(div_tags) >= 3:
@@ -132,8 +163,11 @@ def fetch_current_location(html):
 
 def fetch_bio_section(html):
     """Fetch the bio from the profile section."""
-    soup = BeautifulSoup(html, "html.parser")
-    basic_profile_section = soup.find("section", class_="basic-profile-section")
+    soup = _as_soup(html)
+    return bio_from_basic_profile(soup.find("section", class_="basic-profile-section"))
+
+def bio_from_basic_profile(basic_profile_section):
+    """Extract the bio (headline) from an already located basic profile section."""
     div_tags = basic_profile_section.find_all("div", recursive=False) if basic_profile_section else []
     about_text = ""
     if len(div_tags) >= 3:
@@ -219,7 +253,7 @@ def extract_education(education_section):
         divs = content_div.find_all('div', recursive=False)
         for i, div in enumerate(divs):
             if i == 0:  # First div is usually school name
-                school = clean_string(div.get_text())
+                school = _IDENTITY_NAMES.get(div.get_text())
             elif i == 1 and 'body-small' in (div.get('class') or []):  # Second div contains degree and field of study
                 spans = div.find_all('span')
                 if spans:
@@ -239,15 +273,15 @@ def extract_education(education_section):
         if description_div:
             description = clean_string(description_div.get_text())
    
-        educations.append({
-            "school": school,
-            "schoolUrl": school_url,
-            "schoolLogo": school_logo,
-            "degree": degree,
-            "field_of_study": field_of_study,
-            "dates": dates,
-            "description": description
-        })
+        educations.append(Education(
+            school=school,
+            schoolUrl=_IDENTITY_URLS.get(school_url),
+            schoolLogo=_IDENTITY_URLS.get(school_logo),
+            degree=degree,
+            field_of_study=field_of_study,
+            dates=dates,
+            description=description,
+        ))
     return educations
 
 
@@ -255,56 +289,97 @@ def clean_company_url(url):
     """Remove everything after ? from the company URL."""
     return url.split('?')[0]
 
+_COMPANY_URLS = IdentityCache(clean_company_url)
+
 def extract_experience(experience_sections):
     """Extract experience information from sections."""
     experience_details_list = []
+    seen = set()
     for exp_section in experience_sections:
         soup = BeautifulSoup(exp_section, "html.parser")
         experience_items = soup.find_all("ol")
         for ol in experience_items:
-            parent_lis = ol.find_all("li", recursive=False)
-            for li in parent_lis:
-                experience_details_list.extend(extract_experience_from_li(li))
+            for li in _child_tags(ol, "li"):
+                for experience_item in extract_experience_from_li(li):
+                    # Nested ``ol``/``ul`` markup can surface the same role twice
+                    if experience_item in seen:
+                        continue
+                    seen.add(experience_item)
+                    experience_details_list.append(experience_item)
+        # Extracted values are plain strings, so the per-section tree can be freed now
+        soup.decompose()
     return experience_details_list
 
+def _child_tags(tag, name=None):
+    """Return the direct child tags of ``tag`` (optionally only those called ``name``)."""
+    return [child for child in tag.contents if isinstance(child, Tag) and (name is None or child.name == name)]
+
+def _is_description_block(tag):
+    """Return True for description containers (their bullet lists are not positions)."""
+    return any('description' in cls.lower() for cls in tag.get('class') or ())
+
+def _position_lists(li):
+    """Collect the ``ul`` position lists under ``li`` in document order with a single walk.
+
+    Bullet lists inside description blocks are skipped; treating them as position lists
+    produced spurious, duplicated entries and re-walked the same subtrees.
+    """
+    ul_tags = []
+    stack = _child_tags(li)[::-1]
+    while stack:
+        node = stack.pop()
+        if node.name == "ul":
+            ul_tags.append(node)
+        elif _is_description_block(node):
+            continue
+        stack.extend(_child_tags(node)[::-1])
+    return ul_tags
+
+def _company_header(li):
+    """Return ``(company_url, company_name, company_logo)`` for a multi-role company card."""
+    a_tag = li.find('a', recursive=False)
+    company_url = _COMPANY_URLS.get(a_tag.get('href', '')) if a_tag else ''
+
+    # Extract company logo
+    company_logo = None
+    if a_tag:
+        img_tag = a_tag.find('img')
+        if img_tag and img_tag.get('src'):
+            company_logo = img_tag['src']
+
+    # Extract company name
+    company_name = ""
+    if a_tag:
+        current_tag = a_tag
+        while current_tag:
+            current_tag = current_tag.find('span')
+            if current_tag and current_tag.get_text(strip=True):
+                company_name = _IDENTITY_NAMES.get(current_tag.get_text())
+                break
+    else:
+        # If a_tag is not present, find the first div and extract text from span
+        first_div = li.find('div', recursive=False)
+        if first_div:
+            span_tag = first_div.find('span')
+            if span_tag:
+                company_name = _IDENTITY_NAMES.get(span_tag.get_text())
+    return company_url, company_name, company_logo
+
 def extract_experience_from_li(li):
     experience_items = []
-    ul_tags = li.find_all("ul", recursive=True)
-    
-    for ul_tag in ul_tags:
-        li_tags = ul_tag.find_all("li", recursive=False)
+    company_header = None  # computed once per card, only if a multi-role list is present
+
+    for ul_tag in _position_lists(li):
+        li_tags = _child_tags(ul_tag, "li")
         if len(li_tags) == 1:
             experience_item = extract_experience_from_ul_tag(ul_tag)
             if experience_item:
                 experience_items.append(experience_item)
         else:
-            a_tag = li.find('a', recursive=False)
-            company_url = clean_company_url(a_tag.get('href', '')) if a_tag else ''
-            
-            # Extract company logo
-            company_logo = None
-            if a_tag:
-                img_tag = a_tag.find('img')
-                if img_tag and img_tag.get('src'):
-                    company_logo = img_tag['src']
-            
-            # Extract company name
-            company_name = ""
-            if a_tag:
-                current_tag = a_tag
-                while current_tag:
-                    current_tag = current_tag.find('span')
-                    if current_tag and current_tag.get_text(strip=True):
-                        company_name = clean_string(current_tag.get_text())
-                        break
-            else:
-                # If a_tag is not present, find the first div and extract text from span
-                first_div = li.find('div', recursive=False)
-                if first_div:
-                    span_tag = first_div.find('span')
-                    if span_tag:
-                        company_name = clean_string(span_tag.get_text())
-            
+            if company_header is None:
+                company_header = _company_header(li)
+            company_url, company_name, company_logo = company_header
+
             for li_tag in li_tags:
                 experience_item = extract_experience_from_multiple_li_tags(li_tag, company_url, company_name, company_logo)
                 if experience_item:
@@ -313,11 +388,13 @@ def extract_experience_from_li(li):
     return experience_items
 
 def extract_experience_from_multiple_li_tags(li_tag, company_url, company_name, company_logo):
-    div_inside_ul = li_tag.find_all('div', recursive=False)[1] if len(li_tag.find_all('div', recursive=False)) > 1 else li_tag.find_all(recursive=False)[-1] if len(li_tag.find_all(recursive=False)) > 0 else None
+    children = _child_tags(li_tag)
+    child_divs = [child for child in children if child.name == 'div']
+    div_inside_ul = child_divs[1] if len(child_divs) > 1 else children[-1] if children else None
     if not div_inside_ul:
         return None
 
-    all_divs = div_inside_ul.find_all('div', recursive=False)
+    all_divs = _child_tags(div_inside_ul, 'div')
     
     # Extract title
     title_elem = div_inside_ul.find('div', class_='body-medium-bold') or div_inside_ul.find('div', class_='list-item-heading') or all_divs[0] if all_divs else None
@@ -353,15 +430,15 @@ def extract_experience_from_multiple_li_tags(li_tag, company_url, company_name,
             if len(potential_description.split()) <= 6:  # Changed from 5 to 6
                 location = potential_description
 
-    return {
-        "companyUrl": company_url,
-        "companyLogo": company_logo,
-        "title": title,
-        "companyName": company_name,
-        "duration": duration,
-        "location": location,
-        "description": description
-    }
+    return Experience(
+        companyUrl=company_url,
+        companyLogo=_IDENTITY_URLS.get(company_logo),
+        title=title,
+        companyName=company_name,
+        duration=duration,
+        location=location,
+        description=description,
+    )
 
 def extract_experience_from_ul_tag(ul_tag):
     li_tag = ul_tag.find('li', recursive=False)
@@ -373,7 +450,7 @@ def extract_experience_from_ul_tag(ul_tag):
     
     # If no a tag found, look for first div under li
     if a_tag:
-        company_url = clean_company_url(a_tag.get('href', ''))
+        company_url = _COMPANY_URLS.get(a_tag.get('href', ''))
         div_inside_ul = ul_tag.find('div')
     else:
         company_url = ''
@@ -382,20 +459,20 @@ def extract_experience_from_ul_tag(ul_tag):
     if not div_inside_ul:
         return None
 
-    all_divs = div_inside_ul.find_all('div', recursive=False)
+    all_divs = _child_tags(div_inside_ul, 'div')
     title_elem = div_inside_ul.find('div', class_='body-medium-bold') or div_inside_ul.find('div', class_='list-item-heading') or all_divs[0] if all_divs else None
     title = clean_string(title_elem.get_text()) if title_elem else ""
 
     # First try the original logic
     company_name_elem = all_divs[1] if len(all_divs) > 1 and company_url else all_divs[2] if len(all_divs) > 2 else None
-    company_name = clean_string(company_name_elem.get_text()) if company_name_elem else ""
+    company_name = _IDENTITY_NAMES.get(company_name_elem.get_text()) if company_name_elem else ""
 
     # If company name is empty, try finding it in the body-small div
     if not company_name:
         body_small_div = div_inside_ul.find('div', class_='body-small')
         if body_small_div:
             company_span = body_small_div.find('span', attrs={'dir': 'ltr'})
-            company_name = clean_string(company_span.get_text()) if company_span else ""
+            company_name = _IDENTITY_NAMES.get(company_span.get_text()) if company_span else ""
 
     # Extract company logo
     company_logo = None
@@ -445,18 +522,18 @@ def extract_experience_from_ul_tag(ul_tag):
         description_div = div_inside_ul.find('div', class_='description')
         description = clean_string(description_div.get_text()) if description_div else ""
 
-    return {
-        "companyUrl": company_url,
-        "companyLogo": company_logo,
-        "title": title,
-        "companyName": company_name,
-        "duration": duration,
-        "location": location,
-        "description": description
-    }
+    return Experience(
+        companyUrl=company_url,
+        companyLogo=_IDENTITY_URLS.get(company_logo),
+        title=title,
+        companyName=company_name,
+        duration=duration,
+        location=location,
+        description=description,
+    )
     
 def extract_recommendations(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = _as_soup(html_content)
     recommendations = []
 
     recommendation_list = soup.find('ul', class_='recommendation-list')
@@ -473,16 +550,16 @@ def extract_recommendations(html_content):
                 recommender_name = ""
                 recommender_url = ""
             
-            recommendations.append({
-                "recommendationGivenBy": recommender_name,
-                "recommendationGivenByUrl": recommender_url,
-                "recommendation": recommendation
-            })
+            recommendations.append(Recommendation(
+                recommendationGivenBy=recommender_name,
+                recommendationGivenByUrl=recommender_url,
+                recommendation=recommendation,
+            ))
     
     return recommendations
 
 def extract_accomplishments(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = _as_soup(html_content)
     accomplishments = {}
 
     accomplishment_section = soup.find('div', id='accomplishment-section')
@@ -513,11 +590,11 @@ def extract_accomplishments(html_content):
                         if type_name == "Courses":
                             course_number = clean_string(details_div[0].get_text()) if len(details_div) > 0 else ""
                             associated_with = clean_string(details_div[-1].get_text()) if len(details_div) > 1 else ""
-                            accomplishments[type_name].append({
-                                "courseName": name,
-                                "courseNumber": course_number,
-                                "associatedWith": associated_with
-                            })
+                            accomplishments[type_name].append(Course(
+                                courseName=name,
+                                courseNumber=course_number,
+                                associatedWith=associated_with,
+                            ))
                             
                         elif type_name == "Honors":
                             details_div = item.find('div', class_='body-small')
@@ -533,36 +610,36 @@ def extract_accomplishments(html_content):
                                 org = ""
                                 date = ""
                                 
-                            accomplishments[type_name].append({
-                                "accomplishment": name,
-                                "accomplishmentFrom": org,
-                                "accomplishmentDate": date
-                            })
+                            accomplishments[type_name].append(Accomplishment(
+                                accomplishment=name,
+                                accomplishmentFrom=org,
+                                accomplishmentDate=date,
+                            ))
                         elif type_name == "Projects":
                             date = clean_string(details_div[-1].get_text()) if len(details_div) > 0 else ""
                             description = clean_string(details_div[0].get_text()) if len(details_div) > 1 else ""
-                            accomplishments[type_name].append({
-                                "projectName": name,
-                                "date": date,
-                                "projectDescription": description
-                            })
+                            accomplishments[type_name].append(Project(
+                                projectName=name,
+                                date=date,
+                                projectDescription=description,
+                            ))
                         elif type_name == "Certifications":
-                            certificate_from = clean_string(details_div[0].get_text()) if len(details_div) > 0 else ""
+                            certificate_from = _IDENTITY_NAMES.get(details_div[0].get_text()) if len(details_div) > 0 else ""
                             date = clean_string(details_div[-1].get_text()) if len(details_div) > 1 else ""
-                            accomplishments[type_name].append({
-                                "certificateName": name,
-                                "certificateFrom": certificate_from,
-                                "date": date
-                            })
+                            accomplishments[type_name].append(Certification(
+                                certificateName=name,
+                                certificateFrom=certificate_from,
+                                date=date,
+                            ))
                         elif type_name == "Publications":
                             publication_spans = details_div[0].find_all('span') if len(details_div) > 0 else []
                             publication = clean_string(publication_spans[0].get_text()) if len(publication_spans) > 0 else ""
                             date = clean_string(publication_spans[2].get_text()) if len(publication_spans) > 2 else ""
-                            accomplishments[type_name].append({
-                                "topic": name,
-                                "publication": publication,
-                                "date": date
-                            })
+                            accomplishments[type_name].append(Publication(
+                                topic=name,
+                                publication=publication,
+                                date=date,
+                            ))
             
             else:
                 accomplishments[type_name] = []
@@ -580,16 +657,16 @@ def extract_accomplishments(html_content):
                             text_content = ""
 
                         if type_name == "Organizations":
-                            accomplishments[type_name].append({
-                                "name": name,
-                                "date": text_content
-                            })
+                            accomplishments[type_name].append(Organization(
+                                name=name,
+                                date=text_content,
+                            ))
                         else:
-                            accomplishments[type_name].append({
-                                "accomplishment": name,
-                                "accomplishmentFrom": text_content,
-                                "accomplishmentDate": ""
-                            })
+                            accomplishments[type_name].append(Accomplishment(
+                                accomplishment=name,
+                                accomplishmentFrom=text_content,
+                                accomplishmentDate="",
+                            ))
     
     return accomplishments
 def find_section_by_heading(soup, heading_text):
@@ -602,10 +679,12 @@ def find_section_by_heading(soup, heading_text):
 
 def fetch_avatar_url(html):
     """Fetch the avatar URL from the profile section and save to Cloudflare."""
+    soup = _as_soup(html)
+    return avatar_from_basic_profile(soup.find("section", class_="basic-profile-section"))
+
+def avatar_from_basic_profile(basic_profile_section):
+    """Extract the avatar URL from an already located basic profile section."""
     logger.info("Fetching avatar URL from profile section")
-    soup = BeautifulSoup(html, "html.parser")
-    basic_profile_section = soup.find("section", class_="basic-profile-section")
-    
     if basic_profile_section:
         logger.debug("Found basic profile section")
         # Try finding the profile picture container first
@@ -629,106 +708,408 @@ def fetch_avatar_url(html):
     logger.warning("No profile image found")
     return None
 
-def scrape_profile_data(html_content):
+def _about_from_section(section):
+    return clean_about_text(clean_string(section.get_text()))
+
+def _experience_from_section(section):
+    return extract_experience([str(section)])
+
+def _contacts_from_section(section):
+    return extract_contact_info(clean_string(clean_html(str(section))))
+
+def _skills_from_section(section):
+    return extract_skills(re.search(r'<section.*?>(.*?)</section>', str(section), re.DOTALL))
+
+# Section roots located together by a single walk of the parsed page. Selectors are
+# listed primary first; later ones are the heading-based fallbacks of the old per-field
+# ``find``/``find_section_by_heading`` calls, with identical matching rules. Field values
+# are still produced by the hand-written extractors below, run on the located sections.
+PROFILE_PLAN = compile_plan([
+    FieldSpec("basicProfile", [ClassSelector("section", "basic-profile-section", exact=True)]),
+    FieldSpec(
+        "about",
+        [ClassSelector("section", "about-section", ignore_case=True), HeadingSelector("About")],
+        post=_about_from_section,
+        fallback_on_empty=False,
+    ),
+    FieldSpec("experience", [HeadingSelector("Experience")], post=_experience_from_section),
+    FieldSpec(
+        "education",
+        [ClassSelector("section", "education-container"), HeadingSelector("Education")],
+        post=extract_education,
+    ),
+    FieldSpec("contacts", [HeadingSelector("Contact")], post=_contacts_from_section),
+    FieldSpec("skills", [HeadingSelector("Skills")], post=_skills_from_section),
+    FieldSpec("recommendations", [HeadingSelector("Recommendations")], post=extract_recommendations),
+    FieldSpec("accomplishments", [HeadingSelector("Accomplishments")], post=extract_accomplishments),
+])
+# Fields skipped for oversized documents (see ``scrape_profile_data``)
+_DEGRADED_SKIPPED_FIELDS = ("skills", "recommendations", "accomplishments")
+
+# Bump whenever an extractor's output changes for the same input, so stored
+# fingerprints stop matching and every section is re-extracted once.
+FINGERPRINT_VERSION = "2"
+# Logical section -> key it populates in the scraped profile
+SECTION_OUTPUT_KEYS = {
+    "about": "about",
+    "experience": "workExperience",
+    "education": "education",
+    "contacts": "contacts",
+    "skills": "skills",
+    "recommendations": "recommendations",
+    "accomplishments": "accomplishments",
+}
+
+
+
+def section_fingerprint(*parts):
+    """Digest of everything one section's extractor reads (regex matches and located nodes).
+
+    Parts are source slices (bytes or memoryviews, hashed in place), ``None`` for a missing
+    part, or anything else, which is hashed as ``str(part)``.
+    """
+    digest = hashlib.blake2b(FINGERPRINT_VERSION.encode("ascii"), digest_size=16)
+    for part in parts:
+        if part is None:
+            digest.update(b"\xff" * 8)
+            continue
+        data = part if isinstance(part, (bytes, memoryview)) else str(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+# Bytes decoded per step when mapping a character column to a byte offset
+_SOURCE_DECODE_CHUNK = 64 * 1024
+_NON_ASCII = re.compile(rb"[\x80-\xff]")
+_ELEMENT_TAGS = {}
+
+
+def _element_tags(name):
+    """Compiled pattern matching the opening and closing tags of ``name`` elements."""
+    if name not in _ELEMENT_TAGS:
+        _ELEMENT_TAGS[name] = re.compile(rb"<(/?)" + re.escape(name.encode("ascii")) + rb"\b", re.IGNORECASE)
+    return _ELEMENT_TAGS[name]
+
+
+class SourceIndex:
+    """Maps parsed tags back to their byte range in the undecoded document.
+
+    ``html.parser`` records where each tag starts (``sourceline`` / ``sourcepos``, a
+    character column); the element's bytes run from there to its matching close tag. Slices
+    are memoryviews, so fingerprinting a section never re-renders or copies it.
+    """
+
+    def __init__(self, source, encoding):
+        self.source = source
+        self.view = memoryview(source)
+        self.encoding = encoding
+        self._line_starts = None
+
+    def _line_start(self, line):
+        if self._line_starts is None:
+            starts = [0]
+            position = self.source.find(b"\n")
+            while position != -1:
+                starts.append(position + 1)
+                position = self.source.find(b"\n", position + 1)
+            self._line_starts = starts
+        return self._line_starts[line - 1] if 0 < line <= len(self._line_starts) else None
+
+    def _byte_offset(self, start, columns):
+        """Return the offset ``columns`` characters after byte ``start``."""
+        if not _NON_ASCII.search(self.source, start, start + columns):
+            return start + columns
+        decoder = codecs.getincrementaldecoder(self.encoding)("replace")
+        position = start
+        while position < len(self.source):
+            pending = len(decoder.getstate()[0])
+            text = decoder.decode(self.view[position:position + _SOURCE_DECODE_CHUNK])
+            if len(text) >= columns:
+                return position - pending + len(text[:columns].encode(self.encoding, "replace"))
+            columns -= len(text)
+            position += _SOURCE_DECODE_CHUNK
+        return None
+
+    def span(self, tag):
+        """Return ``(start, end)`` of ``tag`` in the source, or ``None`` when it cannot be mapped."""
+        line_start = self._line_start(tag.sourceline) if tag.sourceline is not None else None
+        if line_start is None or tag.sourcepos is None:
+            return None
+        if tag.sourceline == 1 and self.source.startswith(codecs.BOM_UTF8):
+            # The parser never sees the BOM
+            line_start += len(codecs.BOM_UTF8)
+        start = self._byte_offset(line_start, tag.sourcepos)
+        pattern = _element_tags(tag.name)
+        if start is None or not pattern.match(self.source, start):
+            return None
+        depth = 0
+        for match in pattern.finditer(self.source, start):
+            depth += -1 if match.group(1) else 1
+            if not depth:
+                close = self.source.find(b">", match.end())
+                return start, (close + 1 if close != -1 else len(self.source))
+        return start, len(self.source)
+
+    def slice(self, tag):
+        """The tag's source bytes as a memoryview, or the tag itself when it cannot be mapped."""
+        span = self.span(tag)
+        return self.view[span[0]:span[1]] if span else tag
+
+
+def _stage_clock(timings):
+    """Return a ``mark(name)`` callable adding milliseconds since the previous mark to ``timings``."""
+    if timings is None:
+        return lambda name: None
+    last = [time.perf_counter()]
+
+    def mark(name):
+        now = time.perf_counter()
+        timings[name] = timings.get(name, 0.0) + (now - last[0]) * 1000.0
+        last[0] = now
+
+    return mark
+
+def is_degraded_size(html_content, degraded_html_bytes=None):
+    """Return True when ``html_content`` is large enough to warrant degraded extraction."""
+    return bool(degraded_html_bytes) and len(html_content) > degraded_html_bytes
+
+# Byte order marks, longest first (the UTF-32 LE mark starts with the UTF-16 LE one)
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([-\w.:]+)', re.IGNORECASE)
+# Browsers only prescan the start of the document for a charset declaration
+_ENCODING_SNIFF_BYTES = 4096
+
+_EXPERIENCE_PATTERN = r'<section class=".*?experience-container.*?">(.*?)</section>'
+_CONTACTS_PATTERN = r'<section class=".*?contacts-container.*?">(.*?)</section>'
+_SKILLS_PATTERN = r'<section class=".*?skills-container.*?">(.*?)</section>'
+
+def detect_encoding(data):
+    """Return the encoding declared by a BOM or ``<meta charset>`` in ``data``, else UTF-8."""
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    # A memoryview slice scans the head of the document without copying it
+    match = _META_CHARSET.search(memoryview(data)[:_ENCODING_SNIFF_BYTES])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            logger.warning("Unknown declared charset %r; assuming UTF-8", match.group(1))
+    return "utf-8"
+
+def _section_spans(pattern, source):
+    """Yield the ``(start, end)`` of group 1 of each ``re.DOTALL`` match of ``pattern`` in str or bytes."""
+    if not isinstance(source, str):
+        pattern = pattern.encode("ascii")
+    for match in re.finditer(pattern, source, re.DOTALL):
+        yield match.span(1)
+
+def _span_text(source, span, encoding=None):
+    """Return ``source[start:end]`` as str; bytes are decoded from a memoryview slice without a copy."""
+    if span is None:
+        return None
+    if isinstance(source, str):
+        return source[span[0]:span[1]]
+    return str(memoryview(source)[span[0]:span[1]], encoding, "replace")
+
+def scrape_profile_data(
+    html_content,
+    timings=None,
+    max_html_bytes=None,
+    degraded_html_bytes=None,
+    fingerprints=None,
+    previous_profile=None,
+    previous_fingerprints=None,
+):
+    """Scrape a profile page; per-extractor milliseconds are added to ``timings`` when given.
+
+    ``html_content`` may be ``str`` or undecoded ``bytes``; for bytes the encoding is
+    taken from the BOM or ``<meta charset>`` (see ``detect_encoding``). Documents larger
+    than ``max_html_bytes`` are rejected with ``ValueError``. Documents larger than
+    ``degraded_html_bytes`` are parsed with only their ``<section>`` elements retained and
+    skip the skills, recommendations and accomplishments extractors; those sections are
+    carried over from ``previous_profile`` (with their previous fingerprints) so a stored
+    profile does not lose them.
+
+    When ``fingerprints`` is a dict it receives one ``section_fingerprint`` per logical
+    section (see ``SECTION_OUTPUT_KEYS``). Sections whose fingerprint equals the one in
+    ``previous_fingerprints`` are not re-extracted; their value is copied from
+    ``previous_profile`` instead.
+    """
+    if max_html_bytes and len(html_content) > max_html_bytes:
+        raise ValueError(f"HTML document of {len(html_content)} bytes exceeds the {max_html_bytes} byte cap")
+    degraded = is_degraded_size(html_content, degraded_html_bytes)
+
+    parser_kwargs = {}
+    encoding = None
+    if isinstance(html_content, bytes):
+        encoding = detect_encoding(html_content)
+        if "<".encode(encoding) != b"<":
+            # UTF-16/32 markup cannot be searched with byte patterns; decode it once up front
+            html_content = html_content.decode(encoding, "replace")
+            encoding = None
+        else:
+            parser_kwargs["from_encoding"] = encoding
+
+    mark = _stage_clock(timings)
     try:
         logger.info("Starting profile data scraping")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if degraded:
+            logger.warning(
+                "HTML document of %s bytes exceeds %s bytes; using degraded extraction",
+                len(html_content),
+                degraded_html_bytes,
+            )
+            soup = BeautifulSoup(html_content, 'html.parser', parse_only=SoupStrainer("section"), **parser_kwargs)
+        else:
+            soup = BeautifulSoup(html_content, 'html.parser', **parser_kwargs)
+        mark("parse")
+
+        # Every section below is located by one walk of the tree instead of a find per field
+        names = [name for name in PROFILE_PLAN.fields if not (degraded and name in _DEGRADED_SKIPPED_FIELDS)]
+        located = PROFILE_PLAN.locate(soup, names)
+        basic_profile_section = located["basicProfile"][0]
+        mark("locate")
+
+        track = fingerprints is not None or bool(previous_fingerprints)
+        reusable = bool(previous_fingerprints) and previous_profile is not None
+        reused = []
+        # Fingerprints hash source bytes in place; str markup falls back to rendering the nodes
+        source_index = SourceIndex(html_content, encoding) if track and encoding else None
+
+        def raw(span):
+            """A regex-matched section's source, sliced without copying bytes."""
+            if span is None:
+                return None
+            if isinstance(html_content, str):
+                return html_content[span[0]:span[1]]
+            return memoryview(html_content)[span[0]:span[1]]
+
+        def unchanged(name, *parts):
+            """Record ``name``'s fingerprint and report whether the stored value can be reused."""
+            if not track:
+                return False
+            if source_index is not None:
+                parts = [source_index.slice(part) if isinstance(part, Tag) else part for part in parts]
+            fingerprint = section_fingerprint(*parts)
+            if fingerprints is not None:
+                fingerprints[name] = fingerprint
+            if reusable and previous_fingerprints.get(name) == fingerprint:
+                reused.append(name)
+                return True
+            return False
+
+        def previous(name, default):
+            return previous_profile.get(SECTION_OUTPUT_KEYS[name], default)
+
+        def carried(name, default):
+            """Keep the stored value of a section degraded extraction skips."""
+            if previous_profile is None:
+                return default
+            if fingerprints is not None and previous_fingerprints and name in previous_fingerprints:
+                fingerprints[name] = previous_fingerprints[name]
+            return previous(name, default)
 
         logger.info("Fetching avatar URL")
-        avatar_url = fetch_avatar_url(html_content)
+        avatar_url = avatar_from_basic_profile(basic_profile_section)
+        mark("avatar")
 
         logger.info("Fetching bio section")
-        bio = fetch_bio_section(html_content)
+        bio = bio_from_basic_profile(basic_profile_section)
+        mark("bio")
                 
         logger.info("Processing about section")
-        about_section = find_about_section(soup)
-        if about_section:
-            about_text = clean_string(about_section.get_text())
-            about_text = clean_about_text(about_text)
-            logger.info("About section found and processed")
+        if unchanged("about", *located["about"]):
+            about_text = previous("about", None)
         else:
-            about_section = find_section_by_heading(soup, "About")
-            if about_section:
-                about_text = clean_string(about_section.get_text())
-                about_text = clean_about_text(about_text)
-                logger.info("About section found through heading and processed")
-            else:
-                about_text = None
+            about_text = PROFILE_PLAN.extract("about", located)
+            if about_text is None:
                 logger.info("No about section found")
+        mark("about")
 
         logger.info("Processing experience section")
-        experience_sections = re.findall(
-            r'<section class=".*?experience-container.*?">(.*?)</section>',
-            html_content,
-            re.DOTALL,
-        )
-        experience_details_list = extract_experience(experience_sections)
-        if not experience_details_list:
-            logger.info("No experience found in container, trying alternate method")
-            experience_section = find_section_by_heading(soup, "Experience")
-            if experience_section:
-                experience_details_list = extract_experience([str(experience_section)])
-                logger.info("Experience found through heading")
-            else:
-                logger.info("No experience section found")
+        experience_spans = list(_section_spans(_EXPERIENCE_PATTERN, html_content))
+        if unchanged("experience", *map(raw, experience_spans), *located["experience"]):
+            experience_details_list = previous("experience", [])
+        else:
+            experience_details_list = extract_experience(
+                [_span_text(html_content, span, encoding) for span in experience_spans]
+            )
+            if not experience_details_list:
+                logger.info("No experience found in container, trying alternate method")
+                experience_details_list = PROFILE_PLAN.extract("experience", located, [])
+        mark("experience")
 
         logger.info("Processing education section")
-        education_section = soup.find('section', class_=lambda x: x and 'education-container' in x)
-        educations = extract_education(education_section)
-        if not educations:
-            logger.info("No education found in container, trying alternate method")
-            education_section = find_section_by_heading(soup, "Education")
-            if education_section:
-                educations = extract_education(education_section)
-                logger.info("Education found through heading")
-            else:
-                logger.info("No education section found")
+        if unchanged("education", *located["education"]):
+            educations = previous("education", [])
+        else:
+            educations = PROFILE_PLAN.extract("education", located, [])
+        mark("education")
 
         logger.info("Processing contacts section")
-        contacts_section = re.search(
-            r'<section class=".*?contacts-container.*?">(.*?)</section>',
-            html_content,
-            re.DOTALL,
-        )
-        contacts_text = clean_string(clean_html(contacts_section.group(1))) if contacts_section else ""
-        contact_info = extract_contact_info(contacts_text)
-        if not contact_info:
-            logger.info("No contacts found in container, trying alternate method")
-            contact_section = find_section_by_heading(soup, "Contact")
-            if contact_section:
-                contacts_text = clean_string(clean_html(str(contact_section)))
-                contact_info = extract_contact_info(contacts_text)
-                logger.info("Contacts found through heading")
-            else:
-                logger.info("No contacts section found")
+        contacts_span = next(_section_spans(_CONTACTS_PATTERN, html_content), None)
+        if unchanged("contacts", raw(contacts_span), *located["contacts"]):
+            contact_info = previous("contacts", {})
+        else:
+            contacts_body = _span_text(html_content, contacts_span, encoding)
+            contacts_text = clean_string(clean_html(contacts_body)) if contacts_body is not None else ""
+            contact_info = extract_contact_info(contacts_text)
+            if not contact_info:
+                logger.info("No contacts found in container, trying alternate method")
+                contact_info = PROFILE_PLAN.extract("contacts", located, contact_info)
+        mark("contacts")
 
-        logger.info("Processing skills section")
-        skills_section = re.search(
-            r'<section class=".*?skills-container.*?">(.*?)</section>',
-            html_content,
-            re.DOTALL,
-        )
-        skills = extract_skills(skills_section)
-        if not skills:
-            logger.info("No skills found in container, trying alternate method")
-            skills_section = find_section_by_heading(soup, "Skills")
-            if skills_section:
-                skills_html = str(skills_section)
-                skills = extract_skills(re.search(r'<section.*?>(.*?)</section>', skills_html, re.DOTALL))
-                logger.info("Skills found through heading")
+        if degraded:
+            skills = carried("skills", [])
+        else:
+            logger.info("Processing skills section")
+            skills_span = next(_section_spans(_SKILLS_PATTERN, html_content), None)
+            if unchanged("skills", raw(skills_span), *located["skills"]):
+                skills = previous("skills", [])
             else:
-                logger.info("No skills section found")
+                skills = extract_skills(_span_text(html_content, skills_span, encoding))
+                if not skills:
+                    logger.info("No skills found in container, trying alternate method")
+                    skills = PROFILE_PLAN.extract("skills", located, skills)
+            mark("skills")
 
         logger.info("Fetching current location")
-        currentLocation = fetch_current_location(html_content)
+        currentLocation = location_from_basic_profile(basic_profile_section)
+        mark("currentLocation")
 
-        logger.info("Processing recommendations section")
-        recommendation_section = find_section_by_heading(soup, "Recommendations")
-        recommendations = extract_recommendations(str(recommendation_section)) if recommendation_section else []
+        if degraded:
+            recommendations = carried("recommendations", [])
+            accomplishments = carried("accomplishments", {})
+        else:
+            # Section tags are passed directly instead of ``str(section)`` copies that would be re-parsed
+            logger.info("Processing recommendations section")
+            if unchanged("recommendations", *located["recommendations"]):
+                recommendations = previous("recommendations", [])
+            else:
+                recommendations = PROFILE_PLAN.extract("recommendations", located, [])
+            mark("recommendations")
 
-        logger.info("Processing accomplishments section")
-        accomplishments_section = find_section_by_heading(soup, "Accomplishments")
-        accomplishments = extract_accomplishments(str(accomplishments_section)) if accomplishments_section else {}
+            logger.info("Processing accomplishments section")
+            if unchanged("accomplishments", *located["accomplishments"]):
+                accomplishments = previous("accomplishments", {})
+            else:
+                accomplishments = PROFILE_PLAN.extract("accomplishments", located, {})
+            mark("accomplishments")
+        located = None
+        if reused:
+            logger.info("Reused unchanged sections from the stored profile: %s", ", ".join(reused))
+
+        # Everything extracted is plain str/dict data now; tear the tree down eagerly
+        soup.decompose()
+        soup = None
 
         logger.info("Profile data scraping completed successfully")
         
@@ -751,17 +1132,23 @@ def scrape_profile_data(html_content):
 
 
 
-# Add this at the end of the file
 if __name__ == "__main__":
-    # Read the HTML file
-    with open("azhan_new.html", "r", encoding="utf-8") as file:
+    import sys
+
+    # Usage: python -m bs.scrape <profile.html> [output.json]
+    # e.g. python -m bs.scrape benchmarks/corpus/multi_role.html
+    input_path = sys.argv[1] if len(sys.argv) > 1 else "azhan_new.html"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    # Read raw bytes so the declared charset is honoured, as for documents downloaded from R2
+    with open(input_path, "rb") as file:
         html_content = file.read()
-    
-    # Scrape the profile data
-    profile_data = scrape_profile_data(html_content)
-    
-    # Save the output as JSON
-    with open("profile_data_azhan.json", "w", encoding="utf-8") as json_file:
-        json.dump(profile_data, json_file, indent=2, ensure_ascii=False)
-    
-    print("Profile data has been saved to profile_data.json")
+
+    profile_data = to_payload(scrape_profile_data(html_content))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as json_file:
+            json.dump(profile_data, json_file, indent=2, ensure_ascii=False)
+        print(f"Profile data has been saved to {output_path}")
+    else:
+        print(json.dumps(profile_data, indent=2, ensure_ascii=False))
@@ -2,43 +2,97 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Optional
-
-from requests import Session
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
+import deadline
+from compression import accept_encoding, compress, resolve_encoding
 from config import config
 from logging_config import setup_logger
+from metrics import gauge, record
+from resilience import (
+    AimdLimiter,
+    CircuitBreaker,
+    OverloadedError,
+    full_jitter_backoff,
+    get_breaker,
+    get_limiter,
+    parse_retry_after,
+)
+from serialization import dumps, loads
+from transport import make_transport
 from utils import setup_r2_client
 
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from requests import Response
+
 logger = setup_logger(__name__)
 
+# Statuses that mean "slow down" rather than "broken": they shrink the concurrency limit
+OVERLOAD_STATUSES = (429, 503)
+# Longest single wait between retries; a longer Retry-After fails the request instead
+MAX_RETRY_SLEEP_SECONDS = 30.0
+
 
 class ApiClient:
-    """Lightweight HTTP client that injects authentication headers and retries."""
+    """Lightweight HTTP client that injects authentication headers and retries.
+
+    Requests share an AIMD concurrency limiter and a circuit breaker (see ``resilience``):
+    429/503 and ``Retry-After`` shrink the in-flight limit, successes grow it back, and a
+    run of failures opens the circuit so calls fail fast with ``CircuitOpenError``. Retries
+    use full-jitter backoff so concurrent workers do not retry in lockstep.
+    """
 
-    def __init__(self, base_url: str, api_key: str, timeout: int, max_retries: int) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout: int,
+        max_retries: int,
+        *,
+        limiter: Optional[AimdLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        backoff_seconds: float = 1.0,
+        compression: Optional[str] = None,
+        compression_min_bytes: int = 4096,
+        compression_level: Optional[int] = None,
+        transport: str = "requests",
+        pool_size: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+    ) -> None:
         self._base_url = base_url.rstrip("/")
         self._api_key = api_key
         self._timeout = timeout
-        self._session: Session = Session()
-
-        retry = Retry(
-            total=max_retries,
-            backoff_factor=1,
-            status_forcelist=(408, 429, 500, 502, 503, 504),
-            allowed_methods=("GET", "POST", "PATCH", "PUT", "DELETE"),
+        self._connect_timeout = connect_timeout or timeout
+        self._max_retries = max(0, max_retries)
+        self._backoff_seconds = backoff_seconds
+        self._limiter = limiter or AimdLimiter()
+        self._breaker = breaker or CircuitBreaker(name=self._base_url)
+        # Content-Encoding for request bodies of at least ``compression_min_bytes`` (None = off)
+        self._compression = compression
+        self._compression_min_bytes = compression_min_bytes
+        self._compression_level = compression_level
+        self._accept_encoding = accept_encoding()
+        # Enough pooled connections (or HTTP/2 capacity) for every request the limiter lets through
+        self._transport = make_transport(
+            transport,
+            pool_size=pool_size or int(self._limiter.maximum),
+            base_url=self._base_url,
         )
-        adapter = HTTPAdapter(max_retries=retry)
-        self._session.mount("http://", adapter)
-        self._session.mount("https://", adapter)
+
+    def warm(self, timeout: float = 5.0) -> None:
+        """Establish a pooled keep-alive connection to the API host.
+
+        Goes straight to the adapter's connection pool with retries disabled so a
+        dead endpoint costs one timeout instead of the full backoff schedule.
+        """
+        self._transport.warm(self._base_url, self._headers(), timeout)
 
     def _headers(self) -> Dict[str, str]:
         return {
             "X-API-Key": self._api_key,
             "Content-Type": "application/json",
+            "Accept-Encoding": self._accept_encoding,
         }
 
     def _url(self, route: str) -> str:
@@ -47,17 +101,104 @@ class ApiClient:
             route = f"api/{route}"
         return f"{self._base_url}/{route}"
 
+    def _encode_body(self, body: bytes) -> Tuple[bytes, Dict[str, str]]:
+        """Compress ``body`` when enabled and worthwhile; returns the wire bytes and extra headers."""
+        if self._compression is None or len(body) < self._compression_min_bytes:
+            return body, {}
+        started = time.perf_counter()
+        compressed = compress(body, self._compression, self._compression_level)
+        record("ApiCompressMs", (time.perf_counter() - started) * 1000.0, "Milliseconds")
+        if len(compressed) >= len(body):
+            return body, {}
+        gauge("ApiCompressionRatio", len(body) / len(compressed))
+        return compressed, {"Content-Encoding": self._compression}
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        return max(retry_after or 0.0, full_jitter_backoff(attempt, self._backoff_seconds, MAX_RETRY_SLEEP_SECONDS))
+
+    def _send(self, method: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs: Any) -> "Response":
+        """Send one logical request through the breaker and limiter, retrying transient failures.
+
+        Returns the final response (which may still carry an error status); raises
+        ``CircuitOpenError`` while the circuit is open, ``OverloadedError`` when no limiter
+        slot frees up in time, and re-raises the last transport error.
+        Under an active ``deadline.Deadline`` every wait and timeout is shortened to the time
+        left, a retry whose backoff would outlast it is not attempted, and ``DeadlineExceeded``
+        is raised instead of starting an attempt once it has passed.
+        """
+        headers = {**self._headers(), **(headers or {})}
+        what = f"API {method} {url}"
+        attempt = 0
+        while True:
+            # The slot wait is bounded by the deadline as well as the read timeout
+            slot_timeout = deadline.timeout(self._timeout, what)
+            retry_after: Optional[float] = None
+            try:
+                # The slot comes first: a half-open probe is only taken once the call can go out
+                with self._limiter.slot(timeout=slot_timeout):
+                    # Time spent queued for the slot is gone; send only what is left of the deadline
+                    connect_timeout, read_timeout = deadline.timeouts(self._connect_timeout, self._timeout, what)
+                    self._breaker.allow()
+                    try:
+                        response = self._transport.request(
+                            method, url, headers=headers, timeout=(connect_timeout, read_timeout), **kwargs
+                        )
+                    except self._transport.errors:
+                        raise
+                    except BaseException:
+                        self._breaker.release()
+                        raise
+            except OverloadedError:
+                # A slot wait cut short by the deadline surfaces as DeadlineExceeded
+                deadline.check(what)
+                raise
+            except self._transport.errors as exc:
+                self._breaker.record_failure()
+                if isinstance(exc, self._transport.timeouts):
+                    self._limiter.on_overload()
+                delay = self._retry_delay(attempt)
+                if attempt >= self._max_retries or not deadline.allows(delay):
+                    # A timeout cut short by the deadline surfaces as DeadlineExceeded
+                    deadline.check(what)
+                    raise
+                logger.warning("API %s %s failed (%s); retrying", method, url, type(exc).__name__)
+            else:
+                status = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if status in OVERLOAD_STATUSES or (retry_after is not None and status >= 400):
+                    self._limiter.on_overload(retry_after)
+                if status < 500 and status not in (408, 429):
+                    # Other 4xx responses are the caller's problem, not a sign of backend distress
+                    self._breaker.record_success()
+                    if status < 400:
+                        self._limiter.on_success()
+                    return response
+                self._breaker.record_failure()
+                if attempt >= self._max_retries or (retry_after or 0.0) > MAX_RETRY_SLEEP_SECONDS:
+                    return response
+                delay = self._retry_delay(attempt, retry_after)
+                if not deadline.allows(delay):
+                    return response
+                logger.warning("API %s %s -> %s; retrying", method, url, status)
+            record("ApiRetries", 1)
+            time.sleep(delay)
+            attempt += 1
+
     def request(self, method: str, route: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute an HTTP request and return the parsed JSON body."""
         url = self._url(route)
         logger.debug("API %s %s", method.upper(), url)
-        response = self._session.request(
-            method=method.upper(),
-            url=url,
-            headers=self._headers(),
-            data=json.dumps(payload or {}),
-            timeout=self._timeout,
-        )
+        # Encoded straight to UTF-8 bytes (orjson when installed)
+        body = dumps(payload or {})
+        record("ApiRequestBytes", len(body), "Bytes")
+        data, extra_headers = self._encode_body(body)
+        record("ApiRequestWireBytes", len(data), "Bytes")
+        response = self._send(method.upper(), url, extra_headers, content=data)
+        if response.status_code == 415 and extra_headers:
+            logger.warning("API rejected %s request bodies; disabling request compression", self._compression)
+            self._compression = None
+            record("ApiRequestWireBytes", len(body), "Bytes")
+            response = self._send(method.upper(), url, content=body)
 
         if response.status_code >= 400:
             logger.error(
@@ -69,28 +210,25 @@ class ApiClient:
             )
             raise RuntimeError(f"API request failed with status {response.status_code}: {response.text}")
 
-        if not response.text:
+        record("ApiResponseBytes", len(response.content), "Bytes")
+        if not response.content:
             return {}
-        return response.json()
+        return loads(response.content)
 
     def get(self, route: str, *, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Perform a GET request with optional query parameters."""
         url = self._url(route)
         logger.debug("API GET %s", url)
-        response = self._session.get(
-            url,
-            headers=self._headers(),
-            params=params,
-            timeout=self._timeout,
-        )
+        response = self._send("GET", url, params=params)
 
         if response.status_code >= 400:
             logger.error("API GET failed: %s -> %s %s", url, response.status_code, response.text)
             raise RuntimeError(f"API GET failed with status {response.status_code}: {response.text}")
 
-        if not response.text:
+        record("ApiResponseBytes", len(response.content), "Bytes")
+        if not response.content:
             return {}
-        return response.json()
+        return loads(response.content)
 
 
 class ServiceClients:
@@ -101,7 +239,27 @@ class ServiceClients:
             base_url=config.BASE_API_URL,
             api_key=config.API_KEY,
             timeout=config.API_TIMEOUT_SECONDS,
+            connect_timeout=config.CONNECT_TIMEOUT_SECONDS,
             max_retries=config.API_MAX_RETRIES,
+            # Shared by every client for this API in the process (threads included)
+            limiter=get_limiter(
+                config.BASE_API_URL,
+                initial=config.API_CONCURRENCY_INITIAL,
+                minimum=config.API_CONCURRENCY_MIN,
+                maximum=config.API_CONCURRENCY_MAX,
+            ),
+            breaker=get_breaker(
+                config.BASE_API_URL,
+                failure_threshold=config.API_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=config.API_BREAKER_RESET_SECONDS,
+                name="api",
+            ),
+            backoff_seconds=config.API_RETRY_BACKOFF_SECONDS,
+            compression=resolve_encoding(config.API_COMPRESSION),
+            compression_min_bytes=config.API_COMPRESSION_MIN_BYTES,
+            compression_level=config.API_COMPRESSION_LEVEL,
+            transport=config.API_TRANSPORT,
+            pool_size=config.API_POOL_SIZE,
         )
         self.r2_client = setup_r2_client()
 
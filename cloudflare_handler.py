@@ -1,10 +1,11 @@
 import time
 from typing import Dict, Optional
 
-import requests
-
+import deadline
 from config import config
 from logging_config import setup_logger
+from metrics import record
+from resilience import get_token_bucket, parse_retry_after
 
 
 class CloudflareImageHandler:
@@ -13,22 +14,72 @@ class CloudflareImageHandler:
     def __init__(self):
         self.account_id = config.CLOUDFLARE_ACCOUNT_ID
         self.api_token = config.CLOUDFLARE_API_TOKEN
+        self.base_url = config.CLOUDFLARE_API_BASE_URL
         self.logger = setup_logger(__name__)
-        
+        self._session = None
+        # One bucket per account and lock file, shared by every handler in the process
+        lock_path = config.CLOUDFLARE_RATE_LOCK_FILE or None
+        self._bucket = get_token_bucket(
+            f"cloudflare:{self.account_id}:{lock_path or ''}",
+            rate=config.CLOUDFLARE_RATE_PER_SECOND,
+            burst=config.CLOUDFLARE_RATE_BURST,
+            lock_path=lock_path,
+            metric_prefix="Cloudflare",
+        )
+
+    def _get_session(self):
+        """Return a pooled ``requests.Session`` shared by all Cloudflare calls."""
+        if self._session is None:
+            import requests  # deferred to keep cold-start imports lean
+
+            self._session = requests.Session()
+        return self._session
+
+    def warm(self) -> None:
+        """Open a keep-alive connection to the Cloudflare API without side effects."""
+        self._get_session().head(self.base_url, timeout=5)
+
+    def _api_call(self, method: str, api_url: str, **kwargs):
+        """Send a Cloudflare API request within the account rate limit.
+
+        Waits for a token first, and on a 429 drains the shared bucket for the
+        ``Retry-After`` period before retrying. Returns ``None`` if no token
+        became available in time. Waits and timeouts are shortened to the active
+        ``deadline.Deadline``.
+        """
+        session = self._get_session()
+        what = f"Cloudflare {method}"
+        for attempt in range(config.CLOUDFLARE_RATE_LIMIT_RETRIES + 1):
+            max_wait = deadline.timeout(config.CLOUDFLARE_RATE_MAX_WAIT_SECONDS, what)
+            if not self._bucket.acquire(timeout=max_wait):
+                self.logger.error(f"Cloudflare rate limit: no request token within {max_wait:.1f}s")
+                return None
+            timeout = deadline.timeouts(config.CONNECT_TIMEOUT_SECONDS, config.CLOUDFLARE_TIMEOUT_SECONDS, what)
+            response = session.request(method, api_url, timeout=timeout, **kwargs)
+            if response.status_code != 429:
+                return response
+            record("CloudflareThrottled", 1)
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) or 1.0
+            self.logger.warning(f"Cloudflare returned 429; pausing requests for {retry_after:.1f}s")
+            self._bucket.drain(retry_after)
+        return response
+
     def upload_image(self, image_url: str, require_signed_urls: bool = True) -> Optional[Dict]:
         """Upload an image to Cloudflare Images via URL and return response dict like original"""
         if not image_url:
             return None
-            
+
+        session = self._get_session()
         try:
             # First download the image
-            image_response = requests.get(image_url, timeout=30)
+            timeout = deadline.timeouts(config.CONNECT_TIMEOUT_SECONDS, config.CLOUDFLARE_TIMEOUT_SECONDS, "avatar download")
+            image_response = session.get(image_url, timeout=timeout)
             if image_response.status_code != 200:
                 self.logger.error(f"Failed to download image from URL: {image_url}")
                 return None
 
             # Prepare the upload request
-            api_url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/images/v1"
+            api_url = f"{self.base_url}/accounts/{self.account_id}/images/v1"
             headers = {
                 "Authorization": f"Bearer {self.api_token}"
             }
@@ -40,8 +91,10 @@ class CloudflareImageHandler:
             }
             
             # Make the upload request
-            response = requests.post(api_url, headers=headers, files=files)
-            
+            response = self._api_call("POST", api_url, headers=headers, files=files)
+            if response is None:
+                return None
+
             if response.status_code == 200:
                 result = response.json()
                 if result.get("success"):
@@ -63,6 +116,8 @@ class CloudflareImageHandler:
                 
             return None
             
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Error uploading image to Cloudflare: {str(e)}")
             return None
@@ -71,14 +126,16 @@ class CloudflareImageHandler:
         """Delete image from Cloudflare to prevent orphaned images"""
         if not image_url:
             return True
-            
+
         try:
             # Extract image ID from URL
             image_id = image_url.split('/')[-2]
-            api_url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/images/v1/{image_id}"
+            api_url = f"{self.base_url}/accounts/{self.account_id}/images/v1/{image_id}"
             headers = {"Authorization": f"Bearer {self.api_token}"}
 
-            response = requests.delete(api_url, headers=headers)
+            response = self._api_call("DELETE", api_url, headers=headers)
+            if response is None:
+                return False
             if response.status_code == 200:
                 self.logger.info(f"Successfully deleted image {image_id}")
                 return True
@@ -89,19 +146,25 @@ class CloudflareImageHandler:
                 
                 # Handle slow connection error (5408) with retry
                 if any(error.get('code') == 5408 for error in errors):
+                    if not deadline.allows(30):
+                        self.logger.error(f"Cloudflare slow connection error deleting {image_id}; no time left to retry")
+                        return False
                     self.logger.warning("Cloudflare slow connection error detected, waiting 30 seconds...")
                     time.sleep(30)
-                    retry_response = requests.delete(api_url, headers=headers)
-                    if retry_response.status_code == 200:
+                    retry_response = self._api_call("DELETE", api_url, headers=headers)
+                    if retry_response is not None and retry_response.status_code == 200:
                         self.logger.info(f"Successfully deleted image {image_id} after retry")
                         return True
                     else:
-                        self.logger.error(f"Failed to delete image {image_id} after retry. Status: {retry_response.status_code}")
+                        status = retry_response.status_code if retry_response is not None else "rate limited"
+                        self.logger.error(f"Failed to delete image {image_id} after retry. Status: {status}")
                         return False
                 else:
                     self.logger.error(f"Failed to delete image {image_id}. Status: {response.status_code}")
                     return False
                     
+        except deadline.DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Error deleting image: {e}")
             return False
@@ -0,0 +1,56 @@
+"""Request body compression for ``ApiClient`` (gzip always, zstd when ``zstandard`` is installed)."""
+
+from __future__ import annotations
+
+import gzip
+from typing import Optional
+
+from logging_config import setup_logger
+
+logger = setup_logger(__name__)
+
+# Compression levels used when ``API_COMPRESSION_LEVEL`` is not set: cheap, but most of the gain
+DEFAULT_LEVELS = {"gzip": 5, "zstd": 3}
+
+
+def zstd_available() -> bool:
+    """Return ``True`` when the optional ``zstandard`` package can be imported."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_encoding(name: str) -> Optional[str]:
+    """Map the ``API_COMPRESSION`` setting onto a usable ``Content-Encoding`` (or ``None`` for off)."""
+    name = (name or "").strip().lower()
+    if name in ("", "off", "none", "false", "0"):
+        return None
+    if name == "zstd" and not zstd_available():
+        logger.warning("API_COMPRESSION=zstd but zstandard is not installed; using gzip")
+        return "gzip"
+    if name not in DEFAULT_LEVELS:
+        raise ValueError(f"Unsupported API_COMPRESSION value: {name!r}")
+    return name
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress ``body`` for the given ``Content-Encoding``."""
+    level = DEFAULT_LEVELS[encoding] if level is None else level
+    if encoding == "gzip":
+        # mtime=0 keeps the output deterministic for identical payloads
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    import zstandard
+
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def accept_encoding() -> str:
+    """Return the ``Accept-Encoding`` value for encodings urllib3 can decode here."""
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    return ACCEPT_ENCODING
+
+
+__all__ = ["DEFAULT_LEVELS", "accept_encoding", "compress", "resolve_encoding", "zstd_available"]
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-from dotenv import load_dotenv
+from .settings import Config, running_in_lambda
 
-from .settings import Config
+# Load environment variables for local execution scenarios only; inside Lambda the
+# environment is already populated and importing python-dotenv is pure cold-start cost.
+if not running_in_lambda():
+    from dotenv import load_dotenv
 
-# Load environment variables for local execution scenarios
-load_dotenv()
+    load_dotenv()
 
 # Export a singleton to mirror existing import style (``from config import config``)
 config = Config()
 
-__all__ = ["Config", "config"]
+__all__ = ["Config", "config", "running_in_lambda"]
@@ -6,6 +6,11 @@ import os
 from typing import Optional
 
 
+def running_in_lambda() -> bool:
+    """Return ``True`` when executing inside the AWS Lambda runtime."""
+    return bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME") or os.getenv("AWS_EXECUTION_ENV", "").startswith("AWS_Lambda"))
+
+
 class Config:
     """Unified configuration surface for the user processor Lambda."""
 
@@ -14,21 +19,109 @@ class Config:
         self.BASE_API_URL = self._get_env("BASE_API_URL", required=True).rstrip("/")
         self.API_KEY = self._get_env("INSIGHTS_API_KEY", required=True)
         self.API_TIMEOUT_SECONDS = int(self._get_env("API_TIMEOUT_SECONDS", default="30"))
+        # Connect timeout cap for API, Cloudflare and R2 calls (read timeouts have their own caps)
+        self.CONNECT_TIMEOUT_SECONDS = float(self._get_env("CONNECT_TIMEOUT_SECONDS", default="5"))
+        # Budget for one user end to end; every outbound call's timeout is shortened to what is left
+        self.USER_DEADLINE_SECONDS = float(self._get_env("USER_DEADLINE_SECONDS", default="120"))
         self.API_MAX_RETRIES = int(self._get_env("API_MAX_RETRIES", default="3"))
+        # Base delay for full-jitter retry backoff (seconds, doubled per attempt)
+        self.API_RETRY_BACKOFF_SECONDS = float(self._get_env("API_RETRY_BACKOFF_SECONDS", default="1"))
+        # AIMD in-flight request limit per process: starting point and bounds
+        self.API_CONCURRENCY_INITIAL = int(self._get_env("API_CONCURRENCY_INITIAL", default="4"))
+        self.API_CONCURRENCY_MIN = int(self._get_env("API_CONCURRENCY_MIN", default="1"))
+        self.API_CONCURRENCY_MAX = int(self._get_env("API_CONCURRENCY_MAX", default="32"))
+        # Circuit breaker: consecutive failures before failing fast, and how long to stay open
+        self.API_BREAKER_FAILURE_THRESHOLD = int(self._get_env("API_BREAKER_FAILURE_THRESHOLD", default="5"))
+        self.API_BREAKER_RESET_SECONDS = float(self._get_env("API_BREAKER_RESET_SECONDS", default="30"))
+        # Request body compression: "off", "gzip" or "zstd" (needs zstandard), for bodies of at least MIN_BYTES
+        self.API_COMPRESSION = self._get_env("API_COMPRESSION", default="off").lower()
+        self.API_COMPRESSION_MIN_BYTES = int(self._get_env("API_COMPRESSION_MIN_BYTES", default="4096"))
+        level = self._get_env("API_COMPRESSION_LEVEL", default="")
+        self.API_COMPRESSION_LEVEL = int(level) if level else None
+        # HTTP transport: "requests" (HTTP/1.1 pool) or "http2" (httpx, multiplexed streams)
+        self.API_TRANSPORT = self._get_env("API_TRANSPORT", default="requests").lower()
+        # Pooled connections per process; defaults to API_CONCURRENCY_MAX so no request waits for one
+        pool_size = self._get_env("API_POOL_SIZE", default="")
+        self.API_POOL_SIZE = int(pool_size) if pool_size else self.API_CONCURRENCY_MAX
 
         # Lambda runtime settings - hardcoded since these shouldn't be environment variables
         self.DELETE_AVATARS = False  # Hardcoded to false to match .env default
 
+        # Connection warmup during the init phase: "auto" (provisioned concurrency only), "true" or "false"
+        self.WARMUP_ON_INIT = self._get_env("WARMUP_ON_INIT", default="auto").lower()
+
+        # Deadline-aware scheduling: stop starting users when the remaining invocation time
+        # (minus the margin) no longer covers the p90 of recent per-user durations
+        self.SCHEDULE_SAFETY_MARGIN_MS = float(self._get_env("SCHEDULE_SAFETY_MARGIN_MS", default="2000"))
+        self.SCHEDULE_DEFAULT_USER_MS = float(self._get_env("SCHEDULE_DEFAULT_USER_MS", default="15000"))
+        self.SCHEDULE_HISTORY_SIZE = int(self._get_env("SCHEDULE_HISTORY_SIZE", default="50"))
+
+        # CloudWatch Embedded Metric Format output (one record per processed user)
+        self.METRICS_ENABLED = self._get_env("METRICS_ENABLED", default="true").lower() in ("1", "true", "yes")
+        self.METRICS_NAMESPACE = self._get_env("METRICS_NAMESPACE", default="CronUserProcessor")
+
+        # On-demand profiling of scrape_profile_data (per-event ``profile`` option or sampling)
+        self.PROFILING_SAMPLE_RATE = float(self._get_env("PROFILING_SAMPLE_RATE", default="0"))
+        self.PROFILING_MODE = self._get_env("PROFILING_MODE", default="both")
+        self.PROFILING_DESTINATIONS = self._get_env("PROFILING_DESTINATIONS", default="response")
+        self.PROFILING_R2_PREFIX = self._get_env("PROFILING_R2_PREFIX", default="profiling/")
+
+        # Scraper memory bounds: reject above the hard cap, parse only critical sections above the degraded size
+        self.SCRAPE_MAX_HTML_BYTES = int(self._get_env("SCRAPE_MAX_HTML_BYTES", default=str(16 * 1024 * 1024)))
+        self.SCRAPE_DEGRADED_HTML_BYTES = int(self._get_env("SCRAPE_DEGRADED_HTML_BYTES", default=str(4 * 1024 * 1024)))
+        # Reuse stored section values whose fingerprint is unchanged since the last scrape
+        self.SCRAPE_INCREMENTAL = self._get_env("SCRAPE_INCREMENTAL", default="true").lower() in ("1", "true", "yes")
+        # Persist company/school identities once per profile and reference them from entries (needs API support)
+        self.PROFILE_COMPACT_ENTITIES = self._get_env("PROFILE_COMPACT_ENTITIES", default="false").lower() in ("1", "true", "yes")
+
         # R2 storage configuration
         self.R2_ACCESS_KEY_ID = self._get_env("R2_ACCESS_KEY_ID", required=True)
         self.R2_SECRET_ACCESS_KEY = self._get_env("R2_SECRET_ACCESS_KEY", required=True)
         self.R2_BUCKET_NAME = self._get_env("R2_BUCKET_NAME", required=True)
         self.R2_ENDPOINT_URL = self._get_env("R2_ENDPOINT_URL", required=True)
         self.R2_REGION = self._get_env("R2_REGION", default="auto")
+        # Socket read timeout of the R2 client (botocore's default is 60s)
+        self.R2_READ_TIMEOUT_SECONDS = float(self._get_env("R2_READ_TIMEOUT_SECONDS", default="20"))
+        # Concurrent GETs in prefetch_from_r2, and the bytes they (plus the document being consumed) may hold
+        self.R2_PREFETCH_CONCURRENCY = int(self._get_env("R2_PREFETCH_CONCURRENCY", default="16"))
+        self.R2_PREFETCH_MAX_INFLIGHT_BYTES = int(
+            self._get_env("R2_PREFETCH_MAX_INFLIGHT_BYTES", default=str(64 * 1024 * 1024))
+        )
+        # Expected decompressed/compressed size of .gz snapshots, used to admit their prefetch GETs
+        self.R2_PREFETCH_GZIP_RATIO = float(self._get_env("R2_PREFETCH_GZIP_RATIO", default="8"))
+        # Pooled R2 connections per client; defaults to R2_PREFETCH_CONCURRENCY so no prefetch GET waits for one
+        pool_connections = self._get_env("R2_MAX_POOL_CONNECTIONS", default="")
+        self.R2_MAX_POOL_CONNECTIONS = int(pool_connections) if pool_connections else self.R2_PREFETCH_CONCURRENCY
+        # Hedged GETs: when the first attempt is slower than the tracked percentile of recent GETs,
+        # send a second one and keep whichever answers first, for at most R2_HEDGE_MAX_RATIO of requests
+        self.R2_HEDGE = self._get_env("R2_HEDGE", default="false").lower() in ("1", "true", "yes")
+        self.R2_HEDGE_PERCENTILE = float(self._get_env("R2_HEDGE_PERCENTILE", default="0.95"))
+        self.R2_HEDGE_DEFAULT_DELAY_MS = float(self._get_env("R2_HEDGE_DEFAULT_DELAY_MS", default="200"))
+        self.R2_HEDGE_MIN_DELAY_MS = float(self._get_env("R2_HEDGE_MIN_DELAY_MS", default="20"))
+        self.R2_HEDGE_MAX_RATIO = float(self._get_env("R2_HEDGE_MAX_RATIO", default="0.1"))
+        # Hedges whose losing GET is still running; defaults to a quarter of the pool so losers cannot drain it
+        hedge_outstanding = self._get_env("R2_HEDGE_MAX_OUTSTANDING", default="")
+        self.R2_HEDGE_MAX_OUTSTANDING = (
+            int(hedge_outstanding) if hedge_outstanding else max(1, self.R2_MAX_POOL_CONNECTIONS // 4)
+        )
 
         # Cloudflare Images configuration
         self.CLOUDFLARE_ACCOUNT_ID = self._get_env("CLOUDFLARE_ACCOUNT_ID", required=True)
         self.CLOUDFLARE_API_TOKEN = self._get_env("CLOUDFLARE_API_TOKEN", required=True)
+        # Overridable so load tests can point the handler at a local stand-in
+        self.CLOUDFLARE_API_BASE_URL = self._get_env(
+            "CLOUDFLARE_API_BASE_URL", default="https://api.cloudflare.com/client/v4"
+        ).rstrip("/")
+        # Read timeout cap for the avatar download and Cloudflare API calls
+        self.CLOUDFLARE_TIMEOUT_SECONDS = float(self._get_env("CLOUDFLARE_TIMEOUT_SECONDS", default="30"))
+        # Token bucket for Cloudflare API calls (the account allows 1200 requests / 5 min = 4/s)
+        self.CLOUDFLARE_RATE_PER_SECOND = float(self._get_env("CLOUDFLARE_RATE_PER_SECOND", default="3.5"))
+        self.CLOUDFLARE_RATE_BURST = float(self._get_env("CLOUDFLARE_RATE_BURST", default="10"))
+        # Optional file (e.g. /tmp/cloudflare-rate.bucket) that shares the bucket across processes
+        self.CLOUDFLARE_RATE_LOCK_FILE = self._get_env("CLOUDFLARE_RATE_LOCK_FILE", default="")
+        # Longest wait for a token before giving up, and retries after a 429
+        self.CLOUDFLARE_RATE_MAX_WAIT_SECONDS = float(self._get_env("CLOUDFLARE_RATE_MAX_WAIT_SECONDS", default="30"))
+        self.CLOUDFLARE_RATE_LIMIT_RETRIES = int(self._get_env("CLOUDFLARE_RATE_LIMIT_RETRIES", default="2"))
 
     def _get_env(self, key: str, default: Optional[str] = None, required: bool = False) -> str:
         """Retrieve an environment variable with optional requirement enforcement."""
@@ -37,6 +130,12 @@ class Config:
             raise ValueError(f"Required environment variable {key} is not set")
         return value
 
+    def should_warm_on_init(self) -> bool:
+        """Return ``True`` when pooled connections should be opened at module import."""
+        if self.WARMUP_ON_INIT == "auto":
+            return os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"
+        return self.WARMUP_ON_INIT in ("1", "true", "yes")
+
     def validate(self) -> None:
         """Ensure critical configuration values are present."""
         required_vars = [
@@ -54,4 +153,4 @@ class Config:
             raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
 
-__all__ = ["Config"]
+__all__ = ["Config", "running_in_lambda"]
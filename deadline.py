@@ -0,0 +1,82 @@
+"""Per-user deadlines that bound the timeouts of every outbound call made while processing a user."""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+# Shortest timeout handed to a client; below this a call cannot usefully complete
+MIN_TIMEOUT_SECONDS = 0.05
+
+_current: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised instead of starting (or retrying) a call once the user's deadline has passed."""
+
+
+class Deadline:
+    """A point in time (``time.monotonic``) by which the current user must be finished."""
+
+    def __init__(self, seconds: float) -> None:
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def check(self, what: str = "call") -> float:
+        """Return the seconds left, raising ``DeadlineExceeded`` when too little is left for ``what``."""
+        remaining = self.remaining()
+        if remaining < MIN_TIMEOUT_SECONDS:
+            raise DeadlineExceeded(f"Deadline of {self.budget:.1f}s exceeded before {what}")
+        return remaining
+
+    @contextmanager
+    def activate(self) -> Iterator["Deadline"]:
+        """Make this the deadline seen by ``timeout``/``timeouts`` in this context."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+def current() -> Optional[Deadline]:
+    """Return the active deadline, if any."""
+    return _current.get()
+
+
+def check(what: str = "call") -> None:
+    """Raise ``DeadlineExceeded`` if the active deadline has (nearly) passed."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(what)
+
+
+def timeout(cap: float, what: str = "call") -> float:
+    """Return ``cap`` shortened to the active deadline (``cap`` unchanged outside one)."""
+    deadline = _current.get()
+    if deadline is None:
+        return cap
+    return min(cap, deadline.check(what))
+
+
+def timeouts(connect_cap: float, read_cap: float, what: str = "call") -> Tuple[float, float]:
+    """Return ``(connect, read)`` timeouts, each capped and shortened to the active deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        return connect_cap, read_cap
+    remaining = deadline.check(what)
+    return min(connect_cap, remaining), min(read_cap, remaining)
+
+
+def allows(seconds: float) -> bool:
+    """Return ``True`` when waiting ``seconds`` still leaves time before the active deadline."""
+    deadline = _current.get()
+    return deadline is None or deadline.remaining() - seconds >= MIN_TIMEOUT_SECONDS
+
+
+__all__ = ["Deadline", "DeadlineExceeded", "MIN_TIMEOUT_SECONDS", "allows", "check", "current", "timeout", "timeouts"]
@@ -0,0 +1,155 @@
+"""Hedged requests: fire a second attempt when the first is slower than recent history suggests."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional, Tuple
+
+from metrics import record
+
+
+class LatencyTracker:
+    """Rolling window of attempt latencies; ``delay`` is the hedge trigger derived from them.
+
+    Every attempt that completes is recorded, including hedging losers, so a hedge winning
+    does not hide how slow the primary would have been.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        window: int = 200,
+        default_delay: float = 0.2,
+        min_delay: float = 0.02,
+        min_samples: int = 20,
+    ) -> None:
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def delay(self) -> float:
+        """Seconds to wait for the first attempt before hedging."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, samples[min(len(samples) - 1, int(self.percentile * len(samples)))])
+
+
+class HedgeBudget:
+    """Caps hedges to ``ratio`` of requests: each request earns ``ratio`` of a token, a hedge spends one.
+
+    An attempt that is already on the wire cannot be cancelled, so a hedge also stays
+    outstanding until its losing attempt finishes; at most ``max_outstanding`` may be (None =
+    no cap). Under a latency spike the slow losers pile up and further hedges are refused
+    instead of draining the connection pool.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0, max_outstanding: Optional[int] = None) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self.max_outstanding = max_outstanding
+        self.outstanding = 0
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def on_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.max_outstanding is not None and self.outstanding >= self.max_outstanding:
+                return False
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.outstanding += 1
+                return True
+            return False
+
+    def settle(self) -> None:
+        """Mark a spent hedge finished: both of its attempts have completed."""
+        with self._lock:
+            self.outstanding = max(0, self.outstanding - 1)
+
+
+def hedged_call(
+    func: Callable[[], Any],
+    *,
+    executor: Executor,
+    tracker: LatencyTracker,
+    budget: HedgeBudget,
+    discard: Optional[Callable[[Any], None]] = None,
+    metric_prefix: str = "",
+) -> Tuple[Any, bool]:
+    """Run ``func``, starting a second copy if the first has not finished within ``tracker.delay()``.
+
+    Returns ``(result, hedge_won)`` from whichever attempt succeeds first; the other attempt
+    is left to finish in the background and its result passed to ``discard`` (for example to
+    close a streaming body). The hedge counts against ``budget.max_outstanding`` until that
+    losing attempt has finished. An error before the hedge delay is raised immediately; once
+    hedged, the call only fails when both attempts do (with the first attempt's error).
+    """
+    budget.on_request()
+    primary = _submit(executor, func, tracker)
+    try:
+        return primary.result(timeout=tracker.delay()), False
+    except FutureTimeout:
+        pass
+    if not budget.try_spend():
+        record(f"{metric_prefix}HedgeThrottled", 1)
+        return primary.result(), False
+
+    record(f"{metric_prefix}Hedged", 1)
+    hedge = _submit(executor, func, tracker)
+    pending = {primary, hedge}
+    errors = {}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            error = future.exception()
+            if error is None:
+                loser = hedge if future is primary else primary
+                loser.add_done_callback(lambda attempt: _settle(attempt, discard, budget))
+                if future is hedge:
+                    record(f"{metric_prefix}HedgeWins", 1)
+                return future.result(), future is hedge
+            errors[future] = error
+    budget.settle()
+    raise errors[primary]
+
+
+def _submit(executor: Executor, func: Callable[[], Any], tracker: LatencyTracker) -> Future:
+    started = time.perf_counter()
+
+    def observe(attempt: Future) -> None:
+        if attempt.exception() is None:
+            tracker.observe(time.perf_counter() - started)
+
+    future = executor.submit(func)
+    future.add_done_callback(observe)
+    return future
+
+
+def _settle(future: Future, discard: Optional[Callable[[Any], None]], budget: HedgeBudget) -> None:
+    """Dispose of a losing attempt once it finishes and free its hedge for reuse."""
+    try:
+        if discard is not None and future.exception() is None:
+            discard(future.result())
+    finally:
+        budget.settle()
+
+
+__all__ = ["HedgeBudget", "LatencyTracker", "hedged_call"]
@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 from config import config
 from logging_config import setup_logger
 from processor import UserProcessor
+from profiling import ProfileRequest, resolve_profile_request
+from scheduling import CostEstimator, DeadlineScheduler, remaining_time_getter
+from serialization import JSONDecodeError, loads
 
 logger = setup_logger(__name__)
 _processor: UserProcessor | None = None
+_estimator: CostEstimator | None = None
 
 
 def _get_processor() -> UserProcessor:
@@ -23,13 +26,21 @@ def _get_processor() -> UserProcessor:
     return _processor
 
 
+def _get_estimator() -> CostEstimator:
+    """Return the per-container user cost estimator (history survives warm invocations)."""
+    global _estimator
+    if _estimator is None:
+        _estimator = CostEstimator(config.SCHEDULE_DEFAULT_USER_MS, window=config.SCHEDULE_HISTORY_SIZE)
+    return _estimator
+
+
 def _extract_user_id(event: Dict[str, Any]) -> Tuple[str | None, Dict[str, Any]]:
     """Extract the ``userId`` from the Lambda event payload."""
     body = event.get("body")
     if isinstance(body, str):
         try:
-            body = json.loads(body or "{}")
-        except json.JSONDecodeError:
+            body = loads(body or "{}")
+        except JSONDecodeError:
             logger.warning("Unable to decode event body as JSON; falling back to top-level keys")
             body = {}
 
@@ -41,10 +52,37 @@ def _extract_user_id(event: Dict[str, Any]) -> Tuple[str | None, Dict[str, Any]]
     return event.get("userId"), body if isinstance(body, dict) else {}
 
 
+def _extract_user_ids(event: Dict[str, Any], body: Dict[str, Any]) -> List[str]:
+    """Return the batch of ``userIds`` from the body or the top-level event (empty if absent)."""
+    user_ids = body.get("userIds") or event.get("userIds") or []
+    return [user_id for user_id in user_ids if user_id] if isinstance(user_ids, list) else []
+
+
+def _is_warmup_event(event: Dict[str, Any], body: Dict[str, Any]) -> bool:
+    """Return ``True`` for keep-alive pings such as ``{"warmup": true}``."""
+    return bool(event.get("warmup") or body.get("warmup"))
+
+
+def _warm() -> Dict[str, Any]:
+    """Prime pooled connections and return the per-target warmup report."""
+    return _get_processor().warm()
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Standard Lambda handler accepting JSON payloads with ``userId``."""
     user_id, request_body = _extract_user_id(event)
-    if not user_id:
+    if _is_warmup_event(event, request_body):
+        return {
+            "statusCode": 200,
+            "body": {
+                "success": True,
+                "warmup": True,
+                "details": _warm(),
+            },
+        }
+
+    user_ids = _extract_user_ids(event, request_body)
+    if not user_id and not user_ids:
         return {
             "statusCode": 400,
             "body": {
@@ -53,14 +91,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             },
         }
 
-    processor = _get_processor()
-
     try:
-        result = processor.process_user(user_id)
-    except Exception as exc:  # pragma: no cover - defensive logging
-        logger.exception("Unhandled error while processing user %s", user_id)
+        profile = resolve_profile_request(request_body.get("profile", event.get("profile")))
+    except ValueError as exc:
         return {
-            "statusCode": 500,
+            "statusCode": 400,
             "body": {
                 "success": False,
                 "userId": user_id,
@@ -68,6 +103,69 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             },
         }
 
+    processor = _get_processor()
+    scheduler = DeadlineScheduler(
+        remaining_time_getter(context), _get_estimator(), safety_margin_ms=config.SCHEDULE_SAFETY_MARGIN_MS
+    )
+
+    if user_ids:
+        completed, unprocessed = scheduler.run(user_ids, lambda uid: _process_one(processor, uid, profile, scheduler))
+        if unprocessed:
+            logger.warning("Deferring %d of %d users: not enough time left in this invocation", len(unprocessed), len(user_ids))
+        # Users cut off by their deadline were not marked errored; hand them back for re-dispatch
+        unprocessed = unprocessed + [uid for uid, (status, _) in completed if status == 504]
+        results = [{**body, "statusCode": status} for _, (status, body) in completed]
+        response_body: Dict[str, Any] = {
+            "success": all(body["success"] for body in results),
+            "message": f"Processed {len(results)} of {len(user_ids)} users",
+            "results": results,
+            "unprocessed": unprocessed,
+        }
+        if request_body:
+            response_body["requestBody"] = request_body
+        return {"statusCode": 200, "body": response_body}
+
+    completed, unprocessed = scheduler.run([user_id], lambda uid: _process_one(processor, uid, profile, scheduler))
+    if unprocessed:
+        logger.warning("Deferring user %s: not enough time left in this invocation", user_id)
+        return {
+            "statusCode": 503,
+            "body": {
+                "success": False,
+                "userId": user_id,
+                "message": "Not enough time remaining to process user",
+                "unprocessed": unprocessed,
+            },
+        }
+    status_code, response_body = completed[0][1]
+    if request_body:
+        response_body["requestBody"] = request_body
+
+    return {
+        "statusCode": status_code,
+        "body": response_body,
+    }
+
+
+def _process_one(
+    processor: UserProcessor, user_id: str, profile: ProfileRequest | None, scheduler: DeadlineScheduler
+) -> Tuple[int, Dict[str, Any]]:
+    """Process one user and return ``(status_code, response_body)``; never raises.
+
+    The user's deadline ends ``SCHEDULE_SAFETY_MARGIN_MS`` before the invocation's does.
+    """
+    remaining_ms = scheduler.remaining_ms() - scheduler.safety_margin_ms
+    deadline_seconds = remaining_ms / 1000.0 if remaining_ms != float("inf") else None
+    try:
+        result = processor.process_user(user_id, profile=profile, deadline_seconds=deadline_seconds)
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.exception("Unhandled error while processing user %s", user_id)
+        return 500, {
+            "success": False,
+            "userId": user_id,
+            "error": str(exc),
+        }
+
     success = bool(result.get("success"))
     status_code = 200 if success else result.get("statusCode", 500)
 
@@ -89,14 +187,15 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     for field in passthrough_fields:
         if field in result and result[field] is not None:
             response_body[field] = result[field]
+    return status_code, response_body
 
-    if request_body:
-        response_body["requestBody"] = request_body
 
-    return {
-        "statusCode": status_code,
-        "body": response_body,
-    }
+# Open connections during the init phase (free of billed duration under provisioned concurrency)
+if config.should_warm_on_init():
+    try:
+        logger.info("Warming service connections during init: %s", _warm())
+    except Exception as exc:  # pragma: no cover - warmup must never block initialisation
+        logger.warning("Init-phase warmup failed: %s", exc)
 
 
 __all__ = ["lambda_handler"]
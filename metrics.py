@@ -0,0 +1,139 @@
+"""CloudWatch Embedded Metric Format (EMF) helpers for per-user stage timings."""
+
+from __future__ import annotations
+
+import contextvars
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from serialization import dumps_str
+
+DEFAULT_NAMESPACE = "CronUserProcessor"
+
+try:  # ``resource`` is POSIX-only; peak RSS is simply omitted elsewhere
+    import resource
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    resource = None
+
+_current: contextvars.ContextVar[Optional["UserMetrics"]] = contextvars.ContextVar("user_metrics", default=None)
+
+
+class UserMetrics:
+    """Collect stage durations and counters for one user and emit a single EMF record."""
+
+    def __init__(self, user_id: str, *, namespace: str = DEFAULT_NAMESPACE, enabled: bool = True) -> None:
+        self.user_id = user_id
+        self.namespace = namespace
+        self.enabled = enabled
+        self.outcome = "unknown"
+        self._started = time.perf_counter()
+        self._rss_at_start = peak_rss_bytes()
+        # name -> (value, unit); insertion order is preserved in the emitted record
+        self._values: Dict[str, Tuple[float, str]] = {}
+        self._properties: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and record it as ``<name>Ms``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_duration(name, (time.perf_counter() - started) * 1000.0)
+
+    def add_duration(self, name: str, elapsed_ms: float) -> None:
+        """Accumulate a duration in milliseconds under ``<name>Ms``."""
+        self.add(f"{name}Ms", elapsed_ms, "Milliseconds")
+
+    def add(self, name: str, value: float, unit: str = "Count") -> None:
+        """Accumulate ``value`` into the metric ``name``."""
+        previous, _ = self._values.get(name, (0.0, unit))
+        self._values[name] = (previous + value, unit)
+
+    def set(self, name: str, value: float, unit: str = "None") -> None:
+        """Overwrite the metric ``name`` with its latest ``value`` (a gauge)."""
+        self._values[name] = (value, unit)
+
+    def set_property(self, key: str, value: Any) -> None:
+        """Attach a non-metric property (searchable in Logs Insights, not aggregated)."""
+        self._properties[key] = value
+
+    @contextmanager
+    def activate(self) -> Iterator["UserMetrics"]:
+        """Make this recorder the target of module-level ``record`` calls."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def to_emf(self) -> Dict[str, Any]:
+        """Return the EMF document for this user; the recorded values are left untouched."""
+        values = dict(self._values)
+        previous, _ = values.get("TotalMs", (0.0, "Milliseconds"))
+        values["TotalMs"] = (previous + (time.perf_counter() - self._started) * 1000.0, "Milliseconds")
+        peak_rss = peak_rss_bytes()
+        if peak_rss is not None:
+            # High-water mark of the container and how much this user raised it
+            values["PeakRss"] = (float(peak_rss), "Bytes")
+            values["PeakRssGrowth"] = (float(max(0, peak_rss - (self._rss_at_start or 0))), "Bytes")
+        metric_defs: List[Dict[str, str]] = [{"Name": name, "Unit": unit} for name, (_, unit) in values.items()]
+        record: Dict[str, Any] = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [
+                    {
+                        "Namespace": self.namespace,
+                        "Dimensions": [["Outcome"], []],
+                        "Metrics": metric_defs,
+                    }
+                ],
+            },
+            "Outcome": self.outcome,
+            "userId": self.user_id,
+        }
+        record.update(self._properties)
+        for name, (value, _) in values.items():
+            record[name] = round(value, 3)
+        return record
+
+    def emit(self) -> None:
+        """Write the EMF record as a single stdout line (CloudWatch parses it on ingest)."""
+        if not self.enabled:
+            return
+        stream = sys.stdout
+        stream.write(dumps_str(self.to_emf(), default=str) + "\n")
+        stream.flush()
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the process peak resident set size in bytes, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current() -> Optional[UserMetrics]:
+    """Return the recorder active in this context, if any."""
+    return _current.get()
+
+
+def record(name: str, value: float, unit: str = "Count") -> None:
+    """Add ``value`` to ``name`` on the active recorder; a no-op outside ``activate``."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(name, value, unit)
+
+
+def gauge(name: str, value: float, unit: str = "None") -> None:
+    """Set ``name`` to ``value`` on the active recorder; a no-op outside ``activate``."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.set(name, value, unit)
+
+
+__all__ = ["DEFAULT_NAMESPACE", "UserMetrics", "current", "gauge", "peak_rss_bytes", "record"]
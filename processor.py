@@ -3,33 +3,138 @@
 from __future__ import annotations
 
 import datetime
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from bs.scrape import scrape_profile_data
 from cloudflare_handler import CloudflareImageHandler
 from clients import ServiceClients, get_clients
 from config import config
+from deadline import Deadline, DeadlineExceeded
 from logging_config import setup_logger
-from utils import download_file_from_r2
+from metrics import UserMetrics
+from profiling import ProfileRequest, profile_call, publish_report
+from resilience import CircuitOpenError, OverloadedError
+from utils import download_file_from_r2, warm_r2_client
+
+
+class SnapshotError(RuntimeError):
+    """Raised by ``UserProcessor.scrape_snapshot`` with the message recorded against the user."""
 
 
 class UserProcessor:
     """Coordinate user profile scraping and persistence via REST APIs."""
 
-    def __init__(self, *, config_obj=config, clients: Optional[ServiceClients] = None) -> None:
+    def __init__(
+        self,
+        *,
+        config_obj=config,
+        clients: Optional[ServiceClients] = None,
+        cloudflare_handler: Optional[CloudflareImageHandler] = None,
+    ) -> None:
         self.config = config_obj
         self.logger = setup_logger(__name__)
         self.clients = clients or get_clients()
         self.api = self.clients.api
         self.r2_client = self.clients.r2_client
-        self.cloudflare_handler = CloudflareImageHandler()
+        self.cloudflare_handler = cloudflare_handler or CloudflareImageHandler()
+
+    def warm(self) -> Dict[str, Any]:
+        """Pre-establish pooled connections to the API, R2 and Cloudflare.
+
+        Failures are logged and reported per target; warmup never raises.
+        """
+        targets: Dict[str, Callable[[], None]] = {
+            "api": self.api.warm,
+            "r2": lambda: warm_r2_client(self.r2_client),
+            "cloudflare": self.cloudflare_handler.warm,
+        }
+        results: Dict[str, Any] = {}
+        for name, warm in targets.items():
+            started = time.perf_counter()
+            try:
+                warm()
+            except Exception as exc:  # pragma: no cover - network failures are non-fatal
+                self.logger.warning("Warmup of %s failed: %s", name, exc)
+                results[name] = {"success": False, "error": str(exc)}
+                continue
+            results[name] = {"success": True, "elapsedMs": round((time.perf_counter() - started) * 1000, 1)}
+        return results
+
+    def process_user(
+        self,
+        user_id: str,
+        *,
+        profile: Optional[ProfileRequest] = None,
+        reprocess: bool = False,
+        deadline_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Process a single user and return a structured result payload.
+
+        When ``profile`` is given, scraping runs under cProfile/tracemalloc and the
+        report summary is returned under ``details.profile``. ``reprocess`` re-scrapes
+        users that were already processed and ignores their stored section fingerprints
+        (used by backfills after an extractor change).
+
+        Every outbound call's timeouts are derived from a per-user ``Deadline`` of
+        ``USER_DEADLINE_SECONDS`` (or ``deadline_seconds`` if shorter). A user that runs
+        out of time gets ``statusCode`` 504 and is not marked as errored.
+        """
+        details: Dict[str, Any] = {}
+        metrics = UserMetrics(
+            user_id,
+            namespace=self.config.METRICS_NAMESPACE,
+            enabled=self.config.METRICS_ENABLED,
+        )
+        budget = self.config.USER_DEADLINE_SECONDS
+        if deadline_seconds is not None:
+            budget = min(budget, deadline_seconds)
+        try:
+            with metrics.activate(), Deadline(budget).activate():
+                try:
+                    result = self._process_user(user_id, metrics, profile, details, reprocess)
+                except DeadlineExceeded as exc:
+                    self.logger.warning("Gave up on user %s: %s", user_id, exc)
+                    result = {
+                        "success": False,
+                        "statusCode": 504,
+                        "message": f"Deadline exceeded: {exc}",
+                        "userId": user_id,
+                    }
+        except Exception:
+            metrics.outcome = "exception"
+            raise
+        else:
+            metrics.outcome = _outcome(result)
+        finally:
+            metrics.emit()
 
-    def process_user(self, user_id: str) -> Dict[str, Any]:
-        """Process a single user and return a structured result payload."""
+        if details:
+            result.setdefault("details", {}).update(details)
+        return result
+
+    def _process_user(
+        self,
+        user_id: str,
+        metrics: UserMetrics,
+        profile: Optional[ProfileRequest],
+        details: Dict[str, Any],
+        reprocess: bool = False,
+    ) -> Dict[str, Any]:
+        """Run the fetch → download → scrape → avatar → persist pipeline for one user."""
         self.logger.info("Processing user %s", user_id)
 
         try:
-            user = self._fetch_user(user_id)
+            with metrics.stage("FetchUser"):
+                user = self.fetch_user(user_id)
+        except DeadlineExceeded:
+            raise
+        except (CircuitOpenError, OverloadedError) as exc:
+            self.logger.warning("Skipping user %s while the API is unavailable: %s", user_id, exc)
+            return {
+                "success": False,
+                "statusCode": 503,
+                "message": f"API unavailable: {exc}",
+            }
         except Exception as exc:  # pragma: no cover - API failures logged below
             self.logger.error("Failed to load user %s: %s", user_id, exc)
             return {
@@ -46,7 +151,7 @@ class UserProcessor:
                 "message": "User not found",
             }
 
-        if user.get("descriptionGenerated"):
+        if user.get("descriptionGenerated") and not reprocess:
             self.logger.info("User %s already processed; skipping", user_id)
             return {
                 "success": True,
@@ -65,24 +170,28 @@ class UserProcessor:
         if not user.get("scrapped"):
             return self._handle_error(user_id, "User not marked as scrapped")
 
-        html_content = download_file_from_r2(self.r2_client, html_path)
-        if not html_content:
-            return self._handle_error(user_id, "Failed to download HTML content from storage")
-
         try:
-            profile_data = scrape_profile_data(html_content)
-        except Exception as exc:  # pragma: no cover - defensive logging
-            return self._handle_error(user_id, f"Error extracting profile data: {exc}")
-
-        if not profile_data:
-            return self._handle_error(user_id, "Failed to extract profile data from HTML")
+            profile_data, section_fingerprints = self.scrape_snapshot(
+                html_path,
+                metrics=metrics,
+                user=user,
+                incremental=not reprocess,
+                profile=profile,
+                details=details,
+            )
+        except SnapshotError as exc:
+            return self._handle_error(user_id, str(exc))
 
         existing_avatar = user.get("avatarURL")
-        new_avatar_url = self._sync_avatar(user_id, profile_data, existing_avatar)
+        with metrics.stage("SyncAvatar"):
+            new_avatar_url = self._sync_avatar(user_id, profile_data, existing_avatar)
         avatar_changed = bool(new_avatar_url and new_avatar_url != existing_avatar)
 
         try:
-            self._persist_profile(user_id, profile_data, new_avatar_url)
+            with metrics.stage("PersistProfile"):
+                self._persist_profile(user_id, profile_data, new_avatar_url, section_fingerprints)
+        except DeadlineExceeded:
+            raise
         except Exception as exc:  # pragma: no cover - API failures logged inside helper
             return self._handle_error(user_id, f"Failed to update user via API: {exc}")
 
@@ -98,7 +207,90 @@ class UserProcessor:
             "skipped": False,
         }
 
-    def _fetch_user(self, user_id: str) -> Dict[str, Any]:
+    def scrape_snapshot(
+        self,
+        html_path: str,
+        *,
+        metrics: Optional[UserMetrics] = None,
+        user: Optional[Dict[str, Any]] = None,
+        profile: Optional[ProfileRequest] = None,
+        details: Optional[Dict[str, Any]] = None,
+        html_content: Optional[bytes] = None,
+        incremental: bool = True,
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Download ``html_path`` from R2 and scrape it into ``(profile_data, section_fingerprints)``.
+
+        ``user`` supplies the stored profile and fingerprints for incremental re-extraction
+        (off with ``incremental=False``) and the sections a degraded scrape carries over.
+        ``html_content`` is a document already downloaded (e.g. by ``prefetch_from_r2``).
+        Failures raise ``SnapshotError``; nothing is persisted or marked here.
+        """
+        if metrics is None:
+            metrics = UserMetrics(html_path, enabled=False)
+        if details is None:
+            details = {}
+
+        if html_content is None:
+            with metrics.stage("DownloadHtml"):
+                # Raw bytes: the scraper detects the encoding and avoids a full-size str copy
+                html_content = download_file_from_r2(self.r2_client, html_path, decode=False)
+        if not html_content:
+            raise SnapshotError("Failed to download HTML content from storage")
+        metrics.add("HtmlSize", len(html_content), "Bytes")
+
+        # Deferred import: BeautifulSoup is only needed once we actually have HTML to parse
+        from bs.records import expand_profile
+        from bs.scrape import is_degraded_size, scrape_profile_data
+
+        scrape_timings: Dict[str, float] = {}
+        section_fingerprints: Dict[str, str] = {}
+        scrape_kwargs = {
+            "timings": scrape_timings,
+            "max_html_bytes": self.config.SCRAPE_MAX_HTML_BYTES,
+            "degraded_html_bytes": self.config.SCRAPE_DEGRADED_HTML_BYTES,
+            "fingerprints": section_fingerprints,
+        }
+        stored_profile = (user or {}).get("profileData")
+        previous_fingerprints = None
+        if incremental and self.config.SCRAPE_INCREMENTAL:
+            previous_fingerprints = (user or {}).get("sectionFingerprints")
+        degraded = is_degraded_size(html_content, self.config.SCRAPE_DEGRADED_HTML_BYTES)
+        if degraded:
+            metrics.add("DegradedScrape", 1)
+        if isinstance(stored_profile, dict) and (previous_fingerprints or degraded):
+            # Stored profiles may be compacted (PROFILE_COMPACT_ENTITIES); reuse needs full entries
+            scrape_kwargs["previous_profile"] = expand_profile(stored_profile)
+            if previous_fingerprints:
+                scrape_kwargs["previous_fingerprints"] = previous_fingerprints
+        try:
+            with metrics.stage("Scrape"):
+                if profile is None:
+                    profile_data = scrape_profile_data(html_content, **scrape_kwargs)
+                else:
+                    profile_data, report = profile_call(profile, scrape_profile_data, html_content, **scrape_kwargs)
+        except Exception as exc:  # pragma: no cover - defensive logging
+            raise SnapshotError(f"Error extracting profile data: {exc}") from exc
+        finally:
+            for extractor, elapsed_ms in scrape_timings.items():
+                metrics.add_duration(f"Scrape.{extractor}", elapsed_ms)
+            # Drop the raw document before avatar upload and persistence
+            html_content = None
+
+        if profile is not None:
+            # Outside the try: a report that cannot be written must not fail the scraped user
+            details["profile"] = publish_report(
+                profile, report, metrics.user_id, r2_client=self.r2_client, config_obj=self.config
+            )
+
+        if not profile_data:
+            raise SnapshotError("Failed to extract profile data from HTML")
+        metrics.add("WorkExperienceCount", len(profile_data.get("workExperience") or []))
+        if "previous_fingerprints" in scrape_kwargs:
+            reused = sum(1 for name, value in section_fingerprints.items() if previous_fingerprints.get(name) == value)
+            metrics.add("SectionsReused", reused)
+        return profile_data, section_fingerprints
+
+    def fetch_user(self, user_id: str) -> Dict[str, Any]:
         """Retrieve the user payload from the REST API."""
         # API Route: users.getById, Input: {"userId": user_id}, Output: {"data": {...}}
         response = self.api.get(f"users/{user_id}")
@@ -108,16 +300,17 @@ class UserProcessor:
             return response["data"]
         return response
 
-    def _persist_profile(self, user_id: str, profile_data: Dict[str, Any], avatar_url: Optional[str]) -> None:
+    def _persist_profile(
+        self,
+        user_id: str,
+        profile_data: Dict[str, Any],
+        avatar_url: Optional[str],
+        section_fingerprints: Optional[Dict[str, str]] = None,
+    ) -> None:
         """Persist scraped profile data back through the REST API."""
-        payload = {
-            "userId": user_id,
-            "profileData": profile_data,
-            "descriptionGenerated": True,
-            "descriptionGeneratedAt": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-        }
-        if avatar_url:
-            payload["avatarURL"] = avatar_url
+        payload = build_profile_payload(
+            user_id, profile_data, avatar_url, section_fingerprints, compact=self.config.PROFILE_COMPACT_ENTITIES
+        )
 
         # API Route: users.updateProfile, Input: payload, Output: {"success": bool}
         result = self.api.request("PATCH", f"users/{user_id}", payload)
@@ -175,4 +368,49 @@ class UserProcessor:
         }
 
 
-__all__ = ["UserProcessor"]
+def build_profile_payload(
+    user_id: str,
+    profile_data: Dict[str, Any],
+    avatar_url: Optional[str] = None,
+    section_fingerprints: Optional[Dict[str, str]] = None,
+    compact: bool = False,
+) -> Dict[str, Any]:
+    """Return the ``users.updateProfile`` payload for freshly scraped ``profile_data``.
+
+    ``compact`` stores each company and school once in ``profileData`` and makes entries
+    reference it (see ``bs.records.compact_profile``).
+    """
+    if compact:
+        from bs.records import compact_profile
+
+        profile_data = compact_profile(profile_data)
+    payload = {
+        "userId": user_id,
+        "profileData": profile_data,
+        "descriptionGenerated": True,
+        "descriptionGeneratedAt": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+    if section_fingerprints:
+        # Stored alongside profileData so the next scrape can skip unchanged sections
+        payload["sectionFingerprints"] = section_fingerprints
+    if avatar_url:
+        payload["avatarURL"] = avatar_url
+    return payload
+
+
+def _outcome(result: Dict[str, Any]) -> str:
+    """Map a ``process_user`` result onto the ``Outcome`` metric dimension."""
+    if result.get("skipped"):
+        return "skipped"
+    if result.get("success"):
+        return "success"
+    if result.get("statusCode") == 404:
+        return "not_found"
+    if result.get("statusCode") == 504:
+        return "timeout"
+    if result.get("statusCode") == 503:
+        return "unavailable"
+    return "error"
+
+
+__all__ = ["SnapshotError", "UserProcessor", "build_profile_payload"]
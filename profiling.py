@@ -0,0 +1,196 @@
+"""On-demand cProfile / tracemalloc capture around profile scraping."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import random
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from config import config
+from logging_config import setup_logger
+from serialization import dumps
+
+logger = setup_logger(__name__)
+
+PROFILE_MODES = ("cpu", "memory", "both")
+PROFILE_DESTINATIONS = ("tmp", "r2", "response")
+PROFILE_TMP_DIR = "/tmp/profiles"
+
+
+class ProfileRequest:
+    """Resolved profiling options for a single invocation."""
+
+    def __init__(self, mode: str = "both", destinations: Iterable[str] = ("response",), top: int = 20) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profiling mode {mode!r}; expected one of {PROFILE_MODES}")
+        unknown = [dest for dest in destinations if dest not in PROFILE_DESTINATIONS]
+        if unknown:
+            raise ValueError(f"Unsupported profiling destination(s) {unknown}; expected {PROFILE_DESTINATIONS}")
+        self.mode = mode
+        self.destinations = tuple(destinations)
+        self.top = top
+
+    @property
+    def cpu(self) -> bool:
+        return self.mode in ("cpu", "both")
+
+    @property
+    def memory(self) -> bool:
+        return self.mode in ("memory", "both")
+
+
+def resolve_profile_request(option: Any = None, *, config_obj=config) -> Optional[ProfileRequest]:
+    """Build a ``ProfileRequest`` from an event option or the configured sampling rate.
+
+    ``option`` may be ``True`` or a dict with ``mode``, ``destination`` (string or list) and
+    ``top``. Without an explicit option a request is produced for a random
+    ``PROFILING_SAMPLE_RATE`` fraction of invocations; otherwise ``None`` is returned.
+    """
+    if not option:
+        rate = config_obj.PROFILING_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return None
+        option = {}
+    elif not isinstance(option, dict):
+        option = {}
+
+    destinations = option.get("destination", config_obj.PROFILING_DESTINATIONS)
+    if isinstance(destinations, str):
+        destinations = [part.strip() for part in destinations.split(",") if part.strip()]
+    return ProfileRequest(
+        mode=option.get("mode", config_obj.PROFILING_MODE),
+        destinations=destinations,
+        top=int(option.get("top", 20)),
+    )
+
+
+def profile_call(request: ProfileRequest, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``func`` under the requested profilers and return ``(result, report)``.
+
+    Exceptions from ``func`` propagate once the profilers have been stopped.
+    """
+    import cProfile
+    import tracemalloc
+
+    profiler = cProfile.Profile() if request.cpu else None
+    started_tracing = False
+    if request.memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    if request.memory:
+        tracemalloc.reset_peak()
+
+    report: Dict[str, Any] = {"mode": request.mode}
+    snapshot = None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            return func(*args, **kwargs), report
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if request.memory:
+                current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                report["peakBytes"] = peak_bytes
+                report["retainedBytes"] = current_bytes
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        if profiler is not None:
+            report["hotFunctions"] = _hot_functions(profiler, request.top)
+            report["_profiler"] = profiler
+        if snapshot is not None:
+            report["topAllocations"] = _top_allocations(snapshot, request.top)
+
+
+def _hot_functions(profiler, top: int) -> list:
+    """Return the ``top`` functions by cumulative time."""
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, funcname), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{lineno}({funcname})",
+                "calls": ncalls,
+                "totalMs": round(tottime * 1000.0, 3),
+                "cumulativeMs": round(cumtime * 1000.0, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumulativeMs"], reverse=True)
+    return rows[:top]
+
+
+def _top_allocations(snapshot, top: int) -> list:
+    """Return the ``top`` allocation sites by live size at the end of the call."""
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    return [
+        {
+            "location": f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            "sizeBytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+
+
+def publish_report(
+    request: ProfileRequest,
+    report: Dict[str, Any],
+    user_id: str,
+    *,
+    r2_client=None,
+    config_obj=config,
+) -> Dict[str, Any]:
+    """Write ``report`` to the requested destinations and return the response summary."""
+    profiler = report.pop("_profiler", None)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    name = f"{user_id}-{stamp}"
+    summary: Dict[str, Any] = {}
+
+    if "response" in request.destinations:
+        summary.update(report)
+
+    if "tmp" in request.destinations:
+        path = os.path.join(PROFILE_TMP_DIR, f"{name}.json")
+        try:
+            os.makedirs(PROFILE_TMP_DIR, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2, default=str)
+            if profiler is not None:
+                # Raw pstats dump for snakeviz / ``python -m pstats`` inspection
+                profiler.dump_stats(os.path.join(PROFILE_TMP_DIR, f"{name}.prof"))
+            summary["tmpPath"] = path
+        except Exception as exc:  # pragma: no cover - profiling output must not fail the user
+            logger.warning("Failed to write profiling report to %s: %s", path, exc)
+
+    if "r2" in request.destinations and r2_client is not None:
+        key = f"{config_obj.PROFILING_R2_PREFIX.rstrip('/')}/{name}.json"
+        try:
+            r2_client.put_object(
+                Bucket=config_obj.R2_BUCKET_NAME,
+                Key=key,
+                Body=dumps(report, default=str),
+                ContentType="application/json",
+            )
+            summary["r2Key"] = key
+        except Exception as exc:  # pragma: no cover - profiling output must not fail the user
+            logger.warning("Failed to upload profiling report to R2 (%s): %s", key, exc)
+
+    logger.info(
+        "Profiling report for user %s: peak=%s bytes, hottest=%s",
+        user_id,
+        report.get("peakBytes"),
+        (report.get("hotFunctions") or [{}])[0].get("function"),
+    )
+    return summary
+
+
+__all__ = ["ProfileRequest", "profile_call", "publish_report", "resolve_profile_request"]
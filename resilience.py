@@ -0,0 +1,337 @@
+"""Client-side overload protection: AIMD concurrency limiting, circuit breaking and rate limiting."""
+
+from __future__ import annotations
+
+import os
+import random
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from logging_config import setup_logger
+from metrics import gauge, record
+
+logger = setup_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# Numeric encoding for the ``<prefix>CircuitState`` metric
+CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+
+class OverloadedError(RuntimeError):
+    """Raised when no concurrency slot frees up in time (limit reached or paused by ``Retry-After``)."""
+
+
+class AimdLimiter:
+    """Additive-increase / multiplicative-decrease cap on in-flight requests.
+
+    Every success raises the limit by ``increase / limit`` (about +``increase`` per window of
+    requests); an overload signal (429, 503, ``Retry-After``) multiplies it by ``decrease``,
+    at most once per ``cooldown`` seconds so one burst of rejections counts as one signal.
+    ``Retry-After`` also pauses new acquisitions until the advertised time (plus jitter so
+    waiting callers do not resume in lockstep).
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: float = 4,
+        minimum: float = 1,
+        maximum: float = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        metric_prefix: str = "Api",
+    ) -> None:
+        self.minimum = float(minimum)
+        self.maximum = float(max(minimum, maximum))
+        self.limit = min(self.maximum, max(self.minimum, float(initial)))
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.metric_prefix = metric_prefix
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a slot; returns ``False`` if ``timeout`` seconds elapse first."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                pause = self._paused_until - now
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    break
+                wait = pause if pause > 0 else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(wait)
+        waited_ms = (time.monotonic() - started) * 1000.0
+        if waited_ms >= 1.0:
+            record(f"{self.metric_prefix}LimiterWaitMs", waited_ms, "Milliseconds")
+        return True
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            limit = self.limit
+            self._condition.notify()
+        gauge(f"{self.metric_prefix}ConcurrencyLimit", limit)
+
+    def on_overload(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._condition:
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                # Spread resumption over 10% of the advertised delay
+                self._paused_until = max(self._paused_until, now + retry_after * (1.0 + random.random() * 0.1))
+            limit = self.limit
+        record(f"{self.metric_prefix}Throttled", 1)
+        gauge(f"{self.metric_prefix}ConcurrencyLimit", limit)
+
+    @contextmanager
+    def slot(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold one in-flight slot for the enclosed request."""
+        if not self.acquire(timeout):
+            raise OverloadedError(f"No {self.metric_prefix} concurrency slot within {timeout}s")
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe phase.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls fail fast
+    with ``CircuitOpenError`` for ``reset_timeout`` seconds. Then up to ``half_open_calls``
+    probes are let through: a success closes the circuit, a failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        name: str = "api",
+        metric_prefix: str = "Api",
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = max(1, half_open_calls)
+        self.name = name
+        self.metric_prefix = metric_prefix
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may proceed now."""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+        record(f"{self.metric_prefix}CircuitRejected", 1)
+        raise CircuitOpenError(f"Circuit for {self.name} is open; retry in {retry_in:.1f}s")
+
+    def release(self) -> None:
+        """Hand back a half-open probe whose call ended without a success or failure verdict."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        """Switch state (lock held) and publish it."""
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning("Circuit for %s opened after %s consecutive failures", self.name, self._failures)
+        elif state == CLOSED:
+            logger.info("Circuit for %s closed", self.name)
+        self._probes = 0
+        self.state = state
+        gauge(f"{self.metric_prefix}CircuitState", CIRCUIT_STATE_VALUES[state])
+
+
+class TokenBucket:
+    """Token bucket of ``burst`` tokens refilled at ``rate`` per second, shared by all threads.
+
+    With ``lock_path`` the bucket state lives in that file and every update happens under an
+    exclusive ``flock``, so separate processes on the same host (or Lambda container ``/tmp``)
+    draw from one budget. Without it, or where ``fcntl`` is unavailable, the bucket is
+    per-process.
+    """
+
+    _STATE = struct.Struct("<dd")  # tokens, wall-clock time of the last refill
+
+    def __init__(self, rate: float, burst: float, *, lock_path: Optional[str] = None, metric_prefix: str = "") -> None:
+        self.rate = max(float(rate), 1e-6)
+        self.burst = max(1.0, float(burst))
+        self.metric_prefix = metric_prefix
+        self._tokens = self.burst
+        self._updated = time.time()
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._fcntl = None
+        if lock_path:
+            try:
+                import fcntl
+            except ImportError:  # pragma: no cover - non-POSIX platforms
+                logger.warning("fcntl unavailable; rate limit for %s is per-process", lock_path)
+            else:
+                self._fcntl = fcntl
+                self._fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def _update(self, change) -> float:
+        """Refill, apply ``change(tokens) -> (tokens, result)`` atomically and return the result."""
+        with self._lock:
+            if self._fd is None:
+                self._tokens, result = change(self._refill(self._tokens, self._updated))
+                self._updated = time.time()
+                return result
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, self._STATE.size, 0)
+                tokens, updated = self._STATE.unpack(raw) if len(raw) == self._STATE.size else (self.burst, time.time())
+                tokens, result = change(self._refill(tokens, updated))
+                os.pwrite(self._fd, self._STATE.pack(tokens, time.time()), 0)
+                return result
+            finally:
+                self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+    def _refill(self, tokens: float, updated: float) -> float:
+        return min(self.burst, tokens + max(0.0, time.time() - updated) * self.rate)
+
+    def _take(self, tokens: float):
+        """Take one token if available; otherwise report how long until one will be."""
+        if tokens >= 1.0:
+            return tokens - 1.0, 0.0
+        return tokens, (1.0 - tokens) / self.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is taken; returns ``False`` if that would take longer than ``timeout``."""
+        started = time.monotonic()
+        while True:
+            wait = self._update(self._take)
+            if wait <= 0:
+                break
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            # Sleep past the refill point by a little jitter so sharers do not wake together
+            time.sleep(wait * (1.0 + random.random() * 0.1))
+        waited_ms = (time.monotonic() - started) * 1000.0
+        if waited_ms >= 1.0:
+            record(f"{self.metric_prefix}RateLimitWaitMs", waited_ms, "Milliseconds")
+        return True
+
+    def drain(self, seconds: float) -> None:
+        """Empty the bucket so no sharer sends for ``seconds`` (after a 429)."""
+        debt = -self.rate * max(0.0, seconds)
+        self._update(lambda tokens: (min(tokens, debt), 0.0))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the ``Retry-After`` delay in seconds (delta-seconds or HTTP date), if any."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def full_jitter_backoff(attempt: int, base: float, cap: float = 30.0) -> float:
+    """Random delay in ``[0, min(cap, base * 2**attempt)]`` so concurrent retries spread out."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+_limiters: Dict[str, AimdLimiter] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_buckets: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(key: str, **settings) -> AimdLimiter:
+    """Return the process-wide limiter for ``key`` (created with ``settings`` on first use)."""
+    with _registry_lock:
+        if key not in _limiters:
+            _limiters[key] = AimdLimiter(**settings)
+        return _limiters[key]
+
+
+def get_breaker(key: str, **settings) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for ``key``."""
+    with _registry_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(**settings)
+        return _breakers[key]
+
+
+def get_token_bucket(key: str, **settings) -> TokenBucket:
+    """Return the process-wide token bucket for ``key``."""
+    with _registry_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(**settings)
+        return _buckets[key]
+
+
+__all__ = [
+    "AimdLimiter",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "OverloadedError",
+    "TokenBucket",
+    "full_jitter_backoff",
+    "get_breaker",
+    "get_limiter",
+    "get_token_bucket",
+    "parse_retry_after",
+]
@@ -0,0 +1,84 @@
+"""Remaining-time-aware scheduling of users within one Lambda invocation."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class CostEstimator:
+    """Per-user processing cost from recent history (kept across warm invocations).
+
+    The estimate is the ``percentile`` of the last ``window`` durations, or ``default_ms``
+    until ``min_samples`` users have been timed.
+    """
+
+    def __init__(self, default_ms: float, window: int = 50, percentile: float = 0.9, min_samples: int = 3) -> None:
+        self.default_ms = default_ms
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._durations: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float) -> None:
+        with self._lock:
+            self._durations.append(duration_ms)
+
+    def estimate_ms(self) -> float:
+        with self._lock:
+            samples = sorted(self._durations)
+        if len(samples) < self.min_samples:
+            return self.default_ms
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+
+class DeadlineScheduler:
+    """Run items one at a time and stop picking new ones before the invocation deadline.
+
+    ``remaining_ms`` is typically ``context.get_remaining_time_in_millis``. An item only
+    starts when the time left, minus ``safety_margin_ms``, covers the estimated cost. The
+    first item is always started if the margin alone is available, so an inflated estimate
+    cannot starve a fresh invocation.
+    """
+
+    def __init__(
+        self,
+        remaining_ms: Optional[Callable[[], float]],
+        estimator: CostEstimator,
+        safety_margin_ms: float = 2000.0,
+    ) -> None:
+        self._remaining_ms = remaining_ms
+        self.estimator = estimator
+        self.safety_margin_ms = safety_margin_ms
+
+    def remaining_ms(self) -> float:
+        return float(self._remaining_ms()) if self._remaining_ms is not None else float("inf")
+
+    def can_start(self, first: bool = False) -> bool:
+        budget = self.remaining_ms() - self.safety_margin_ms
+        return budget > 0 if first else budget >= self.estimator.estimate_ms()
+
+    def run(self, items: Iterable[Any], func: Callable[[Any], Dict[str, Any]]) -> Tuple[List[Tuple[Any, Dict[str, Any]]], List[Any]]:
+        """Return ``([(item, result), ...], unprocessed_items)``; timings feed the estimator."""
+        pending = list(items)
+        done: List[Tuple[Any, Dict[str, Any]]] = []
+        while pending and self.can_start(first=not done):
+            item = pending.pop(0)
+            started = time.perf_counter()
+            try:
+                result = func(item)
+            finally:
+                self.estimator.record((time.perf_counter() - started) * 1000.0)
+            done.append((item, result))
+        return done, pending
+
+
+def remaining_time_getter(context: Any) -> Optional[Callable[[], float]]:
+    """Return ``context.get_remaining_time_in_millis`` when the context provides it."""
+    getter = getattr(context, "get_remaining_time_in_millis", None)
+    return getter if callable(getter) else None
+
+
+__all__ = ["CostEstimator", "DeadlineScheduler", "remaining_time_getter"]
@@ -0,0 +1,110 @@
+"""JSON encoding for API bodies, events and metric records: orjson when installed, stdlib otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional, Union
+
+try:  # optional accelerator; the stdlib path produces equivalent JSON
+    import orjson
+except ImportError:  # pragma: no cover - exercised where orjson is not installed
+    orjson = None
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+class Serializer:
+    """A named pair of ``dumps`` (object → UTF-8 bytes) and ``loads`` (bytes or str → object)."""
+
+    def __init__(self, name: str, dumps: Callable[..., bytes], loads: Callable[[JsonInput], Any]) -> None:
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"Serializer({self.name!r})"
+
+
+def _dataclass_default(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """Encode dataclass instances (scraped records) as objects, like orjson does natively."""
+
+    def encode(obj: Any) -> Any:
+        # Deferred: dataclasses (and inspect, which it imports) stay off the cold-start path
+        from dataclasses import fields, is_dataclass
+
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return {field.name: getattr(obj, field.name) for field in fields(obj)}
+        if default is not None:
+            return default(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    return encode
+
+
+def _stdlib_dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    # ASCII escaping keeps the C encoder on its fast path; the bytes are valid UTF-8 either way
+    return json.dumps(obj, separators=(",", ":"), default=_dataclass_default(default)).encode("utf-8")
+
+
+def _stdlib_loads(data: JsonInput) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+STDLIB = Serializer("json", _stdlib_dumps, _stdlib_loads)
+
+if orjson is not None:
+    # Non-string keys are stringified like the stdlib does instead of raising
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def _orjson_dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+
+    ORJSON: Optional[Serializer] = Serializer("orjson", _orjson_dumps, orjson.loads)
+else:  # pragma: no cover
+    ORJSON = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so this catches both backends
+JSONDecodeError = json.JSONDecodeError
+
+DEFAULT = ORJSON or STDLIB
+
+
+def get_serializer(name: str = "auto") -> Serializer:
+    """Return the serializer called ``name`` (``auto``, ``orjson`` or ``json``)."""
+    if name == "auto":
+        return DEFAULT
+    if name == "json":
+        return STDLIB
+    if name == "orjson" and ORJSON is not None:
+        return ORJSON
+    raise ValueError(f"JSON backend {name!r} is not available")
+
+
+def dumps(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes without an intermediate ``str``."""
+    return DEFAULT.dumps(obj, default=default)
+
+
+def dumps_str(obj: Any, *, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize ``obj`` to compact JSON text (for stdout and logs)."""
+    return DEFAULT.dumps(obj, default=default).decode("utf-8")
+
+
+def loads(data: JsonInput) -> Any:
+    """Parse JSON from bytes or text."""
+    return DEFAULT.loads(data)
+
+
+__all__ = [
+    "DEFAULT",
+    "JSONDecodeError",
+    "ORJSON",
+    "STDLIB",
+    "Serializer",
+    "dumps",
+    "dumps_str",
+    "get_serializer",
+    "loads",
+]
@@ -0,0 +1,61 @@
+"""``ApiClient`` honours the per-user deadline while queued on the concurrency limiter."""
+
+import threading
+import time
+import unittest
+
+from benchmarks.common import bootstrap
+
+bootstrap()
+
+import deadline  # noqa: E402
+from clients import ApiClient  # noqa: E402
+from resilience import AimdLimiter, CircuitBreaker  # noqa: E402
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    content = b"{}"
+    text = "{}"
+
+
+class ApiDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AimdLimiter(initial=1, minimum=1, maximum=1)
+        self.client = ApiClient(
+            "http://api.invalid", "key", timeout=10, max_retries=0, limiter=self.limiter, breaker=CircuitBreaker()
+        )
+        self.sent = []
+
+        def request(method, url, timeout=None, **kwargs):
+            self.sent.append(timeout)
+            return _Response()
+
+        self.client._transport.request = request
+        # Saturate the limiter: the only slot is held by another request
+        self.assertTrue(self.limiter.acquire())
+
+    def tearDown(self):
+        self.limiter.release()
+
+    def test_queued_request_raises_deadline_exceeded_without_overrunning(self):
+        started = time.monotonic()
+        with deadline.Deadline(0.3).activate():
+            with self.assertRaises(deadline.DeadlineExceeded):
+                self.client.get("users/1")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(self.sent, [])
+
+    def test_timeouts_are_recomputed_after_the_slot_wait(self):
+        threading.Timer(0.3, self.limiter.release).start()
+        with deadline.Deadline(1.0).activate():
+            self.client.get("users/1")
+        self.limiter.acquire()  # balance tearDown's release
+        (connect_timeout, read_timeout), = self.sent
+        self.assertLessEqual(read_timeout, 0.75)
+        self.assertLessEqual(connect_timeout, 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""HTTP transports behind ``ApiClient``: pooled ``requests`` (HTTP/1.1) or httpx with HTTP/2."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+# A single timeout in seconds, or ``(connect, read)``
+TimeoutSpec = Union[float, Tuple[float, float]]
+
+TRANSPORTS = ("requests", "http2")
+
+
+class RequestsTransport:
+    """``requests.Session`` with one connection per in-flight request, up to ``pool_size`` kept alive."""
+
+    name = "requests"
+
+    def __init__(self, pool_size: int) -> None:
+        # requests is imported on first client construction to keep cold-start imports lean
+        from requests import RequestException, Session, Timeout
+        from requests.adapters import HTTPAdapter
+
+        self.errors: Tuple[Type[BaseException], ...] = (RequestException,)
+        self.timeouts: Tuple[Type[BaseException], ...] = (Timeout,)
+        self._session = Session()
+        # Retries happen in ``ApiClient._send``; the pool matches the client's concurrency cap
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Dict[str, str],
+        timeout: TimeoutSpec,
+        content: Optional[bytes] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ):
+        return self._session.request(method, url, headers=headers, data=content, params=params, timeout=timeout)
+
+    def warm(self, base_url: str, headers: Dict[str, str], timeout: float) -> None:
+        """Open a pooled connection, going straight to urllib3 so a dead endpoint costs one timeout."""
+        adapter = self._session.get_adapter(base_url)
+        pool = adapter.poolmanager.connection_from_url(base_url)
+        pool.urlopen("HEAD", "/", headers=headers, retries=False, timeout=timeout)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class HttpxTransport:
+    """httpx client multiplexing concurrent requests as HTTP/2 streams over few connections.
+
+    ``https`` origins negotiate HTTP/2 through ALPN (falling back to HTTP/1.1); plain ``http``
+    origins use HTTP/2 with prior knowledge (h2c), which is what local stand-ins speak.
+    """
+
+    name = "http2"
+
+    def __init__(self, pool_size: int, base_url: str) -> None:
+        try:
+            import httpx
+        except ImportError as exc:  # pragma: no cover - depends on the deployment package
+            raise RuntimeError("API_TRANSPORT=http2 requires httpx[http2] to be installed") from exc
+
+        self._httpx = httpx
+        self.errors = (httpx.TransportError,)
+        self.timeouts = (httpx.TimeoutException,)
+        self._client = httpx.Client(
+            http1=not base_url.startswith("http://"),
+            http2=True,
+            limits=httpx.Limits(max_connections=max(1, pool_size), max_keepalive_connections=max(1, pool_size)),
+        )
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Dict[str, str],
+        timeout: TimeoutSpec,
+        content: Optional[bytes] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = self._httpx.Timeout(read, connect=connect)
+        return self._client.request(method, url, headers=headers, content=content, params=params, timeout=timeout)
+
+    def warm(self, base_url: str, headers: Dict[str, str], timeout: float) -> None:
+        self._client.head(base_url, headers=headers, timeout=timeout)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def make_transport(name: str, *, pool_size: int, base_url: str):
+    """Build the transport called ``name`` (see ``TRANSPORTS``)."""
+    if name == "requests":
+        return RequestsTransport(pool_size)
+    if name == "http2":
+        return HttpxTransport(pool_size, base_url)
+    raise ValueError(f"Unsupported API_TRANSPORT value: {name!r} (expected one of {', '.join(TRANSPORTS)})")
+
+
+__all__ = ["HttpxTransport", "RequestsTransport", "TRANSPORTS", "make_transport"]
@@ -4,60 +4,149 @@ from __future__ import annotations
 
 import gzip
 import logging
+import threading
 import time
-from typing import Optional
-
-import boto3
-from botocore.exceptions import ClientError
+from typing import Callable, Iterable, Iterator, Optional, Tuple, Union
 
+import deadline
 from config import config
 
 logger = logging.getLogger(__name__)
 
 
-def setup_r2_client():
-    """Create an R2 client with Lambda-optimised settings."""
+def setup_r2_client(max_pool_connections: Optional[int] = None):
+    """Create an R2 client with Lambda-optimised settings.
+
+    botocore fixes socket timeouts per client, so these are the caps; the per-user deadline
+    is enforced between attempts in ``download_file_from_r2``. The connection pool holds
+    ``max_pool_connections`` (default ``R2_MAX_POOL_CONNECTIONS``).
+    """
+    import boto3  # deferred: boto3 dominates cold-start import time
+
     return boto3.client(
         "s3",
         region_name=config.R2_REGION,
         aws_access_key_id=config.R2_ACCESS_KEY_ID,
         aws_secret_access_key=config.R2_SECRET_ACCESS_KEY,
         endpoint_url=config.R2_ENDPOINT_URL,
-        config=boto3.session.Config(retries={"max_attempts": 3}, max_pool_connections=5),
+        config=boto3.session.Config(
+            retries={"max_attempts": 3},
+            max_pool_connections=max_pool_connections or config.R2_MAX_POOL_CONNECTIONS,
+            connect_timeout=config.CONNECT_TIMEOUT_SECONDS,
+            read_timeout=config.R2_READ_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def warm_r2_client(r2_client) -> None:
+    """Prime the R2 connection pool with a cheap ``HeadBucket`` call."""
+    from botocore.exceptions import ClientError
+
+    try:
+        r2_client.head_bucket(Bucket=config.R2_BUCKET_NAME)
+    except ClientError as err:
+        # Auth/permission errors still leave an established TLS connection in the pool
+        logger.debug("R2 warmup HeadBucket returned %s", err.response.get("Error", {}).get("Code"))
+
+
+_hedging = None
+
+
+def _r2_hedging():
+    """Return the process-wide ``(executor, tracker, budget)`` used to hedge R2 GETs."""
+    global _hedging
+    if _hedging is None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        from hedging import HedgeBudget, LatencyTracker
+
+        _hedging = (
+            # Two attempts per download in flight at most
+            ThreadPoolExecutor(max_workers=2 * config.R2_MAX_POOL_CONNECTIONS, thread_name_prefix="r2-hedge"),
+            LatencyTracker(
+                percentile=config.R2_HEDGE_PERCENTILE,
+                default_delay=config.R2_HEDGE_DEFAULT_DELAY_MS / 1000.0,
+                min_delay=config.R2_HEDGE_MIN_DELAY_MS / 1000.0,
+            ),
+            HedgeBudget(ratio=config.R2_HEDGE_MAX_RATIO, max_outstanding=config.R2_HEDGE_MAX_OUTSTANDING),
+        )
+    return _hedging
+
+
+def _get_object(r2_client, bucket_name: str, key: str):
+    """``GetObject``, hedged with a second request when ``R2_HEDGE`` is on (see ``hedging``)."""
+    if not config.R2_HEDGE:
+        return r2_client.get_object(Bucket=bucket_name, Key=key)
+    from hedging import hedged_call
+
+    executor, tracker, budget = _r2_hedging()
+    response, _ = hedged_call(
+        lambda: r2_client.get_object(Bucket=bucket_name, Key=key),
+        executor=executor,
+        tracker=tracker,
+        budget=budget,
+        # The losing response's body is never read; closing it drops its connection
+        discard=lambda loser: loser["Body"].close(),
+        metric_prefix="R2",
     )
+    return response
+
+
+def download_file_from_r2(
+    r2_client,
+    html_path: str,
+    max_retries: int = 3,
+    initial_backoff: float = 0.5,
+    *,
+    decode: bool = True,
+    on_response: Optional[Callable[[int], None]] = None,
+) -> Optional[Union[str, bytes]]:
+    """Download a file from R2 with retry logic suitable for Lambda.
 
+    With ``decode=False`` the (decompressed) bytes are returned as-is so the parser can
+    detect the document encoding itself without an intermediate ``str`` copy. Under an active
+    ``deadline.Deadline`` no attempt starts, and no backoff sleeps, past it;
+    ``DeadlineExceeded`` is raised rather than reported as a missing file. ``on_response``
+    is called with the object's ``ContentLength`` before each attempt reads the body.
+    """
+    from botocore.exceptions import ClientError
 
-def download_file_from_r2(r2_client, html_path: str, max_retries: int = 3, initial_backoff: float = 0.5) -> Optional[str]:
-    """Download a file from R2 with retry logic suitable for Lambda."""
     bucket_name = config.R2_BUCKET_NAME
     retry_count = 0
     last_exception: Exception | None = None
 
     while retry_count < max_retries:
+        deadline.check(f"R2 download of {html_path}")
         try:
             logger.info("Downloading file: %s/%s", bucket_name, html_path)
 
             try:
-                r2_client.head_object(Bucket=bucket_name, Key=html_path)
+                # No HeadObject first: GetObject reports a missing key itself, one round trip sooner
+                response = _get_object(r2_client, bucket_name, html_path)
             except ClientError as err:
-                if err.response["Error"].get("Code") == "404":
+                if err.response["Error"].get("Code") in ("404", "NoSuchKey"):
                     logger.warning("File does not exist: %s", html_path)
                     return None
                 raise
 
-            response = r2_client.get_object(Bucket=bucket_name, Key=html_path)
-
+            if on_response is not None:
+                on_response(response.get("ContentLength") or 0)
             if html_path.endswith(".html.gz"):
+                # Decompress straight from the streaming body; the compressed payload is never buffered
                 with gzip.GzipFile(fileobj=response["Body"]) as gz:
-                    return gz.read().decode("utf-8")
-            return response["Body"].read().decode("utf-8")
+                    data = gz.read()
+            else:
+                data = response["Body"].read()
+            return data.decode("utf-8") if decode else data
 
         except Exception as exc:  # pragma: no cover - defensive logging only
             last_exception = exc
             retry_count += 1
+            wait_time = initial_backoff * (2 ** (retry_count - 1))
 
             if retry_count < max_retries:
-                wait_time = initial_backoff * (2 ** (retry_count - 1))
+                if not deadline.allows(wait_time):
+                    raise deadline.DeadlineExceeded(f"No time left to retry R2 download of {html_path}") from exc
                 logger.warning(
                     "Attempt %s failed. Retrying in %.2fs. Error: %s",
                     retry_count,
@@ -81,4 +170,132 @@ def download_file_from_r2(r2_client, html_path: str, max_retries: int = 3, initi
     return None
 
 
-__all__ = ["setup_r2_client", "download_file_from_r2"]
+class _ByteBudget:
+    """Bytes held by a prefetch; ``acquire`` waits until a reservation fits under ``limit``.
+
+    A reservation larger than the whole limit is admitted once nothing else is held, so one
+    oversized document slows the prefetch down instead of stalling it. Once closed, waiting
+    downloads are let through to finish (there is no way to cancel a GET in flight).
+    """
+
+    def __init__(self, limit: Optional[int]) -> None:
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        with self._cond:
+            while self.limit and not self._closed and self.used and self.used + size > self.limit:
+                self._cond.wait()
+            self._add(size)
+
+    def adjust(self, delta: int) -> None:
+        with self._cond:
+            self._add(delta)
+            if delta < 0:
+                self._cond.notify_all()
+
+    def release(self, size: int) -> None:
+        if size:
+            self.adjust(-size)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _add(self, size: int) -> None:
+        self.used += size
+        self.peak = max(self.peak, self.used)
+
+
+def prefetch_from_r2(
+    r2_client,
+    html_paths: Iterable[str],
+    *,
+    concurrency: Optional[int] = None,
+    max_inflight_bytes: Optional[int] = None,
+    decode: bool = False,
+) -> Iterator[Tuple[str, Optional[Union[str, bytes]]]]:
+    """Download many files concurrently, yielding ``(html_path, document)`` as each completes.
+
+    ``document`` is what ``download_file_from_r2`` returns (``None`` for a missing or failed
+    file). At most ``concurrency`` GETs run at once (``R2_PREFETCH_CONCURRENCY``; size the
+    client's pool to match), and ``html_paths`` is consumed lazily as slots free up. Bytes
+    being read plus the one document handed to the caller are held to ``max_inflight_bytes``
+    (``R2_PREFETCH_MAX_INFLIGHT_BYTES``, 0 = no limit). A GET is admitted on its expected
+    size, which is its ``ContentLength`` or, for ``.gz`` objects, ``ContentLength`` times
+    ``R2_PREFETCH_GZIP_RATIO``. Once read, it is charged its actual (decompressed) size, so
+    only a document that inflates past the ratio overshoots the limit, by the difference. A
+    document's bytes are released when the caller asks for the next one. The active
+    ``deadline`` applies to every download; a download error other than a missing file is
+    raised to the caller.
+    """
+    import contextvars
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    concurrency = max(1, concurrency or config.R2_PREFETCH_CONCURRENCY)
+    if max_inflight_bytes is None:
+        max_inflight_bytes = config.R2_PREFETCH_MAX_INFLIGHT_BYTES
+    budget = _ByteBudget(max_inflight_bytes)
+    gzip_ratio = max(1.0, config.R2_PREFETCH_GZIP_RATIO)
+
+    def fetch(html_path: str) -> Tuple[str, Optional[Union[str, bytes]], int]:
+        held = 0
+        # Compressed objects are decompressed in full before the real size is known
+        ratio = gzip_ratio if html_path.endswith(".gz") else 1.0
+
+        def reserve(content_length: int) -> None:
+            nonlocal held
+            # A retry re-reserves; the failed attempt's reservation goes back first
+            budget.release(held)
+            held = 0
+            size = int(content_length * ratio)
+            budget.acquire(size)
+            held = size
+
+        try:
+            data = download_file_from_r2(r2_client, html_path, decode=decode, on_response=reserve)
+        except BaseException:
+            budget.release(held)
+            raise
+        size = len(data) if data else 0
+        budget.adjust(size - held)
+        return html_path, data, size
+
+    paths = iter(html_paths)
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="r2-prefetch")
+    futures = set()
+    handed_out = 0
+
+    def fill() -> None:
+        while len(futures) < concurrency:
+            html_path = next(paths, None)
+            if html_path is None:
+                return
+            # Each download runs under the caller's context (and so its deadline)
+            futures.add(executor.submit(contextvars.copy_context().run, fetch, html_path))
+
+    try:
+        fill()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.discard(future)
+                html_path, data, size = future.result()
+                fill()
+                handed_out = size
+                yield html_path, data
+                # The caller is done with that document; its bytes may go to the next GET
+                budget.release(handed_out)
+                handed_out = 0
+    finally:
+        budget.close()
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+__all__ = ["setup_r2_client", "warm_r2_client", "download_file_from_r2", "prefetch_from_r2"]